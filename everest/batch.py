@@ -21,7 +21,9 @@ class Batch(object):
         """
         :param int start: start index for this batch.
         :param int size: batch size.
-        :param int total_size: total size of the batched sequence.
+        :param int total_size: total size of the batched sequence or `None`
+          if the total size is not known (in which case the :attr:`next`,
+          :attr:`last` and :attr:`number` attributes are not available).
         """
         if start < 0:
             raise ValueError('Batch start must be zero or a positive number.')
@@ -12,7 +12,10 @@ from everest.interfaces import IResourceUrlConverter
 from everest.interfaces import IUserMessage
 from everest.interfaces import IUserMessageNotifier
 from everest.messaging import UserMessageNotifier
+from everest.mime import JsonMime
+from everest.mime import XmlMime
 from everest.mime import get_registered_representer_names
+from everest.querying.base import CQL_PARSER_ENGINES
 from everest.querying.base import EXPRESSION_KINDS
 from everest.querying.filtering import CqlFilterSpecificationVisitor
 from everest.querying.interfaces import IFilterSpecificationFactory
@@ -36,6 +39,7 @@ from everest.representers.atom import AtomResourceRepresenter
 from everest.representers.base import RepresenterRegistry
 from everest.representers.csv import CsvResourceRepresenter
 from everest.representers.interfaces import IRepresenterRegistry
+from everest.representers.json import JSON_CODEC_OPTION
 from everest.representers.json import JsonResourceRepresenter
 from everest.representers.xml import XmlResourceRepresenter
 from everest.resources.base import Collection
@@ -43,15 +47,19 @@ from everest.resources.base import Resource
 from everest.resources.interfaces import ICollectionResource
 from everest.resources.interfaces import IMemberResource
 from everest.resources.interfaces import IRelation
+from everest.resources.interfaces import IResourceLookupCache
 from everest.resources.interfaces import IService
 from everest.resources.service import Service
 from everest.resources.system import UserMessageMember
+from everest.resources.utils import ResourceLookupCache
 from everest.resources.utils import provides_member_resource
 from everest.url import ResourceUrlConverter
 from everest.views.base import RepresentingResourceView
+from everest.views.cache import ResponseCache
 from everest.views.deletemember import DeleteMemberView
 from everest.views.getcollection import GetCollectionView
 from everest.views.getmember import GetMemberView
+from everest.views.interfaces import IResponseCache
 from everest.views.postcollection import PostCollectionView
 from everest.views.putmember import PutMemberView
 from pyramid.configuration import Configurator as PyramidConfigurator
@@ -347,6 +355,12 @@ class Configurator(PyramidConfigurator):
         # Register utility collection relation -> collection class
         self._register_utility(collection, IRelation,
                                name=collection.relation)
+        # Populate the resource lookup cache.
+        lookup_cache = self.query_registered_utilities(IResourceLookupCache)
+        if lookup_cache is None:
+            lookup_cache = ResourceLookupCache()
+            self._register_utility(lookup_cache, IResourceLookupCache)
+        lookup_cache.register(interface, member, collection, entity)
         # Register the resource with the repository.
         repo.register_resource(interface)
         # Register adapter implementing interface -> repository.
@@ -528,6 +542,27 @@ class Configurator(PyramidConfigurator):
             rpr_reg.register_representer_class(XmlResourceRepresenter)
             rpr_reg.register_representer_class(AtomResourceRepresenter)
             self._register_utility(rpr_reg, IRepresenterRegistry)
+            # Compile the XML schemata of all XML mappings at startup.
+            xml_mp_reg = rpr_reg.get_mapping_registry(XmlMime)
+            self.add_subscriber(xml_mp_reg.on_app_created,
+                                IApplicationCreated)
+        # Apply representer default options given in the settings.
+        rpr_reg = self.get_registered_utility(IRepresenterRegistry)
+        json_mp_reg = rpr_reg.get_mapping_registry(JsonMime)
+        setting_info = [(JSON_CODEC_OPTION, 'json_codec')]
+        for name, value in self.__cnf_from_settings(setting_info).iteritems():
+            json_mp_reg.set_default_config_option(name, value)
+        # Check the CQL parser engine given in the settings.
+        cql_parser = self.get_settings().get('cql_parser')
+        if not cql_parser in (None, CQL_PARSER_ENGINES.PYPARSING,
+                              CQL_PARSER_ENGINES.NATIVE):
+            raise ValueError('Unknown CQL parser engine "%s".' % cql_parser)
+        # Set up the response cache if a maximum size is given.
+        response_cache_max_bytes = \
+                int(self.get_settings().get('response_cache_max_bytes', 0))
+        if response_cache_max_bytes > 0:
+            self._register_utility(ResponseCache(response_cache_max_bytes),
+                                   IResponseCache)
         # Register renderer factories for registered representers.
         for reg_rnd_name in get_registered_representer_names():
             rnd = self.query_registered_utilities(IRendererFactory,
@@ -8,6 +8,7 @@ Created on Jun 16, 2011.
 """
 from everest.configuration import Configurator
 from everest.repositories.constants import REPOSITORY_TYPES
+from everest.repositories.memory.ids import ENTITY_ID_GENERATORS
 from everest.representers.config import IGNORE_ON_READ_OPTION
 from everest.representers.config import IGNORE_ON_WRITE_OPTION
 from everest.representers.config import IGNORE_OPTION
@@ -90,14 +91,31 @@ class IMemoryRepositoryDirective(IRepositoryDirective):
                             "returns a sequence of entity instances which "
                             "will be used to populate the cache on startup.",
                      required=False)
+    columnar_entity_classes = \
+        Tokens(title=u"Entity classes to store in compact columnar caches. "
+                      "Only entity classes with terminal attributes only "
+                      "can be stored this way.",
+               required=False,
+               value_type=GlobalObject())
+    id_strategy = \
+        Choice(values=tuple(sorted(ENTITY_ID_GENERATORS.keys())),
+               title=u"The strategy to use for generating IDs for entities "
+                      "without an ID ('counter', 'time_ordered' or "
+                      "'uuid1'). Defaults to 'uuid1'.",
+               required=False)
 
 
 def memory_repository(_context, name=None, make_default=False,
                       aggregate_class=None, repository_class=None,
-                      cache_loader=None):
+                      cache_loader=None, columnar_entity_classes=None,
+                      id_strategy=None):
     cnf = {}
     if not cache_loader is None:
         cnf['cache_loader'] = cache_loader
+    if not columnar_entity_classes is None:
+        cnf['columnar_entity_classes'] = tuple(columnar_entity_classes)
+    if not id_strategy is None:
+        cnf['id_generator'] = ENTITY_ID_GENERATORS[id_strategy]()
     _repository(_context, name, make_default,
                 aggregate_class, repository_class,
                 REPOSITORY_TYPES.MEMORY, 'add_memory_repository', cnf)
@@ -114,11 +132,25 @@ class IFileSystemRepositoryDirective(IRepositoryDirective):
         GlobalObject(title=u"The (MIME) content type to use for the "
                             "representation files. Defaults to CSV.",
                      required=False)
+    columnar_entity_classes = \
+        Tokens(title=u"Entity classes to store in compact columnar caches. "
+                      "Only entity classes with terminal attributes only "
+                      "can be stored this way.",
+               required=False,
+               value_type=GlobalObject())
+    id_strategy = \
+        Choice(values=tuple(sorted(ENTITY_ID_GENERATORS.keys())),
+               title=u"The strategy to use for generating IDs for entities "
+                      "without an ID ('counter', 'time_ordered' or "
+                      "'uuid1'). Defaults to 'uuid1'. Counters are stored "
+                      "in the repository directory.",
+               required=False)
 
 
 def filesystem_repository(_context, name=None, make_default=False,
                           aggregate_class=None, repository_class=None,
-                          directory=None, content_type=None):
+                          directory=None, content_type=None,
+                          columnar_entity_classes=None, id_strategy=None):
     """
     Directive for registering a file-system based repository.
     """
@@ -127,6 +159,10 @@ def filesystem_repository(_context, name=None, make_default=False,
         cnf['directory'] = directory
     if not content_type is None:
         cnf['content_type'] = content_type
+    if not columnar_entity_classes is None:
+        cnf['columnar_entity_classes'] = tuple(columnar_entity_classes)
+    if not id_strategy is None:
+        cnf['id_generator'] = ENTITY_ID_GENERATORS[id_strategy]()
     _repository(_context, name, make_default,
                 aggregate_class, repository_class,
                 REPOSITORY_TYPES.FILE_SYSTEM, 'add_filesystem_repository', cnf)
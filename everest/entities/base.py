@@ -191,6 +191,33 @@ class Aggregate(object):
         """
         raise NotImplementedError('Abstract method')
 
+    def add_all(self, entities, check_conflicts=True): # pylint: disable=W0613
+        """
+        Adds all given entities to the aggregate.
+
+        The default implementation calls :meth:`add` for each entity;
+        derived classes may override this with a bulk operation.
+
+        :param entities: sequence of entities (domain objects) to add.
+        :param bool check_conflicts: if this is set to `False`, derived
+          classes may skip checking the entities for duplicate IDs and
+          slugs; the default implementation always checks.
+        """
+        for ent in entities:
+            self.add(ent)
+
+    def remove_all(self, entities):
+        """
+        Removes all given entities from the aggregate.
+
+        The default implementation calls :meth:`remove` for each entity;
+        derived classes may override this with a bulk operation.
+
+        :param entities: sequence of entities (domain objects) to remove.
+        """
+        for ent in entities:
+            self.remove(ent)
+
     def update(self, entity, source_entity):
         """
         Updates the state of the given entity such that it reflects the state
@@ -67,4 +67,12 @@ class IAggregate(Interface):
         """
         """
 
+    def add_all(entities, check_conflicts=True):
+        """
+        """
+
+    def remove_all(entities):
+        """
+        """
+
 # pylint: enable=W0232, E0213, E0211
@@ -8,6 +8,7 @@ Created on Nov 3, 2011.
 """
 from everest.entities.interfaces import IEntity
 from everest.repositories.utils import as_repository
+from everest.resources.interfaces import IResourceLookupCache
 from pyramid.threadlocal import get_current_registry
 from zope.interface import providedBy as provided_by # pylint: disable=E0611,F0401
 from zope.interface.interfaces import IInterface # pylint: disable=E0611,F0401
@@ -45,10 +46,13 @@ def get_entity_class(resource):
         (class implementing `everest.entities.interfaces.IEntity`)
     """
     reg = get_current_registry()
-    if IInterface in provided_by(resource):
-        ent_cls = reg.getUtility(resource, name='entity-class')
-    else:
-        ent_cls = reg.getAdapter(resource, IEntity, name='entity-class')
+    cache = reg.queryUtility(IResourceLookupCache)
+    ent_cls = None if cache is None else cache.get_entity_class(resource)
+    if ent_cls is None:
+        if IInterface in provided_by(resource):
+            ent_cls = reg.getUtility(resource, name='entity-class')
+        else:
+            ent_cls = reg.getAdapter(resource, IEntity, name='entity-class')
     return ent_cls
 
 
@@ -13,6 +13,7 @@ from zope.interface import implements # pylint: disable=E0611,F0401
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['BinaryOperator',
+           'CQL_PARSER_ENGINES',
            'CqlExpression',
            'CqlExpressionList',
            'EXPRESSION_KINDS',
@@ -31,6 +32,11 @@ class EXPRESSION_KINDS(object):
     EVAL = 'EVAL'
 
 
+class CQL_PARSER_ENGINES(object):
+    PYPARSING = 'pyparsing'
+    NATIVE = 'native'
+
+
 class Operator(object):
     """
     Base class for querying operators.
@@ -129,10 +135,16 @@ class CqlExpressionList(object):
 class Specification(object):
     """
     Abstract base classs for all specifications.
+
+    Specifications are immutable value objects: they compare equal and hash
+    alike if they are structurally identical. This allows them to be shared
+    (e.g., as default order of a collection) and used as cache keys.
     """
 
     implements(ISpecification)
 
+    __slots__ = ()
+
     operator = None
 
     def __init__(self):
@@ -27,8 +27,11 @@ from everest.querying.specifications import le
 from everest.querying.specifications import lt
 from everest.querying.specifications import rng
 from everest.querying.specifications import starts
-from everest.resources.utils import url_to_resource
+from everest.resources.utils import urls_to_resources
 from iso8601.iso8601 import parse_date
+from itertools import izip
+from operator import and_
+from operator import or_
 from pyparsing import CaselessKeyword
 from pyparsing import CharsNotIn
 from pyparsing import Combine
@@ -38,6 +41,7 @@ from pyparsing import Group
 from pyparsing import Literal
 from pyparsing import OneOrMore
 from pyparsing import Optional
+from pyparsing import ParserElement
 from pyparsing import Regex
 from pyparsing import Word
 from pyparsing import ZeroOrMore
@@ -69,6 +73,11 @@ ISO8601_REGEX = r'(?P<year>[0-9]{4})' \
                 r'(?P<timezone>Z|(([-+])([0-9]{2}):([0-9]{2})))?'
 
 
+# Enable memoization of intermediate parse results. This speeds up the
+# parsing of nested junctions considerably; note that this is a global
+# setting affecting all pyparsing grammars.
+ParserElement.enablePackrat()
+
 AND_PAT = 'and'
 OR_PAT = 'or'
 
@@ -116,6 +125,11 @@ def convert_range(toks):
 
 
 class CriterionConverter(object):
+    """
+    Converts parsed criteria to filter specifications.
+
+    The converter is shared by all CQL parser engines.
+    """
     spec_map = {STARTS_WITH.name : starts,
                 ENDS_WITH.name : ends,
                 CONTAINS.name : cnts,
@@ -131,14 +145,22 @@ class CriterionConverter(object):
     @classmethod
     def convert(cls, toks):
         crit = toks[0]
-        op_name = cls.__prepare_identifier(crit.operator)
+        return cls.make_spec(crit.name, crit.operator, crit.value)
+
+    @classmethod
+    def make_spec(cls, name, operator, values):
+        """
+        Creates a filter specification from the given (slug) attribute
+        name, (slug) operator name and sequence of parsed values.
+        """
+        op_name = cls.__prepare_identifier(operator)
         if op_name.startswith("not_"):
             op_name = op_name[4:]
             negate = True
         else:
             negate = False
-        attr_name = cls.__prepare_identifier(crit.name)
-        attr_values = cls.__prepare_values(crit.value)
+        attr_name = cls.__prepare_identifier(name)
+        attr_values = cls.__prepare_values(values)
         if attr_values == []:
             raise ValueError('Criterion does not define a value.')
         # For the CONTAINED spec, we treat all parsed values as one value.
@@ -167,14 +189,20 @@ class CriterionConverter(object):
     @classmethod
     def __prepare_values(cls, values):
         prepared = []
+        seen = set()
+        url_positions = []
         for val in values:
-            if cls.__is_empty_string(val):
+            if cls.__is_empty_string(val) or val in seen:
                 continue
-            elif cls.__is_url(val):
-                # URLs - convert to resource.
-                val = url_to_resource(''.join(val))
-            if not val in prepared:
-                prepared.append(val)
+            seen.add(val)
+            if cls.__is_url(val):
+                url_positions.append(len(prepared))
+            prepared.append(val)
+        if url_positions:
+            # URLs - convert to resources in one batch.
+            rcs = urls_to_resources([prepared[pos] for pos in url_positions])
+            for pos, rc in izip(url_positions, rcs):
+                prepared[pos] = rc
         return prepared
 
     @classmethod
@@ -187,25 +215,15 @@ class CriterionConverter(object):
 
 
 def convert_conjunction(toks):
-    left_spec = toks[0][0]
-    right_spec = toks[0][-1]
-    return left_spec & right_spec
+    return reduce(and_, toks[0][::2])
 
 
 def convert_disjunction(toks):
-    left_spec = toks[0][0]
-    right_spec = toks[0][-1]
-    return left_spec | right_spec
+    return reduce(or_, toks[0][::2])
 
 
 def convert_simple_criteria(toks):
-    spec = None
-    for crit_spec in toks[0]:
-        if spec is None:
-            spec = crit_spec
-        else:
-            spec = spec & crit_spec
-    return spec
+    return reduce(and_, toks[0])
 
 
 # Numbers are converted to ints if possible.
@@ -0,0 +1,281 @@
+"""
+Native CQL filter and order expression parser.
+
+This parser engine does not use pyparsing. It scans the criteria strings
+with a single tokenizer regular expression and parses junctions with a
+precedence climbing algorithm. It accepts the same language as the
+pyparsing based parsers in :mod:`everest.querying.filterparser` and
+:mod:`everest.querying.orderparser` and produces the same specifications.
+
+This file is part of the everest project.
+See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
+
+Created on Oct 18, 2026.
+"""
+from everest.querying.filterparser import AND_PAT
+from everest.querying.filterparser import CriterionConverter \
+        as FilterCriterionConverter
+from everest.querying.filterparser import ISO8601_REGEX
+from everest.querying.filterparser import OR_PAT
+from everest.querying.filterparser import convert_number
+from everest.querying.orderparser import CriterionConverter \
+        as OrderCriterionConverter
+from iso8601.iso8601 import parse_date
+from operator import and_
+from operator import or_
+from pyparsing import ParseException
+import re
+
+__docformat__ = 'reStructuredText en'
+__all__ = ['FilterParser',
+           'OrderParser',
+           'parse_filter',
+           'parse_order',
+           ]
+
+
+#: The tokenizer expression. Leading whitespace is skipped.
+TOKEN_REGEX = re.compile(r'''
+    [ \t\n\r]*
+    (?:
+     (?P<url>http://[^/]+/[^,~?&]+)
+    |(?P<string>"(?:[^"\n\r\\]|""|\\x[0-9a-fA-F]+|\\.)*")
+    |(?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][0-9+-][0-9]*)?)
+    |(?P<identifier>[a-zA-Z][a-zA-Z0-9-]*(?:\.[a-zA-Z][a-zA-Z0-9-]*)*)
+    |(?P<symbol>[:,~()-])
+    )''', re.VERBOSE)
+
+# Dates are double-quoted strings starting with an ISO8601 date.
+DATE_REGEX = re.compile(ISO8601_REGEX)
+
+# Order attribute names must not contain digits.
+ORDER_IDENTIFIER_REGEX = \
+        re.compile(r'[a-zA-Z][a-zA-Z-]*(?:\.[a-zA-Z][a-zA-Z-]*)*$')
+
+ORDER_DIRECTION_REGEX = re.compile(r'[ \t\n\r]*(asc|desc)')
+
+WHITESPACE_REGEX = re.compile(r'[ \t\n\r]*')
+
+
+class _Parser(object):
+    """
+    Base class for native CQL parsers.
+
+    Parse methods take a position in the criteria string and return a
+    (result, new position) tuple; syntax errors are reported by raising a
+    :class:`pyparsing.ParseException`. Like the pyparsing parsers, the
+    parsers stop at the first unparseable input after a valid expression.
+    """
+    #: Maps junction operators to (precedence, combinator function) tuples.
+    #: To be specified in derived classes.
+    operators = None
+
+    def __init__(self, text):
+        self._text = text
+
+    def parse(self):
+        """
+        Parses the criteria string.
+
+        :returns: the parsed specification.
+        """
+        return self._parse_junctions(0)[0]
+
+    def _parse_element(self, pos):
+        kind, value, end = self._scan(pos)
+        if kind == 'symbol' and value == '(':
+            spec, pos = self._parse_junctions(end)
+            end = self._expect(pos, 'symbol', ')')[1]
+        else:
+            spec, end = self._parse_criterion(pos)
+        return spec, end
+
+    def _parse_criterion(self, pos):
+        raise NotImplementedError('Abstract method.')
+
+    def _scan_operator(self, pos):
+        raise NotImplementedError('Abstract method.')
+
+    def _parse_junctions(self, pos, lhs=None, min_precedence=0):
+        # Precedence climbing; all operators are left associative.
+        if lhs is None:
+            lhs, pos = self._parse_element(pos)
+        while True:
+            op, op_end = self._scan_operator(pos)
+            if op is None:
+                break
+            precedence, combine = self.operators[op]
+            if precedence < min_precedence:
+                break
+            try:
+                rhs, rhs_end = self._parse_element(op_end)
+            except ParseException:
+                # Leave the dangling operator unparsed.
+                break
+            while True:
+                next_op = self._scan_operator(rhs_end)[0]
+                if next_op is None \
+                   or self.operators[next_op][0] <= precedence:
+                    break
+                rhs, next_end = self._parse_junctions(rhs_end, rhs,
+                                                      precedence + 1)
+                if next_end == rhs_end:
+                    break
+                rhs_end = next_end
+            lhs = combine(lhs, rhs)
+            pos = rhs_end
+        return lhs, pos
+
+    def _scan(self, pos):
+        match = TOKEN_REGEX.match(self._text, pos)
+        if match is None:
+            kind = value = None
+            end = pos
+        else:
+            kind = match.lastgroup
+            value = match.group(kind)
+            end = match.end()
+        return kind, value, end
+
+    def _expect(self, pos, kind, expected_value=None):
+        tok_kind, value, end = self._scan(pos)
+        if tok_kind != kind \
+           or (not expected_value is None and value != expected_value):
+            raise ParseException(self._text, pos,
+                                 'Expected %s' % (expected_value or kind))
+        return value, end
+
+
+class FilterParser(_Parser):
+    """
+    Native CQL filter criteria parser.
+    """
+    operators = {AND_PAT : (2, and_),
+                 OR_PAT : (1, or_),
+                 }
+
+    def parse(self):
+        kind, value = self._scan(0)[:2]
+        if kind == 'symbol' and value == '(':
+            spec = self._parse_junctions(0)[0]
+        else:
+            # Try old-style criteria separated by "~" first.
+            spec, pos = self._parse_criterion(0)
+            specs = [spec]
+            while True:
+                kind, value, end = self._scan(pos)
+                if kind != 'symbol' or value != '~':
+                    break
+                try:
+                    spec, pos = self._parse_criterion(end)
+                except ParseException:
+                    break
+                specs.append(spec)
+            if len(specs) > 1:
+                spec = reduce(and_, specs)
+            else:
+                spec = self._parse_junctions(pos, lhs=spec)[0]
+        return spec
+
+    def _scan_operator(self, pos):
+        kind, value, end = self._scan(pos)
+        if kind == 'identifier':
+            op = value.lower()
+            if not op in self.operators:
+                op = None
+        else:
+            op = None
+        return op, end
+
+    def _parse_criterion(self, pos):
+        name, pos = self._expect(pos, 'identifier')
+        pos = self._expect(pos, 'symbol', ':')[1]
+        operator, pos = self._expect(pos, 'identifier')
+        pos = self._expect(pos, 'symbol', ':')[1]
+        values = []
+        while True:
+            pos = self.__parse_value(pos, values)
+            kind, value, end = self._scan(pos)
+            if kind != 'symbol' or value != ',':
+                break
+            pos = end
+        spec = FilterCriterionConverter.make_spec(name, operator, values)
+        return spec, pos
+
+    def __parse_value(self, pos, values):
+        # Appends the value found at the given position (if any) to the
+        # given value list and returns the end position.
+        kind, value, end = self._scan(pos)
+        if kind == 'number':
+            number = convert_number([value])
+            # Check for a number range.
+            range_pos = WHITESPACE_REGEX.match(self._text, end).end()
+            if self._text[range_pos:range_pos + 1] == '-':
+                kind, value, range_end = self._scan(range_pos + 1)
+                if kind == 'number':
+                    number = (number, convert_number([value]))
+                    end = range_end
+            values.append(number)
+        elif kind == 'string':
+            start = end - len(value)
+            match = DATE_REGEX.match(value, 1)
+            if not match is None \
+               and value[match.end():match.end() + 1] == '"':
+                date_string = value[1:match.end()]
+                try:
+                    value = parse_date(date_string)
+                except ValueError:
+                    value = date_string
+                end = start + match.end() + 1
+            else:
+                value = value[1:-1]
+            values.append(value)
+        elif kind == 'url':
+            values.append(value)
+        elif kind == 'identifier' and value.lower() in ('true', 'false'):
+            values.append(value.lower() == 'true')
+        else:
+            # Empty value.
+            end = pos
+        return end
+
+
+class OrderParser(_Parser):
+    """
+    Native CQL order criteria parser.
+    """
+    operators = {'~' : (1, and_),
+                 }
+
+    def _scan_operator(self, pos):
+        kind, value, end = self._scan(pos)
+        if kind == 'symbol' and value == '~':
+            op = value
+        else:
+            op = None
+        return op, end
+
+    def _parse_criterion(self, pos):
+        name, pos = self._expect(pos, 'identifier')
+        if ORDER_IDENTIFIER_REGEX.match(name) is None:
+            raise ParseException(self._text, pos, 'Invalid attribute name')
+        pos = self._expect(pos, 'symbol', ':')[1]
+        match = ORDER_DIRECTION_REGEX.match(self._text, pos)
+        if match is None:
+            raise ParseException(self._text, pos, 'Expected direction')
+        spec = OrderCriterionConverter.make_spec(name, match.group(1))
+        return spec, match.end()
+
+
+def parse_filter(query_string):
+    """
+    Parses the given filter criteria string.
+    """
+    return FilterParser(query_string).parse()
+
+
+def parse_order(criteria_string):
+    """
+    Parses the given order criteria string.
+    """
+    return OrderParser(criteria_string).parse()
@@ -11,6 +11,7 @@ from everest.querying.operators import ASCENDING
 from everest.querying.operators import DESCENDING
 from everest.querying.specifications import asc
 from everest.querying.specifications import desc
+from operator import and_
 from pyparsing import Combine
 from pyparsing import Group
 from pyparsing import Literal
@@ -36,30 +37,37 @@ direction = oneOf("asc desc").setName('direction')
 BINARY = 2
 
 class CriterionConverter(object):
+    """
+    Converts parsed criteria to order specifications.
+
+    The converter is shared by all CQL parser engines.
+    """
     spec_map = {ASCENDING.name:asc,
                 DESCENDING.name:desc}
 
     @classmethod
     def convert(cls, seq):
         crit = seq[0]
-        name = cls.__prepare_identifier(crit.name)
-        op_name = cls.__prepare_identifier(crit.operator)
-        return cls.__make_spec(name, op_name)
+        return cls.make_spec(crit.name, crit.operator)
 
     @classmethod
-    def __prepare_identifier(cls, name):
-        return identifier_from_slug(name)
+    def make_spec(cls, name, operator):
+        """
+        Creates an order specification from the given (slug) attribute name
+        and sort direction.
+        """
+        attr_name = cls.__prepare_identifier(name)
+        op_name = cls.__prepare_identifier(operator)
+        spec_gen = cls.spec_map[op_name]
+        return spec_gen(attr_name)
 
     @classmethod
-    def __make_spec(cls, name, op_name):
-        spec_gen = cls.spec_map[op_name]
-        return spec_gen(name)
+    def __prepare_identifier(cls, name):
+        return identifier_from_slug(name)
 
 
 def convert_junction(seq):
-    left_spec = seq[0][0]
-    right_spec = seq[0][-1]
-    return left_spec & right_spec
+    return reduce(and_, seq[0][::2])
 
 
 criterion = Group(identifier('name') + colon.suppress() + \
@@ -63,11 +63,31 @@ __all__ = ['CompositeFilterSpecification',
            ]
 
 
+def _freeze_value(value):
+    # Returns a hashable equivalent of the given (criterion) value. Lists,
+    # sets and dictionaries are converted to tuples and frozen sets.
+    try:
+        hash(value)
+    except TypeError:
+        if isinstance(value, (list, tuple)):
+            value = tuple([_freeze_value(item) for item in value])
+        elif isinstance(value, (set, frozenset)):
+            value = frozenset([_freeze_value(item) for item in value])
+        elif isinstance(value, dict):
+            value = frozenset([(key, _freeze_value(item))
+                               for (key, item) in value.iteritems()])
+        else:
+            raise
+    return value
+
+
 class FilterSpecification(Specification):
     """
     Abstract base class for all filter specifications.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         if self.__class__ is FilterSpecification:
             raise NotImplementedError('Abstract class')
@@ -100,6 +120,8 @@ class LeafFilterSpecification(FilterSpecification): # still abstract pylint: dis
     specification tree.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         if self.__class__ is LeafFilterSpecification:
             raise NotImplementedError('Abstract class')
@@ -114,6 +136,8 @@ class CriterionFilterSpecification(LeafFilterSpecification):
     Abstract base class for specifications representing filter criteria.
     """
 
+    __slots__ = ('__attr_name', '__attr_value')
+
     def __init__(self, attr_name, attr_value):
         """
         Constructs a filter specification for a query criterion.
@@ -122,7 +146,9 @@ class CriterionFilterSpecification(LeafFilterSpecification):
         :type operator: :class:`everest.querying.operators.Operator`
         :param attr_name: the candidate's attribute name
         :type attr_name: str
-        :param attr_value: the value that satisfies the specification
+        :param attr_value: the value that satisfies the specification; since
+          specifications are shared, this must not be modified after
+          construction
         :type from_value: object
         """
         if self.__class__ is CriterionFilterSpecification:
@@ -133,12 +159,17 @@ class CriterionFilterSpecification(LeafFilterSpecification):
 
     def __eq__(self, other):
         return (isinstance(other, CriterionFilterSpecification)
+                and self.operator is other.operator
                 and self.attr_name == other.attr_name
                 and self.attr_value == other.attr_value)
 
     def __ne__(self, other):
         return not (self == other)
 
+    def __hash__(self):
+        return hash((self.operator, self.__attr_name,
+                     _freeze_value(self.__attr_value)))
+
     def __str__(self):
         str_format = '<%s op_name: %s, attr_name: %s, attr_value: %s>'
         params = (self.__class__.__name__,
@@ -171,6 +202,8 @@ class CompositeFilterSpecification(FilterSpecification):
     specifications.
     """
 
+    __slots__ = ('__left_spec', '__right_spec')
+
     def __init__(self, left_spec, right_spec):
         """
         Constructs a CompositeFilterSpecification
@@ -199,6 +232,9 @@ class CompositeFilterSpecification(FilterSpecification):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __hash__(self):
+        return hash((self.operator, self.__left_spec, self.__right_spec))
+
     def accept(self, visitor):
         self.left_spec.accept(visitor)
         self.right_spec.accept(visitor)
@@ -222,6 +258,8 @@ class ConjunctionFilterSpecification(CompositeFilterSpecification):
     Concrete Conjunction specification.
     """
 
+    __slots__ = ()
+
     operator = CONJUNCTION
 
 
@@ -230,6 +268,8 @@ class DisjunctionFilterSpecification(CompositeFilterSpecification):
     Concrete disjuction specification.
     """
 
+    __slots__ = ()
+
     operator = DISJUNCTION
 
 
@@ -238,6 +278,8 @@ class NegationFilterSpecification(FilterSpecification):
     Concrete negation specification.
     """
 
+    __slots__ = ('__wrapped_spec',)
+
     operator = NEGATION
 
     def __init__(self, wrapped_spec):
@@ -259,6 +301,9 @@ class NegationFilterSpecification(FilterSpecification):
         """Inequality operator"""
         return not (self == other)
 
+    def __hash__(self):
+        return hash((self.operator, self.__wrapped_spec))
+
     def __str__(self):
         str_format = '<%s wrapped_spec: %s>'
         params = (self.__class__.__name__, self.wrapped_spec)
@@ -282,6 +327,8 @@ class ValueStartsWithFilterSpecification(CriterionFilterSpecification):
     Concrete value starts with specification
     """
 
+    __slots__ = ()
+
     operator = STARTS_WITH
 
 
@@ -290,6 +337,8 @@ class ValueEndsWithFilterSpecification(CriterionFilterSpecification):
     Concrete value ends with specification
     """
 
+    __slots__ = ()
+
     operator = ENDS_WITH
 
 
@@ -298,6 +347,8 @@ class ValueContainsFilterSpecification(CriterionFilterSpecification):
     Concrete value contains specification
     """
 
+    __slots__ = ()
+
     operator = CONTAINS
 
 
@@ -306,6 +357,8 @@ class ValueContainedFilterSpecification(CriterionFilterSpecification):
     Concrete value contained in a list of values specification
     """
 
+    __slots__ = ()
+
     operator = CONTAINED
 
 
@@ -314,6 +367,8 @@ class ValueEqualToFilterSpecification(CriterionFilterSpecification):
     Concrete value equal to specification
     """
 
+    __slots__ = ()
+
     operator = EQUAL_TO
 
 
@@ -322,6 +377,8 @@ class ValueGreaterThanFilterSpecification(CriterionFilterSpecification):
     Concrete value greater than specification
     """
 
+    __slots__ = ()
+
     operator = GREATER_THAN
 
 
@@ -330,6 +387,8 @@ class ValueLessThanFilterSpecification(CriterionFilterSpecification):
     Concrete value less than specification
     """
 
+    __slots__ = ()
+
     operator = LESS_THAN
 
 
@@ -339,6 +398,8 @@ class ValueGreaterThanOrEqualToFilterSpecification(
     Concrete value greater than or equal to specification
     """
 
+    __slots__ = ()
+
     operator = GREATER_OR_EQUALS
 
 
@@ -347,6 +408,8 @@ class ValueLessThanOrEqualToFilterSpecification(CriterionFilterSpecification):
     Concrete value less than or equal to specification
     """
 
+    __slots__ = ()
+
     operator = LESS_OR_EQUALS
 
 
@@ -355,6 +418,8 @@ class ValueInRangeFilterSpecification(CriterionFilterSpecification):
     Concrete specification for a range of values
     """
 
+    __slots__ = ()
+
     operator = IN_RANGE
 
     @property
@@ -416,6 +481,8 @@ class FilterSpecificationFactory(object):
 
 class OrderSpecification(Specification):
 
+    __slots__ = ()
+
     def __init__(self):
         if self.__class__ is OrderSpecification:
             raise NotImplementedError('Abstract class')
@@ -448,12 +515,24 @@ class OrderSpecification(Specification):
 
 class ObjectOrderSpecification(OrderSpecification): # pylint: disable=W0223
 
+    __slots__ = ('__attr_name',)
+
     def __init__(self, attr_name):
         if self.__class__ is ObjectOrderSpecification:
             raise NotImplementedError('Abstract class')
         OrderSpecification.__init__(self)
         self.__attr_name = attr_name
 
+    def __eq__(self, other):
+        return (other.__class__ is self.__class__
+                and self.attr_name == other.attr_name)
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash((self.__class__, self.__attr_name))
+
     def __str__(self):
         str_format = '<%s attr_name: %s>'
         params = (self.__class__.__name__, self.attr_name)
@@ -487,11 +566,15 @@ class ObjectOrderSpecification(OrderSpecification): # pylint: disable=W0223
 
 class AscendingOrderSpecification(ObjectOrderSpecification):
 
+    __slots__ = ()
+
     operator = ASCENDING
 
 
 class DescendingOrderSpecification(ObjectOrderSpecification):
 
+    __slots__ = ()
+
     operator = DESCENDING
 
 
@@ -500,6 +583,8 @@ class NaturalOrderSpecification(ObjectOrderSpecification):
     See http://www.codinghorror.com/blog/2007/12/sorting-for-humans-natural-sort-order.html
     """
 
+    __slots__ = ()
+
     operator = ASCENDING
 
     def _get_value(self, obj):
@@ -516,6 +601,8 @@ class NaturalOrderSpecification(ObjectOrderSpecification):
 
 class ConjunctionOrderSpecification(OrderSpecification):
 
+    __slots__ = ('__left', '__right')
+
     operator = CONJUNCTION
 
     def __init__(self, left, right):
@@ -523,6 +610,17 @@ class ConjunctionOrderSpecification(OrderSpecification):
         self.__left = left
         self.__right = right
 
+    def __eq__(self, other):
+        return (isinstance(other, ConjunctionOrderSpecification)
+                and self.left == other.left
+                and self.right == other.right)
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash((self.operator, self.__left, self.__right))
+
     def __str__(self):
         str_format = '<%s left: %s, right: %s>'
         params = (self.__class__.__name__, self.left, self.right)
@@ -6,12 +6,14 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Dec 19, 2011.
 """
+from everest.querying.base import CQL_PARSER_ENGINES
 from everest.querying.interfaces import IFilterSpecificationFactory
 from everest.querying.interfaces import IOrderSpecificationFactory
 from pyramid.threadlocal import get_current_registry
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['get_filter_specification_factory',
+__all__ = ['get_cql_parser_engine',
+           'get_filter_specification_factory',
            'get_order_specification_factory',
            ]
 
@@ -36,3 +38,16 @@ def get_order_specification_factory():
     """
     reg = get_current_registry()
     return reg.getUtility(IOrderSpecificationFactory)
+
+
+def get_cql_parser_engine():
+    """
+    Returns the name of the CQL parser engine selected with the "cql_parser"
+    setting.
+
+    :returns: one of the :class:`everest.querying.base.CQL_PARSER_ENGINES`
+        constants; defaults to the pyparsing engine.
+    """
+    reg = get_current_registry()
+    settings = reg.settings or {}
+    return settings.get('cql_parser', CQL_PARSER_ENGINES.PYPARSING)
@@ -8,7 +8,9 @@ Created on Jan 5, 2013.
 from everest.entities.utils import get_entity_class
 from everest.repositories.interfaces import IRepository
 from everest.resources.utils import get_collection_class
+from threading import Lock
 from zope.interface import implements # pylint: disable=E0611,F0401
+import time
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['Repository',
@@ -38,6 +40,9 @@ class Repository(object):
      * Create and hold a session factory which is used to create a 
        (thread-local) session. The session is used by the accessors to 
        load entities and resources from the repository. 
+     * Maintain a version counter and a last modification time for each
+       entity class which are updated each time changes to entities of
+       that class are committed.
     """
     implements(IRepository)
 
@@ -75,6 +80,11 @@ class Repository(object):
         #: The set of resources (collection classes) managed by this
         #: repository.
         self.__registered_resources = set()
+        # Maps entity classes to (version, last modification time) tuples.
+        self.__versions = {}
+        self.__version_lock = Lock()
+        # Time of initialization; used as default last modification time.
+        self.__initialization_time = None
 
     def get_aggregate(self, resource):
         """
@@ -138,10 +148,41 @@ class Repository(object):
         Initializes this repository.
         """
         self.__is_initializing = True
+        self.__initialization_time = time.time()
         self._initialize()
         self.__is_initializing = False
         self.__is_initialized = True
 
+    def get_version(self, entity_class):
+        """
+        Returns the version of the data stored in this repository for the
+        given entity class.
+
+        :returns: tuple containing the time this repository was initialized,
+          the number of commits that changed entities of the given class
+          since and the time of the last such commit (which defaults to the
+          initialization time).
+        """
+        version, last_modified = \
+                self.__versions.get(entity_class,
+                                    (0, self.__initialization_time))
+        return self.__initialization_time, version, last_modified
+
+    def increment_versions(self, entity_classes):
+        """
+        Increments the version counters of the given entity classes and
+        records the current time as their last modification time. This is
+        called by the repository implementations each time changes are
+        committed.
+
+        :param entity_classes: iterable of entity classes.
+        """
+        now = time.time()
+        with self.__version_lock:
+            for ent_cls in entity_classes:
+                version = self.__versions.get(ent_cls, (0, None))[0]
+                self.__versions[ent_cls] = (version + 1, now)
+
     @property
     def session_factory(self):
         if self.__session_factory is None:
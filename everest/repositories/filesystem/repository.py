@@ -6,6 +6,7 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 Created on Jan 7, 2013.
 """
 from everest.mime import CsvMime
+from everest.repositories.memory.ids import CounterEntityIdGenerator
 from everest.repositories.memory.repository import MemoryRepository
 from everest.repositories.memory.repository import MemorySessionFactory
 from everest.resources.io import dump_resource
@@ -15,6 +16,7 @@ from everest.resources.io import load_collection_from_url
 from everest.resources.staging import create_staging_collection
 from everest.resources.utils import get_collection_class
 from everest.resources.utils import get_member_class
+import json
 import os
 
 __all__ = ['FileSystemRepository',
@@ -28,10 +30,17 @@ class FileSystemRepository(MemoryRepository):
     On initialization, this repository loads resource representations from
     files into the root repository. Each commit operation writes the specified
     resource back to file.
+
+    With a :class:`everest.repositories.memory.ids.CounterEntityIdGenerator`,
+    the entity ID counters are also written to a file so that IDs of
+    deleted entities are not handed out again after a restart.
     """
     _configurables = MemoryRepository._configurables \
                      + ['directory', 'content_type']
 
+    #: Name of the file holding the entity ID counters.
+    id_counters_file_name = '.entity-id-counters.json'
+
     def __init__(self, name, aggregate_class=None,
                  join_transaction=True, autocommit=False):
         MemoryRepository.__init__(self, name,
@@ -53,11 +62,19 @@ class FileSystemRepository(MemoryRepository):
                 entity_classes_to_dump.add(info[0])
             for entity_cls in entity_classes_to_dump:
                 self.__dump_entities(entity_cls)
+            if isinstance(self.id_generator, CounterEntityIdGenerator) \
+               and len(entity_classes_to_dump) > 0:
+                self.__dump_id_counters()
 
     def _make_session_factory(self):
         return MemorySessionFactory(self)
 
     def __load_entities(self, entity_class):
+        if isinstance(self.id_generator, CounterEntityIdGenerator):
+            counter = \
+                self.__load_id_counters().get(self.__get_key(entity_class))
+            if not counter is None:
+                self.id_generator.register_id(entity_class, counter)
         coll_cls = get_collection_class(entity_class)
         fn = get_read_collection_path(coll_cls, self._config['content_type'],
                                       directory=self._config['directory'])
@@ -87,3 +104,27 @@ class FileSystemRepository(MemoryRepository):
         with stream:
             dump_resource(coll, stream,
                           content_type=self._config['content_type'])
+
+    def __load_id_counters(self):
+        fn = os.path.join(self._config['directory'],
+                          self.id_counters_file_name)
+        if os.path.isfile(fn):
+            with open(fn) as stream:
+                counters = json.load(stream)
+        else:
+            counters = {}
+        return counters
+
+    def __dump_id_counters(self):
+        # Counters of entity classes that were not loaded are kept.
+        counters = self.__load_id_counters()
+        counters.update([(self.__get_key(ent_cls), counter)
+                         for (ent_cls, counter)
+                         in self.id_generator.counters.iteritems()])
+        fn = os.path.join(self._config['directory'],
+                          self.id_counters_file_name)
+        with open(fn, 'w') as stream:
+            json.dump(counters, stream)
+
+    def __get_key(self, entity_class):
+        return '%s.%s' % (entity_class.__module__, entity_class.__name__)
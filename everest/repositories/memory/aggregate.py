@@ -8,7 +8,9 @@ Created on Jan 7, 2013.
 """
 from everest.entities.base import Aggregate
 from everest.exceptions import DuplicateException
+from everest.exceptions import UnsupportedOperationException
 from everest.querying.base import EXPRESSION_KINDS
+from everest.repositories.memory.querying import evaluate_columnar_query
 from everest.utils import get_filter_specification_visitor
 from everest.utils import get_order_specification_visitor
 
@@ -65,12 +67,35 @@ class MemoryAggregate(Aggregate):
            and not self._relationship.children is None:
             self._relationship.children.append(entity)
 
+    def add_all(self, entities, check_conflicts=True):
+        for ent in entities:
+            if not isinstance(ent, self.entity_class):
+                raise ValueError('Can only add entities of type "%s" to '
+                                 'this aggregate.' % self.entity_class)
+        self._session.add_all(self.entity_class, entities,
+                              check_conflicts=check_conflicts)
+        if not self._relationship is None \
+           and not self._relationship.children is None:
+            self._relationship.children.extend(entities)
+
     def remove(self, entity):
         self._session.remove(self.entity_class, entity)
         if not self._relationship is None \
            and not self._relationship.children is None:
             self._relationship.children.remove(entity)
 
+    def remove_all(self, entities):
+        for ent in entities:
+            self._session.remove(self.entity_class, ent)
+        if not self._relationship is None \
+           and not self._relationship.children is None:
+            # Rebuild the children list in one pass instead of removing
+            # the entities one by one.
+            children = self._relationship.children
+            removed_ids = set([id(ent) for ent in entities])
+            children[:] = [ent for ent in children
+                           if not id(ent) in removed_ids]
+
     def update(self, entity, source_entity):
         # FIXME: We need a proper __getstate__ method here.
         entity.__dict__.update(
@@ -88,6 +113,24 @@ class MemoryAggregate(Aggregate):
         pass
 
     def __get_entities(self):
+        result = None
+        if self._relationship is None:
+            view = self._session.get_columnar_view(self.entity_class)
+            if not view is None:
+                # Evaluate the query on the columns; fall back to evaluating
+                # it on the entities if that is not possible.
+                try:
+                    result = evaluate_columnar_query(view,
+                                                     self._filter_spec,
+                                                     self._order_spec,
+                                                     self._slice_key)
+                except UnsupportedOperationException:
+                    pass
+        if result is None:
+            result = self.__get_entities_from_objects()
+        return result
+
+    def __get_entities_from_objects(self):
         if self._relationship is None:
             ents = list(self._session.iterator(self.entity_class))
         else:
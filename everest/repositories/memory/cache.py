@@ -6,11 +6,16 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Feb 26, 2013.
 """
+from array import array
+from collections import OrderedDict
+from decimal import Decimal
 from weakref import WeakValueDictionary
-from everest.entities.utils import new_entity_id
+import datetime
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['EntityCache',
+__all__ = ['ColumnarEntityCache',
+           'ColumnarEntityCacheView',
+           'EntityCache',
            'EntityCacheManager',
            ]
 
@@ -29,9 +34,11 @@ class EntityCache(object):
         """
         #
         self.__allow_none_id = allow_none_id
-        # List of cached entities. This is the only place we are holding a
-        # real reference to the entity.
-        self.__entities = []
+        # Ordered map of object IDs to cached entities. This is the only
+        # place we are holding a real reference to the entity; the map
+        # preserves the insertion order and allows for constant time
+        # removal.
+        self.__entities = OrderedDict()
         # Dictionary mapping entity IDs to entities for fast lookup by ID.
         self.__id_map = WeakValueDictionary()
         # Dictionary mapping entity slugs to entities for fast lookup by slug.
@@ -66,18 +73,21 @@ class EntityCache(object):
     def has_slug(self, entity_slug):
         return entity_slug in self.__slug_map
 
-    def add(self, entity):
+    def add(self, entity, check_conflicts=True):
         """
         Adds the given entity to this cache.
         
         :param entity: Entity to add.
         :type entity: Object implementing :class:`everest.interfaces.IEntity`.
+        :param bool check_conflicts: If this is set to `False`, the entity
+          is not checked for a duplicate ID or slug; a duplicate entity
+          silently replaces the cached one in the ID and slug maps.
         :raises ValueError: If the ID of the entity to add is ``None``.
         """
         # For certain use cases (e.g., staging), we do not want the entity to
         # be added to have an ID yet.
         if not entity.id is None:
-            if entity.id in self.__id_map:
+            if check_conflicts and entity.id in self.__id_map:
                 raise ValueError('Duplicate entity ID "%s".' % entity.id)
             self.__id_map[entity.id] = entity
         elif not self.__allow_none_id:
@@ -86,10 +96,10 @@ class EntityCache(object):
         # value of other (possibly not yet initialized) attributes which is
         # why we can not always assume it is available at this point.
         if not entity.slug is None:
-            if entity.slug in self.__slug_map:
+            if check_conflicts and entity.slug in self.__slug_map:
                 raise ValueError('Duplicate entity slug "%s".' % entity.slug)
             self.__slug_map[entity.slug] = entity
-        self.__entities.append(entity)
+        self.__entities[id(entity)] = entity
 
     def remove(self, entity):
         """
@@ -102,11 +112,13 @@ class EntityCache(object):
         """
         if entity.id is None:
             raise ValueError('Entity ID must not be None.')
-        del self.__id_map[entity.id]
+        # The given entity may be a different instance with the same ID
+        # than the cached entity.
+        cached_entity = self.__id_map.pop(entity.id)
         # We may not have the slug in the slug map because it might not have
         # been available by the time the entity was added.
         self.__slug_map.pop(entity.slug, None)
-        self.__entities.remove(entity)
+        del self.__entities[id(cached_entity)]
 
     def replace(self, entity):
         """
@@ -129,16 +141,439 @@ class EntityCache(object):
         Returns an iterator over all entities in this cache in the order they
         were added.
         """
-        return iter(self.__entities)
+        return self.__entities.itervalues()
+
+
+class ColumnarEntityCache(object):
+    """
+    Compact cache for entities that only have terminal attributes.
+
+    Instead of holding the entity objects, the cache stores the values of
+    the public entity attributes in one column per attribute; integer and
+    float columns are kept in typed arrays. Entities are materialized on
+    demand, so each lookup returns a new entity instance.
+
+    Supports the same operations as :class:`EntityCache`. Additionally, the
+    columns and rows can be accessed directly for vectorized evaluation of
+    queries.
+    """
+    #: Value types that can be stored in a columnar cache.
+    terminal_types = (type(None), bool, int, long, float, basestring,
+                      datetime.date, datetime.time, datetime.timedelta,
+                      Decimal)
+    #: Typed array type codes for the values of exactly these types.
+    array_type_codes = {int : 'l', float : 'd'}
+
+    def __init__(self, entity_class):
+        """
+        :param entity_class: Class of the entities to cache.
+        """
+        self.__entity_class = entity_class
+        # Names of the public entity attributes; determined by the first
+        # entity added.
+        self.__attribute_names = None
+        # Maps attribute names to value columns.
+        self.__columns = {}
+        # Row liveness flags; rows of removed entities are kept until the
+        # columns are compacted.
+        self.__live = bytearray()
+        self.__dead_count = 0
+        # Dictionary mapping entity IDs to rows for fast lookup by ID.
+        self.__id_map = {}
+        # Dictionary mapping entity slugs to rows for fast lookup by slug.
+        self.__slug_map = {}
+
+    def get_by_id(self, entity_id):
+        """
+        Performs a lookup of an entity by its ID.
+        
+        :param int entity_id: entity ID.
+        :return: entity found or ``None``.
+        """
+        row = self.__id_map.get(entity_id)
+        return None if row is None else self.materialize(row)
+
+    def has_id(self, entity_id):
+        """
+        Checks if this entity cache holds an entity with the given ID.
+        
+        :return: Boolean result of the check.
+        """
+        return entity_id in self.__id_map
+
+    def get_by_slug(self, entity_slug):
+        """
+        Performs a lookup of an entity by its slug.
+        
+        :param str entity_id: entity slug.
+        :return: entity found or ``None``.
+        """
+        row = self.__slug_map.get(entity_slug)
+        return None if row is None else self.materialize(row)
+
+    def has_slug(self, entity_slug):
+        return entity_slug in self.__slug_map
+
+    def add(self, entity, check_conflicts=True):
+        """
+        Adds the given entity to this cache.
+
+        :param entity: Entity to add.
+        :type entity: Object implementing :class:`everest.interfaces.IEntity`.
+        :param bool check_conflicts: If this is set to `False`, the entity
+          is not checked for a duplicate ID or slug.
+        :raises ValueError: If the ID of the entity to add is ``None``, if
+          the entity has non-terminal attribute values or if it does not
+          have the same attributes as the entities already in the cache.
+        """
+        if entity.id is None:
+            raise ValueError('Entity ID must not be None.')
+        if check_conflicts and entity.id in self.__id_map:
+            raise ValueError('Duplicate entity ID "%s".' % entity.id)
+        slug = entity.slug
+        if check_conflicts and not slug is None and slug in self.__slug_map:
+            raise ValueError('Duplicate entity slug "%s".' % slug)
+        data = dict([(attr_name, attr_value)
+                     for attr_name, attr_value in entity.__dict__.iteritems()
+                     if not attr_name.startswith('_')])
+        if self.__attribute_names is None:
+            self.__initialize_columns(data)
+        elif len(data) != len(self.__attribute_names) \
+             or not all([attr_name in data
+                         for attr_name in self.__attribute_names]):
+            raise ValueError('Entity attributes %s do not match the '
+                             'columns of the cache.' % sorted(data.keys()))
+        for attr_name, attr_value in data.iteritems():
+            if not isinstance(attr_value, self.terminal_types):
+                raise ValueError('Can not store value of non-terminal '
+                                 'attribute "%s" in columnar cache.'
+                                 % attr_name)
+        row = len(self.__live)
+        for attr_name, attr_value in data.iteritems():
+            self.__append_value(attr_name, attr_value)
+        self.__live.append(1)
+        self.__id_map[entity.id] = row
+        if not slug is None:
+            self.__slug_map[slug] = row
+
+    def remove(self, entity):
+        """
+        Removes the given entity from this cache.
+        
+        :param entity: Entity to remove.
+        :type entity: Object implementing :class:`everest.interfaces.IEntity`.
+        :raises KeyError: If the given entity is not in this cache.
+        :raises ValueError: If the ID of the given entity is `None`.
+        """
+        if entity.id is None:
+            raise ValueError('Entity ID must not be None.')
+        row = self.__id_map.pop(entity.id)
+        # Look up the slug of the cached entity since the slug of the given
+        # entity may have changed.
+        slug = self.materialize(row).slug
+        if self.__slug_map.get(slug) == row:
+            del self.__slug_map[slug]
+        self.__live[row] = 0
+        self.__dead_count += 1
+        if self.__dead_count > len(self.__id_map):
+            self.__compact()
+
+    def replace(self, entity):
+        """
+        Replaces the current entity that has the same ID as the given new
+        entity with the latter.
+        
+        :param entity: Entity to replace.
+        :type entity: Object implementing :class:`everest.interfaces.IEntity`.
+        :raises KeyError: If the given entity is not in this cache.
+        :raises ValueError: If the ID of the given entity is `None`.
+        """
+        if entity.id is None:
+            raise ValueError('Entity ID must not be None.')
+        self.remove(entity)
+        self.add(entity)
+
+    def iterator(self):
+        """
+        Returns an iterator over all entities in this cache in the order they
+        were added. The entities are materialized on demand.
+        """
+        return (self.materialize(row) for row in self.row_iterator())
+
+    def row_iterator(self):
+        """
+        Returns an iterator over the rows of all entities in this cache in
+        the order they were added.
+        """
+        return (row for (row, is_live) in enumerate(self.__live) if is_live)
+
+    def get_row_by_id(self, entity_id):
+        """
+        Returns the row for the entity with the given ID or `None`.
+        """
+        return self.__id_map.get(entity_id)
+
+    def get_row_by_slug(self, entity_slug):
+        """
+        Returns the row for the entity with the given slug or `None`.
+        """
+        return self.__slug_map.get(entity_slug)
+
+    def get_column(self, attribute_name):
+        """
+        Returns the column holding the values of the given attribute for
+        all rows (including the rows of removed entities).
+
+        :raises KeyError: If the cache does not have a column for the given
+          attribute.
+        """
+        return self.__columns[attribute_name]
+
+    @property
+    def attribute_names(self):
+        """
+        Names of the cached entity attributes or `None` if no entity has
+        been added yet.
+        """
+        return self.__attribute_names
+
+    @property
+    def live_flags(self):
+        """
+        Flags indicating for each row if it holds a cached entity.
+        """
+        return self.__live
+
+    def materialize(self, row):
+        """
+        Creates a new entity instance from the values in the given row.
+        """
+        entity = object.__new__(self.__entity_class)
+        columns = self.__columns
+        entity.__dict__.update([(attr_name, columns[attr_name][row])
+                                for attr_name in self.__attribute_names])
+        return entity
+
+    def __initialize_columns(self, data):
+        self.__attribute_names = tuple(sorted(data.keys()))
+        for attr_name, attr_value in data.iteritems():
+            type_code = self.array_type_codes.get(type(attr_value))
+            if type_code is None:
+                column = []
+            else:
+                column = array(type_code)
+            self.__columns[attr_name] = column
+
+    def __append_value(self, attr_name, attr_value):
+        column = self.__columns[attr_name]
+        if isinstance(column, array) \
+           and self.array_type_codes.get(type(attr_value)) != column.typecode:
+            # The value does not fit into the typed array; fall back to a
+            # list for this column.
+            column = self.__columns[attr_name] = column.tolist()
+        column.append(attr_value)
+
+    def __compact(self):
+        # Drops the rows of removed entities from all columns.
+        live = self.__live
+        for attr_name, column in self.__columns.items():
+            values = [value for (value, is_live) in zip(column, live)
+                      if is_live]
+            if isinstance(column, array):
+                values = array(column.typecode, values)
+            self.__columns[attr_name] = values
+        row_map = {}
+        new_row = 0
+        for row, is_live in enumerate(live):
+            if is_live:
+                row_map[row] = new_row
+                new_row += 1
+        self.__id_map = dict([(ent_id, row_map[row])
+                              for (ent_id, row) in self.__id_map.iteritems()])
+        self.__slug_map = dict([(slug, row_map[row])
+                                for (slug, row)
+                                in self.__slug_map.iteritems()])
+        self.__live = bytearray([1]) * new_row
+        self.__dead_count = 0
+
+
+class ColumnarEntityCacheView(object):
+    """
+    Session level entity cache for entities that are held in a
+    :class:`ColumnarEntityCache` by the repository.
+
+    Entities are materialized from the repository cache when they are first
+    accessed and are then held by the view. Entities added to or removed
+    from the view do not affect the repository cache.
+    """
+    def __init__(self, columnar_cache, register):
+        """
+        :param columnar_cache: Repository level columnar entity cache.
+        :type columnar_cache: :class:`ColumnarEntityCache`
+        :param register: Callable that is passed each entity materialized
+          from the repository cache and returns the entity to hold.
+        """
+        self.__columnar_cache = columnar_cache
+        self.__register = register
+        # Dictionary mapping entity IDs to materialized and added entities.
+        self.__id_map = {}
+        # Dictionary mapping entity slugs to materialized and added entities.
+        self.__slug_map = {}
+        # Ordered map of object IDs to added entities.
+        self.__added = OrderedDict()
+        # Maps the IDs of the entities from the repository cache that were
+        # removed to the removed entities. This keeps the removed entities
+        # alive until the session is committed.
+        self.__removed = {}
+
+    @property
+    def columnar_cache(self):
+        """
+        The repository level columnar entity cache.
+        """
+        return self.__columnar_cache
+
+    @property
+    def has_changes(self):
+        """
+        Flag indicating if entities were added to or removed from this view.
+        """
+        return len(self.__added) > 0 or len(self.__removed) > 0
+
+    def get_by_id(self, entity_id):
+        ent = self.__id_map.get(entity_id)
+        if ent is None and not entity_id in self.__removed:
+            row = self.__columnar_cache.get_row_by_id(entity_id)
+            if not row is None:
+                ent = self.__materialize(row)
+        return ent
+
+    def has_id(self, entity_id):
+        return entity_id in self.__id_map \
+               or (not entity_id in self.__removed
+                   and self.__columnar_cache.has_id(entity_id))
+
+    def get_by_slug(self, entity_slug):
+        ent = self.__slug_map.get(entity_slug)
+        if ent is None:
+            row = self.__columnar_cache.get_row_by_slug(entity_slug)
+            if not row is None:
+                ent = self.get_by_id(self.__get_row_id(row))
+        return ent
+
+    def has_slug(self, entity_slug):
+        return not self.get_by_slug(entity_slug) is None
+
+    def add(self, entity, check_conflicts=True):
+        if entity.id is None:
+            raise ValueError('Entity ID must not be None.')
+        if check_conflicts and self.has_id(entity.id):
+            raise ValueError('Duplicate entity ID "%s".' % entity.id)
+        slug = entity.slug
+        if check_conflicts and not slug is None and self.has_slug(slug):
+            raise ValueError('Duplicate entity slug "%s".' % slug)
+        self.__id_map[entity.id] = entity
+        if not slug is None:
+            self.__slug_map[slug] = entity
+        self.__added[id(entity)] = entity
+
+    def remove(self, entity):
+        if entity.id is None:
+            raise ValueError('Entity ID must not be None.')
+        cached_entity = self.get_by_id(entity.id)
+        if cached_entity is None:
+            raise KeyError(entity.id)
+        del self.__id_map[entity.id]
+        self.__slug_map.pop(cached_entity.slug, None)
+        if self.__added.pop(id(cached_entity), None) is None:
+            self.__removed[entity.id] = cached_entity
+
+    def replace(self, entity):
+        if entity.id is None:
+            raise ValueError('Entity ID must not be None.')
+        self.remove(entity)
+        self.add(entity)
+
+    def iterator(self):
+        """
+        Returns an iterator over all entities in this view. The entities
+        from the repository cache come first, followed by the added
+        entities.
+        """
+        for row in self.__columnar_cache.row_iterator():
+            ent = self.get_row_entity(row)
+            if not ent is None:
+                yield ent
+        for ent in self.__added.values():
+            yield ent
+
+    def get_overridden_rows(self):
+        """
+        Returns a dictionary mapping the rows of the repository cache for
+        which this view holds an entity to that entity. The rows of
+        entities that were removed from this view are mapped to `None`.
+        """
+        row_map = {}
+        cache = self.__columnar_cache
+        for entity_id in self.__removed:
+            row = cache.get_row_by_id(entity_id)
+            if not row is None:
+                row_map[row] = None
+        for ent in self.__id_map.itervalues():
+            if not id(ent) in self.__added:
+                row = cache.get_row_by_id(ent.id)
+                if not row is None:
+                    row_map[row] = ent
+        return row_map
+
+    def get_added_entities(self):
+        """
+        Returns a list of the entities added to this view.
+        """
+        return self.__added.values()
+
+    def get_row_entity(self, row):
+        """
+        Returns the entity for the given row of the repository cache or
+        `None` if it was removed from this view.
+        """
+        entity_id = self.__get_row_id(row)
+        if entity_id in self.__removed:
+            ent = None
+        else:
+            ent = self.__id_map.get(entity_id)
+            if ent is None:
+                ent = self.__materialize(row)
+        return ent
+
+    def __get_row_id(self, row):
+        return self.__columnar_cache.get_column('id')[row]
+
+    def __materialize(self, row):
+        ent = self.__register(self.__columnar_cache.materialize(row))
+        self.__id_map[ent.id] = ent
+        slug = ent.slug
+        if not slug is None:
+            self.__slug_map[slug] = ent
+        return ent
 
 
 class EntityCacheManager(object):
     """
     Manager for entity caches.
     """
-    def __init__(self, repository, loader=None):
+    def __init__(self, repository, loader=None, cache_factory=None):
+        """
+        :param repository: Repository to manage entity caches for.
+        :param loader: Callable that returns the entities to populate the
+          cache for a given entity class with. Defaults to the cache loader
+          configured for the repository.
+        :param cache_factory: Callable that creates a new entity cache for
+          a given entity class. Defaults to :class:`EntityCache`.
+        """
         self.__repository = repository
         self.__loader = loader
+        self.__cache_factory = cache_factory
         self.__cache_map = {}
 
     def reset(self):
@@ -154,14 +589,21 @@ class EntityCacheManager(object):
         return cache
 
     def _initialize_cache(self, ent_cls):
-        cache = self.__cache_map[ent_cls] = EntityCache()
+        if self.__cache_factory is None:
+            cache = EntityCache()
+        else:
+            cache = self.__cache_factory(ent_cls)
+        self.__cache_map[ent_cls] = cache
         # If we did not receive a cache loader at initialization, we use the
         # one the repository provides as a default.
         loader = \
             self.__loader or self.__repository.configuration['cache_loader']
         if not loader is None:
+            id_generator = self.__repository.id_generator
             for ent in loader(ent_cls):
                 if ent.id is None:
-                    ent.id = new_entity_id()
+                    ent.id = id_generator.new_id(ent_cls)
+                else:
+                    id_generator.register_id(ent_cls, ent.id)
                 cache.add(ent)
         return cache
@@ -0,0 +1,148 @@
+"""
+Entity ID generators.
+
+This file is part of the everest project.
+See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
+
+Created on Oct 18, 2026.
+"""
+from everest.entities.utils import new_entity_id
+from threading import Lock
+import time
+import uuid
+
+__docformat__ = 'reStructuredText en'
+__all__ = ['CounterEntityIdGenerator',
+           'ENTITY_ID_GENERATORS',
+           'EntityIdGenerator',
+           'TimeOrderedEntityIdGenerator',
+           'Uuid1EntityIdGenerator',
+           ]
+
+
+class EntityIdGenerator(object):
+    """
+    Abstract base class for entity ID generators.
+
+    Memory and file system repositories use an ID generator to assign IDs
+    to entities that are added or loaded without an ID.
+    """
+    #: The name of the ID generation strategy. To be specified in derived
+    #: classes.
+    name = None
+
+    def new_id(self, entity_class):
+        """
+        Returns a new ID for an entity of the given class.
+        """
+        raise NotImplementedError('Abstract method.')
+
+    def register_id(self, entity_class, entity_id):
+        """
+        Notifies the generator of an ID that is in use for an entity of the
+        given class. Generators must not hand out registered IDs.
+        """
+        pass
+
+
+class Uuid1EntityIdGenerator(EntityIdGenerator):
+    """
+    Generates UUID strings which are sortable by creation time (see
+    :func:`everest.entities.utils.new_entity_id`). This is the default.
+    """
+    name = 'uuid1'
+
+    def new_id(self, entity_class):
+        return new_entity_id()
+
+
+class CounterEntityIdGenerator(EntityIdGenerator):
+    """
+    Generates consecutive integer IDs, counting separately for each entity
+    class.
+
+    Each counter starts after the largest integer ID registered for its
+    entity class.
+    """
+    name = 'counter'
+
+    def __init__(self):
+        # Maps entity classes to the last ID handed out or registered.
+        self.__counters = {}
+        self.__lock = Lock()
+
+    def new_id(self, entity_class):
+        with self.__lock:
+            entity_id = self.__counters.get(entity_class, 0) + 1
+            self.__counters[entity_class] = entity_id
+        return entity_id
+
+    def register_id(self, entity_class, entity_id):
+        if isinstance(entity_id, (int, long)) \
+           and not isinstance(entity_id, bool):
+            with self.__lock:
+                if entity_id > self.__counters.get(entity_class, 0):
+                    self.__counters[entity_class] = entity_id
+
+    @property
+    def counters(self):
+        """
+        Dictionary mapping entity classes to the last ID handed out or
+        registered for them.
+        """
+        with self.__lock:
+            return self.__counters.copy()
+
+
+class TimeOrderedEntityIdGenerator(EntityIdGenerator):
+    """
+    Generates compact 64 bit integer IDs which are sortable by creation
+    time.
+
+    The IDs are composed of a 41 bit millisecond timestamp, a 10 bit node
+    number and a 12 bit sequence number that is incremented for IDs
+    generated within the same millisecond. If the sequence is exhausted or
+    the clock goes backwards, the timestamp is advanced logically.
+    """
+    name = 'time_ordered'
+
+    #: Start of the timestamps (2013-01-01T00:00:00Z) in milliseconds.
+    epoch = 1356998400000
+    node_bits = 10
+    sequence_bits = 12
+
+    def __init__(self, node=None):
+        """
+        :param int node: Node number for this generator. Defaults to the
+          lower bits of the hardware address (see :func:`uuid.getnode`).
+        """
+        if node is None:
+            node = uuid.getnode()
+        self.__node = node & ((1 << self.node_bits) - 1)
+        self.__last_timestamp = 0
+        self.__sequence = 0
+        self.__lock = Lock()
+
+    def new_id(self, entity_class):
+        timestamp = int(time.time() * 1000) - self.epoch
+        with self.__lock:
+            if timestamp > self.__last_timestamp:
+                self.__last_timestamp = timestamp
+                self.__sequence = 0
+            else:
+                self.__sequence += 1
+                if self.__sequence >> self.sequence_bits:
+                    self.__last_timestamp += 1
+                    self.__sequence = 0
+            entity_id = (self.__last_timestamp
+                         << (self.node_bits + self.sequence_bits)) \
+                        | (self.__node << self.sequence_bits) \
+                        | self.__sequence
+        return entity_id
+
+
+#: Maps strategy names to entity ID generator classes.
+ENTITY_ID_GENERATORS = dict([(gen_cls.name, gen_cls)
+                             for gen_cls in (Uuid1EntityIdGenerator,
+                                             CounterEntityIdGenerator,
+                                             TimeOrderedEntityIdGenerator)])
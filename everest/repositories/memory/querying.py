@@ -5,16 +5,41 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Jan 7, 2013.
 """
+from everest.exceptions import UnsupportedOperationException
 from everest.querying.filtering import FilterSpecificationVisitor
 from everest.querying.interfaces import IFilterSpecificationVisitor
 from everest.querying.interfaces import IOrderSpecificationVisitor
+from everest.querying.operators import CONTAINED
+from everest.querying.operators import CONTAINS
+from everest.querying.operators import DESCENDING
+from everest.querying.operators import ENDS_WITH
+from everest.querying.operators import EQUAL_TO
+from everest.querying.operators import GREATER_OR_EQUALS
+from everest.querying.operators import GREATER_THAN
+from everest.querying.operators import IN_RANGE
+from everest.querying.operators import LESS_OR_EQUALS
+from everest.querying.operators import LESS_THAN
+from everest.querying.operators import STARTS_WITH
 from everest.querying.ordering import OrderSpecificationVisitor
+from everest.querying.specifications import NaturalOrderSpecification
+from everest.resources.interfaces import IResource
 from functools import partial
+from heapq import merge
+from operator import and_
+from operator import or_
+from weakref import WeakKeyDictionary
 from zope.interface import implements  # pylint: disable=E0611,F0401
+try:
+    import numpy # pylint: disable=F0401
+except ImportError:
+    numpy = None
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['ObjectFilterSpecificationVisitor',
+__all__ = ['ColumnarFilterSpecificationVisitor',
+           'ColumnarOrderSpecificationVisitor',
+           'ObjectFilterSpecificationVisitor',
            'ObjectOrderSpecificationVisitor',
+           'evaluate_columnar_query',
            ]
 
 
@@ -86,3 +111,396 @@ class ObjectOrderSpecificationVisitor(OrderSpecificationVisitor):
 
     def _desc_op(self, spec):
         return lambda entities: sorted(entities, cmp=spec.cmp)
+
+
+class _ColumnArrays(object):
+    """
+    Cache for the NumPy arrays built from the columns of a columnar entity
+    cache.
+
+    Rows are only ever appended to a column until the cache is compacted,
+    which replaces the column; an array is therefore valid as long as its
+    column is the same object and has the same length.
+    """
+    __instances = WeakKeyDictionary()
+
+    def __init__(self, columnar_cache):
+        self.__columnar_cache = columnar_cache
+        # Maps attribute names to (column, length, array) tuples.
+        self.__array_map = {}
+
+    @classmethod
+    def get(cls, columnar_cache):
+        arrays = cls.__instances.get(columnar_cache)
+        if arrays is None:
+            arrays = cls.__instances[columnar_cache] = cls(columnar_cache)
+        return arrays
+
+    def __getitem__(self, attribute_name):
+        """
+        Returns the array for the given attribute or `None` if the column
+        can not be converted to a NumPy array with a vectorizable type.
+        """
+        column = self.__columnar_cache.get_column(attribute_name)
+        entry = self.__array_map.get(attribute_name)
+        if entry is None or not entry[0] is column \
+           or entry[1] != len(column):
+            entry = self.__array_map[attribute_name] = \
+                            (column, len(column), self.__make_array(column))
+        return entry[2]
+
+    def live_flags(self):
+        """
+        Returns a boolean array with the liveness flags of all rows.
+        """
+        # The flags change in place, so we always copy them.
+        return numpy.frombuffer(str(self.__columnar_cache.live_flags),
+                                dtype=numpy.uint8).astype(bool)
+
+    def __make_array(self, column):
+        if hasattr(column, 'typecode'):
+            # Typed array; copy the buffer since the array may grow.
+            arr = numpy.frombuffer(column.tostring(),
+                                   dtype=numpy.dtype(column.typecode))
+        elif len(column) > 0 and all([type(value) is bool
+                                      for value in column]):
+            arr = numpy.array(column, dtype=bool)
+        elif all([isinstance(value, basestring) for value in column]):
+            try:
+                arr = numpy.array(column, dtype=numpy.unicode_)
+            except UnicodeDecodeError:
+                arr = None
+        else:
+            arr = None
+        return arr
+
+
+class ColumnarFilterSpecificationVisitor(FilterSpecificationVisitor):
+    """
+    Filter specification visitor building a row mask for the entities held
+    in a columnar entity cache.
+
+    The expression built by this visitor is a sequence of boolean flags
+    for all rows of the cache (including the rows of removed entities);
+    with NumPy, this is a boolean array. Criteria on typed number columns
+    and on string columns are evaluated with vectorized NumPy operations;
+    all other criteria are evaluated value by value on the columns, so no
+    entities need to be materialized.
+
+    :raises UnsupportedOperationException: For criteria on dotted or
+      unknown attributes and for criteria with resource values.
+    """
+
+    def __init__(self, columnar_cache, use_numpy=None):
+        """
+        :param columnar_cache: Columnar entity cache to build the row mask
+          for.
+        :type columnar_cache:
+          :class:`everest.repositories.memory.cache.ColumnarEntityCache`
+        :param bool use_numpy: Flag indicating if NumPy should be used.
+          Defaults to `True` if NumPy is installed.
+        """
+        FilterSpecificationVisitor.__init__(self)
+        if use_numpy is None:
+            use_numpy = not numpy is None
+        self.__columnar_cache = columnar_cache
+        self.__use_numpy = use_numpy
+
+    def _conjunction_op(self, spec, *expressions):
+        if self.__use_numpy:
+            mask = expressions[0] & expressions[1]
+        else:
+            mask = map(and_, expressions[0], expressions[1])
+        return mask
+
+    def _disjunction_op(self, spec, *expressions):
+        if self.__use_numpy:
+            mask = expressions[0] | expressions[1]
+        else:
+            mask = map(or_, expressions[0], expressions[1])
+        return mask
+
+    def _negation_op(self, spec, expression):
+        if self.__use_numpy:
+            mask = ~expression # pylint: disable=E1130
+        else:
+            mask = [not flag for flag in expression]
+        return mask
+
+    def _starts_with_op(self, spec):
+        return self.__make_mask(spec)
+
+    def _ends_with_op(self, spec):
+        return self.__make_mask(spec)
+
+    def _contains_op(self, spec):
+        return self.__make_mask(spec)
+
+    def _contained_op(self, spec):
+        return self.__make_mask(spec)
+
+    def _equal_to_op(self, spec):
+        return self.__make_mask(spec)
+
+    def _less_than_op(self, spec):
+        return self.__make_mask(spec)
+
+    def _less_than_or_equal_to_op(self, spec):
+        return self.__make_mask(spec)
+
+    def _greater_than_op(self, spec):
+        return self.__make_mask(spec)
+
+    def _greater_than_or_equal_to_op(self, spec):
+        return self.__make_mask(spec)
+
+    def _in_range_op(self, spec):
+        return self.__make_mask(spec)
+
+    def __make_mask(self, spec):
+        attr_name = spec.attr_name
+        if not attr_name in (self.__columnar_cache.attribute_names or ()) \
+           or IResource.providedBy(spec.attr_value): # pylint: disable=E1101
+            raise UnsupportedOperationException('Can not evaluate %s on '
+                                                'columns.' % spec)
+        mask = None
+        if self.__use_numpy:
+            arr = _ColumnArrays.get(self.__columnar_cache)[attr_name]
+            if not arr is None:
+                mask = self.__make_array_mask(arr, spec)
+        if mask is None:
+            column = self.__columnar_cache.get_column(attr_name)
+            apply_op = spec.operator.apply
+            ref_value = spec.attr_value
+            flags = (bool(apply_op(value, ref_value)) for value in column)
+            if self.__use_numpy:
+                mask = numpy.fromiter(flags, dtype=bool, count=len(column))
+            else:
+                mask = list(flags)
+        return mask
+
+    def __make_array_mask(self, arr, spec):
+        # Returns a vectorized mask or `None` if the criterion can not be
+        # vectorized for the given array.
+        op = spec.operator
+        if op in (CONTAINED, IN_RANGE):
+            ref_values = list(spec.attr_value)
+        else:
+            ref_values = [spec.attr_value]
+        kind = arr.dtype.kind
+        if kind in 'if':
+            is_valid = all([_is_number(value) for value in ref_values])
+            vectorized_ops = (EQUAL_TO, LESS_THAN, LESS_OR_EQUALS,
+                              GREATER_THAN, GREATER_OR_EQUALS, IN_RANGE,
+                              CONTAINED)
+        elif kind == 'U':
+            is_valid = all([isinstance(value, basestring)
+                            for value in ref_values])
+            if is_valid:
+                try:
+                    ref_values = [unicode(value) for value in ref_values]
+                except UnicodeDecodeError:
+                    is_valid = False
+            vectorized_ops = (EQUAL_TO, LESS_THAN, LESS_OR_EQUALS,
+                              GREATER_THAN, GREATER_OR_EQUALS, IN_RANGE,
+                              CONTAINED, STARTS_WITH, ENDS_WITH, CONTAINS)
+        elif kind == 'b':
+            is_valid = all([type(value) is bool for value in ref_values])
+            vectorized_ops = (EQUAL_TO, CONTAINED)
+        else:
+            is_valid = False
+        if not is_valid or not op in vectorized_ops:
+            mask = None
+        elif op is CONTAINED:
+            mask = numpy.in1d(arr, ref_values)
+        elif op is IN_RANGE:
+            mask = (arr >= ref_values[0]) & (arr <= ref_values[1])
+        elif op is STARTS_WITH:
+            mask = numpy.char.startswith(arr, ref_values[0])
+        elif op is ENDS_WITH:
+            mask = numpy.char.endswith(arr, ref_values[0])
+        elif op is CONTAINS:
+            mask = numpy.char.find(arr, ref_values[0]) >= 0
+        else:
+            # The comparison operators.
+            mask = op.apply(arr, ref_values[0])
+        return mask
+
+
+class ColumnarOrderSpecificationVisitor(OrderSpecificationVisitor):
+    """
+    Order specification visitor building the list of sort keys for the
+    entities held in a columnar entity cache.
+
+    The expression built by this visitor is a list of (attribute name,
+    descending flag) tuples, most significant key first.
+
+    :raises UnsupportedOperationException: For natural order
+      specifications and for specifications on dotted or unknown
+      attributes.
+    """
+
+    def __init__(self, columnar_cache):
+        """
+        :param columnar_cache: Columnar entity cache to build the sort keys
+          for.
+        :type columnar_cache:
+          :class:`everest.repositories.memory.cache.ColumnarEntityCache`
+        """
+        OrderSpecificationVisitor.__init__(self)
+        self.__columnar_cache = columnar_cache
+
+    def _conjunction_op(self, spec, *expressions):
+        return expressions[0] + expressions[1]
+
+    def _asc_op(self, spec):
+        return self.__make_keys(spec)
+
+    def _desc_op(self, spec):
+        return self.__make_keys(spec)
+
+    def __make_keys(self, spec):
+        if isinstance(spec, NaturalOrderSpecification) \
+           or not spec.attr_name in (self.__columnar_cache.attribute_names
+                                     or ()):
+            raise UnsupportedOperationException('Can not evaluate %s on '
+                                                'columns.' % spec)
+        return [(spec.attr_name, spec.operator is DESCENDING)]
+
+
+def evaluate_columnar_query(view, filter_spec=None, order_spec=None,
+                            slice_key=None, use_numpy=None):
+    """
+    Filters, orders and slices the entities in the given session view on a
+    columnar entity cache.
+
+    The specifications are evaluated on the columns of the repository
+    cache; only the entities in the requested slice are materialized.
+    Entities the view holds (because they were accessed, modified or
+    added in the session) are evaluated as objects.
+
+    :param view: Session view on a columnar entity cache.
+    :type view:
+      :class:`everest.repositories.memory.cache.ColumnarEntityCacheView`
+    :param slice_key: Slice to apply to the filtered and ordered entities.
+    :param bool use_numpy: Flag indicating if NumPy should be used.
+      Defaults to `True` if NumPy is installed.
+    :returns: Tuple holding the list of entities in the slice and the total
+      number of entities matching the filter specification.
+    :raises UnsupportedOperationException: If one of the specifications
+      can not be evaluated on the columns.
+    """
+    if use_numpy is None:
+        use_numpy = not numpy is None
+    cache = view.columnar_cache
+    if not filter_spec is None:
+        filter_visitor = \
+                ColumnarFilterSpecificationVisitor(cache, use_numpy=use_numpy)
+        filter_spec.accept(filter_visitor)
+        mask = filter_visitor.expression
+    else:
+        mask = None
+    if not order_spec is None:
+        order_visitor = ColumnarOrderSpecificationVisitor(cache)
+        order_spec.accept(order_visitor)
+        sort_keys = order_visitor.expression
+    else:
+        sort_keys = []
+    # Entities held by the view are evaluated as objects. They are
+    # positioned after the row they replace or, if they were added, after
+    # all rows.
+    overridden_rows = view.get_overridden_rows()
+    row_count = len(cache.live_flags)
+    candidates = [(row, ent) for (row, ent) in overridden_rows.iteritems()
+                  if not ent is None]
+    candidates.sort()
+    candidates.extend([(row_count + pos, ent)
+                       for (pos, ent)
+                       in enumerate(view.get_added_entities())])
+    if not filter_spec is None:
+        candidates = [(pos, ent) for (pos, ent) in candidates
+                      if filter_spec.is_satisfied_by(ent)]
+    items = None
+    if use_numpy:
+        rows = _find_rows_vectorized(cache, mask, overridden_rows)
+        if len(candidates) == 0:
+            sorted_rows = _sort_rows_vectorized(cache, rows, sort_keys)
+            if not sorted_rows is None:
+                if not slice_key is None:
+                    sorted_rows = sorted_rows[slice_key]
+                items = [(row, None) for row in sorted_rows.tolist()]
+    else:
+        rows = _find_rows(cache, mask, overridden_rows)
+    count = len(rows) + len(candidates)
+    if items is None:
+        if use_numpy:
+            rows = rows.tolist()
+        items = list(merge([(row, None) for row in rows], candidates))
+        for attr_name, is_descending in reversed(sort_keys):
+            column = cache.get_column(attr_name)
+            items.sort(key=lambda item, name=attr_name, values=column:
+                            values[item[0]] if item[1] is None
+                            else getattr(item[1], name),
+                       reverse=is_descending)
+        if not slice_key is None:
+            items = items[slice_key]
+    ents = [view.get_row_entity(row) if ent is None else ent
+            for (row, ent) in items]
+    return ents, count
+
+
+def _is_number(value):
+    return type(value) in (int, float) \
+           or (type(value) is long and -2 ** 63 <= value < 2 ** 63)
+
+
+def _find_rows(columnar_cache, mask, excluded_rows):
+    # Returns a list of the live rows that are flagged in the given mask
+    # and not in the given excluded rows.
+    live = columnar_cache.live_flags
+    if mask is None:
+        rows = [row for (row, is_live) in enumerate(live)
+                if is_live and not row in excluded_rows]
+    else:
+        rows = [row for (row, is_live) in enumerate(live)
+                if is_live and mask[row] and not row in excluded_rows]
+    return rows
+
+
+def _find_rows_vectorized(columnar_cache, mask, excluded_rows):
+    # Returns an array of the live rows that are flagged in the given mask
+    # and not in the given excluded rows.
+    live = _ColumnArrays.get(columnar_cache).live_flags()
+    if not mask is None:
+        live &= mask
+    if len(excluded_rows) > 0:
+        live[numpy.fromiter(excluded_rows, dtype=int,
+                            count=len(excluded_rows))] = False
+    return numpy.flatnonzero(live)
+
+
+def _sort_rows_vectorized(columnar_cache, rows, sort_keys):
+    # Returns the given row array stably sorted by the given keys or `None`
+    # if one of the key columns can not be sorted with NumPy.
+    arrays = _ColumnArrays.get(columnar_cache)
+    key_arrays = []
+    for attr_name, is_descending in sort_keys:
+        arr = arrays[attr_name]
+        if arr is None:
+            key_arrays = None
+            break
+        keys = arr[rows]
+        if is_descending:
+            if keys.dtype.kind in 'if':
+                keys = -keys
+            else:
+                keys = -numpy.unique(keys, return_inverse=True)[1]
+        key_arrays.append(keys)
+    if key_arrays is None:
+        sorted_rows = None
+    elif len(key_arrays) > 0:
+        # lexsort uses the last key as the primary key.
+        sorted_rows = rows[numpy.lexsort(key_arrays[::-1])]
+    else:
+        sorted_rows = rows
+    return sorted_rows
@@ -8,7 +8,10 @@ Created on Jan 7, 2013.
 """
 from everest.repositories.base import Repository
 from everest.repositories.memory.aggregate import MemoryAggregate
+from everest.repositories.memory.cache import ColumnarEntityCache
+from everest.repositories.memory.cache import EntityCache
 from everest.repositories.memory.cache import EntityCacheManager
+from everest.repositories.memory.ids import Uuid1EntityIdGenerator
 from everest.repositories.memory.session import MemorySessionFactory
 from everest.repositories.memory.uow import OBJECT_STATES
 from threading import Lock
@@ -21,9 +24,21 @@ __all__ = ['MemoryRepository',
 class MemoryRepository(Repository):
     """
     A repository that caches entities in memory.
+
+    Entities of the classes listed in the "columnar_entity_classes"
+    configuration option are held in compact
+    :class:`everest.repositories.memory.cache.ColumnarEntityCache`
+    instances; this is only possible for entity classes with terminal
+    attributes only (e.g., reference data).
+
+    IDs for entities without an ID are generated by the
+    :class:`everest.repositories.memory.ids.EntityIdGenerator` instance in
+    the "id_generator" configuration option; by default, UUID strings are
+    generated.
     """
     _configurables = Repository._configurables \
-                     + ['cache_loader']
+                     + ['cache_loader', 'columnar_entity_classes',
+                        'id_generator']
 
     lock = Lock()
 
@@ -34,18 +49,31 @@ class MemoryRepository(Repository):
         Repository.__init__(self, name, aggregate_class,
                             join_transaction=join_transaction,
                             autocommit=autocommit)
-        self.__cache_mgr = EntityCacheManager(self)
-        # By default, we do not use a cache loader.
-        self.configure(cache_loader=None)
+        self.__cache_mgr = EntityCacheManager(self,
+                                              cache_factory=self.__make_cache)
+        # By default, we do not use a cache loader, store all entities
+        # as objects and use UUID strings as entity IDs.
+        self.configure(cache_loader=None, columnar_entity_classes=(),
+                       id_generator=Uuid1EntityIdGenerator())
 
     def iterator(self, entity_class):
         cache = self.__cache_mgr[entity_class]
         return cache.iterator()
 
+    @property
+    def id_generator(self):
+        """
+        The entity ID generator configured for this repository.
+        """
+        return self._config['id_generator']
+
     def commit(self, unit_of_work):
         # FIXME: There is no dependency tracking; objects are committed in
         #        random order.
+        changed_entity_classes = set()
         for ent_cls, ent, state in unit_of_work.iterator():
+            if state != OBJECT_STATES.CLEAN:
+                changed_entity_classes.add(ent_cls)
             cache = self.__cache_mgr[ent_cls]
             if state == OBJECT_STATES.DELETED:
                 cache.remove(ent)
@@ -56,6 +84,7 @@ class MemoryRepository(Repository):
                 elif state == OBJECT_STATES.NEW:
                     cache.add(ent)
                     unit_of_work.mark_clean(ent_cls, ent)
+        self.increment_versions(changed_entity_classes)
 
     def _initialize(self):
         pass
@@ -65,3 +94,10 @@ class MemoryRepository(Repository):
 
     def _get_cache(self, entity_class):
         return self.__cache_mgr[entity_class]
+
+    def __make_cache(self, entity_class):
+        if entity_class in self._config['columnar_entity_classes']:
+            cache = ColumnarEntityCache(entity_class)
+        else:
+            cache = EntityCache()
+        return cache
@@ -6,8 +6,10 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Jan 8, 2013.
 """
-from everest.entities.utils import new_entity_id
 from everest.repositories.base import SessionFactory
+from everest.repositories.memory.cache import ColumnarEntityCache
+from everest.repositories.memory.cache import ColumnarEntityCacheView
+from everest.repositories.memory.cache import EntityCache
 from everest.repositories.memory.cache import EntityCacheManager
 from everest.repositories.memory.uow import UnitOfWork
 from threading import local
@@ -35,22 +37,21 @@ class MemorySession(object):
         self.__repository = repository
         self.__unit_of_work = UnitOfWork()
         self.__cache_mgr = EntityCacheManager(repository,
-                                              self.__load_from_repository)
+                                              self.__load_from_repository,
+                                              cache_factory=self.__make_cache)
         self.__need_datamanager_setup = repository.join_transaction is True
 
     def commit(self):
         with self.__repository.lock:
             self.__repository.commit(self.__unit_of_work)
-        self.__unit_of_work.reset()
-        self.__cache_mgr.reset()
+        self.__reset()
 
     def rollback(self):
 #        for ent_cls, ent, state in self.__unit_of_work.iterator():
 #            if state == OBJECT_STATES.DIRTY:
 #                cache = self.__cache_mgr[ent_cls]
 #                cache.replace(self.__repository.get_by_id(ent_cls, ent.id))
-        self.__unit_of_work.reset()
-        self.__cache_mgr.reset()
+        self.__reset()
 
     def add(self, entity_class, entity):
         """
@@ -67,11 +68,41 @@ class MemorySession(object):
             raise ValueError('Duplicate entity slug "%s".' % entity.slug)
         if self.__need_datamanager_setup:
             self.__setup_datamanager()
+        id_generator = self.__repository.id_generator
         if entity.id is None:
-            entity.id = new_entity_id()
+            entity.id = id_generator.new_id(entity_class)
+        else:
+            id_generator.register_id(entity_class, entity.id)
         self.__unit_of_work.register_new(entity_class, entity)
         cache.add(entity)
 
+    def add_all(self, entity_class, entities, check_conflicts=True):
+        """
+        Adds all given entities of the given entity class to the session.
+
+        :param bool check_conflicts: If this is set to `False`, the entities
+          are not checked for IDs or slugs of other entities that are
+          already in the session. This should only be used for trusted
+          data (e.g., when restoring a backup into an empty repository).
+        """
+        if self.__need_datamanager_setup:
+            self.__setup_datamanager()
+        cache = self.__cache_mgr[entity_class]
+        id_generator = self.__repository.id_generator
+        for entity in entities:
+            if check_conflicts:
+                if not entity.id is None and cache.has_id(entity.id):
+                    raise ValueError('Duplicate entity ID "%s".' % entity.id)
+                if not entity.slug is None and cache.has_slug(entity.slug):
+                    raise ValueError('Duplicate entity slug "%s".'
+                                     % entity.slug)
+            if entity.id is None:
+                entity.id = id_generator.new_id(entity_class)
+            else:
+                id_generator.register_id(entity_class, entity.id)
+            self.__unit_of_work.register_new(entity_class, entity)
+            cache.add(entity, check_conflicts=False)
+
     def remove(self, entity_class, entity):
         """
         Removes the given entity of the given entity class from the session.
@@ -137,24 +168,64 @@ class MemorySession(object):
         cache = self.__cache_mgr[entity_class]
         return cache.iterator()
 
+    def get_columnar_view(self, entity_class):
+        """
+        Returns the session view on the columnar repository cache for the
+        given entity class or `None` if the entities of this class are not
+        held in a columnar cache.
+        """
+        if self.__need_datamanager_setup:
+            self.__setup_datamanager()
+        cache = self.__cache_mgr[entity_class]
+        if not isinstance(cache, ColumnarEntityCacheView):
+            cache = None
+        return cache
+
     def get_all(self, entity_class):
         """
         Returns a list of all entities of the given class in the repository.
         """
         return list(self.iterator(entity_class))
 
+    def __reset(self):
+        self.__unit_of_work.reset()
+        self.__cache_mgr.reset()
+        # The next transaction needs to be joined again.
+        self.__need_datamanager_setup = \
+                self.__repository.join_transaction is True
+
     def __setup_datamanager(self):
         dm = DataManager(self)
         trx = transaction.get()
         trx.join(dm)
         self.__need_datamanager_setup = False
 
+    def __make_cache(self, entity_class):
+        repo_cache = self.__get_columnar_cache(entity_class)
+        if not repo_cache is None:
+            # Entities are materialized from the repository cache on demand.
+            register = lambda ent: \
+                self.__unit_of_work.register_clean(entity_class, ent)
+            cache = ColumnarEntityCacheView(repo_cache, register)
+        else:
+            cache = EntityCache()
+        return cache
+
+    def __get_columnar_cache(self, entity_class):
+        repo_cache = \
+            self.__repository._get_cache(entity_class) # pylint: disable=W0212
+        if not isinstance(repo_cache, ColumnarEntityCache):
+            repo_cache = None
+        return repo_cache
+
     def __load_from_repository(self, entity_class):
         ents = []
-        for repo_ent in self.__repository.iterator(entity_class):
-            ent = self.__unit_of_work.register_clean(entity_class,
-                                                     repo_ent)
-            ents.append(ent)
+        # Views on columnar repository caches are not loaded up front.
+        if self.__get_columnar_cache(entity_class) is None:
+            for repo_ent in self.__repository.iterator(entity_class):
+                ent = self.__unit_of_work.register_clean(entity_class,
+                                                         repo_ent)
+                ents.append(ent)
         return ents
 
 
@@ -77,6 +77,13 @@ class RdbAggregate(Aggregate):
         else:
             self._relationship.children.append(entity)
 
+    def add_all(self, entities, check_conflicts=True): # pylint: disable=W0613
+        # Conflicts are detected by the database constraints.
+        if self._relationship is None:
+            self._session.add_all(entities)
+        else:
+            self._relationship.children.extend(entities)
+
     def remove(self, entity):
         if self._relationship is None:
             self._session.delete(entity)
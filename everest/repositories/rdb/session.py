@@ -7,13 +7,17 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 Created on Jan 8, 2013.
 """
 from everest.repositories.base import SessionFactory
+from itertools import chain
+from sqlalchemy import event
 from sqlalchemy.orm import scoped_session
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.session import Session as SaSession
+from weakref import WeakKeyDictionary
 from zope.sqlalchemy import ZopeTransactionExtension # pylint: disable=E0611,F0401
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['RdbSessionFactory',
+           'VersionTracker',
            ]
 
 
@@ -47,12 +51,47 @@ class SaAutocommittingSession(SaSession):
 ScopedSessionMaker = scoped_session(sessionmaker())
 
 
+class VersionTracker(object):
+    """
+    Tracks the classes of the entities changed in a session and increments
+    their versions in the repository when the session commits.
+    """
+    def __init__(self, repository):
+        self.__repository = repository
+        self.__entity_classes = set()
+
+    def listen(self, session):
+        """
+        Registers this tracker with the given session.
+        """
+        event.listen(session, 'after_flush', self.after_flush)
+        event.listen(session, 'after_commit', self.after_commit)
+        event.listen(session, 'after_rollback', self.after_rollback)
+
+    def after_flush(self, session, flush_context): # pylint: disable=W0613
+        # The new, dirty and deleted collections still reflect the state
+        # before the flush at this point.
+        for ent in chain(session.new, session.dirty, session.deleted):
+            # Include base classes to catch polymorphic entities.
+            self.__entity_classes.update(type(ent).__mro__[:-1])
+
+    def after_commit(self, session): # pylint: disable=W0613
+        if self.__entity_classes:
+            self.__repository.increment_versions(self.__entity_classes)
+            self.__entity_classes.clear()
+
+    def after_rollback(self, session): # pylint: disable=W0613
+        self.__entity_classes.clear()
+
+
 class RdbSessionFactory(SessionFactory):
     """
     Factory for RDB repository sessions.
     """
     def __init__(self, repository):
         SessionFactory.__init__(self, repository)
+        # The sessions we are tracking versions for.
+        self.__tracked_sessions = WeakKeyDictionary()
         if self._repository.autocommit:
             # Use an autocommitting Session class with our session factory.
             self.__fac = scoped_session(
@@ -72,4 +111,11 @@ class RdbSessionFactory(SessionFactory):
                 # Enable the Zope transaction extension with the standard
                 # sqlalchemy Session class.
                 self.__fac.configure(extension=ZopeTransactionExtension())
-        return self.__fac()
+        session = self.__fac()
+        if not session in self.__tracked_sessions:
+            # The scoped session maker may be shared between repositories;
+            # track versions for our repository in each session we hand out.
+            tracker = VersionTracker(self._repository)
+            tracker.listen(session)
+            self.__tracked_sessions[session] = tracker
+        return session
@@ -11,6 +11,8 @@ from everest.mime import XmlMime
 from everest.representers.base import MappingResourceRepresenter
 from everest.representers.mapping import Mapping
 from everest.representers.utils import get_mapping_registry
+from everest.representers.xml import XML_NS_XSI
+from everest.representers.xml import XML_PRETTY_PRINT_OPTION
 from everest.representers.xml import XmlMappingRegistry
 from everest.representers.xml import XmlRepresentationGenerator
 from everest.representers.xml import XmlRepresenterConfiguration
@@ -18,10 +20,14 @@ from everest.resources.base import Collection
 from everest.resources.base import Member
 from everest.resources.utils import provides_member_resource
 from everest.url import UrlPartsConverter
+from lxml import etree
+from lxml import objectify
+import re
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['AtomMapping',
            'AtomMappingRegistry',
+           'AtomRepresentationGenerator',
            'AtomRepresenterConfiguration',
            'AtomResourceRepresenter',
            ]
@@ -44,6 +50,19 @@ class AtomResourceRepresenter(MappingResourceRepresenter):
         # We do not support parsing ATOM representations.
         raise NotImplementedError('Not implemented.')
 
+    def to_stream(self, resource, stream):
+        if provides_member_resource(resource):
+            MappingResourceRepresenter.to_stream(self, resource, stream)
+        else:
+            # Feeds are written incrementally, one entry at a time.
+            generator = \
+                self._make_representation_generator(stream,
+                                                    self.resource_class,
+                                                    self._mapping)
+            generator.run_feed(
+                    self._mapping.map_to_feed_data_element(resource),
+                    self._mapping.iterate_entry_data_elements(resource))
+
     @classmethod
     def make_mapping_registry(cls):
         return AtomMappingRegistry()
@@ -53,7 +72,85 @@ class AtomResourceRepresenter(MappingResourceRepresenter):
         raise NotImplementedError('Not implemented.')
 
     def _make_representation_generator(self, stream, resource_class, mapping):
-        return XmlRepresentationGenerator(stream, resource_class, mapping)
+        generator = AtomRepresentationGenerator(stream, resource_class,
+                                                mapping)
+        pretty_print = \
+                mapping.configuration.get_option(XML_PRETTY_PRINT_OPTION)
+        if not pretty_print is None:
+            generator.set_option('pretty_print', pretty_print)
+        return generator
+
+
+class AtomRepresentationGenerator(XmlRepresentationGenerator):
+    """
+    Representation generator for ATOM feeds and entries.
+
+    Feeds are written incrementally: the feed element is serialized without
+    its entries first and each entry is serialized and written to the
+    stream as soon as it has been mapped. Thus, at most one entry data
+    element is kept in memory at any time.
+    """
+    #: Text of the comment marking the insertion point for the entries in
+    #: the serialized feed element.
+    ENTRIES_MARKER = 'everest:entries'
+
+    __ns_decl_regex = re.compile(r'\s+xmlns(?::([^=\s]+))?="([^"]*)"')
+
+    def run_feed(self, feed_data_element, entry_data_elements):
+        """
+        Writes an ATOM feed to the stream.
+
+        :param feed_data_element: data element for the feed without entries.
+        :param entry_data_elements: iterable of data elements for the feed
+          entries.
+        """
+        # Make sure all registered namespaces remain declared on the feed
+        # element so they do not need to be repeated in every entry. The
+        # XML schema instance namespace is only declared where it is used.
+        ns_map = dict([(prefix, ns) for (prefix, ns) in
+                       self._mapping.mapping_registry.namespace_map.items()
+                       if ns != XML_NS_XSI])
+        ns_els = [etree.SubElement(feed_data_element, '{%s}ns' % ns)
+                  for ns in ns_map.itervalues()]
+        objectify.deannotate(feed_data_element)
+        etree.cleanup_namespaces(feed_data_element)
+        for ns_el in ns_els:
+            feed_data_element.remove(ns_el)
+        feed_data_element.append(etree.Comment(self.ENTRIES_MARKER))
+        feed_string = etree.tostring(feed_data_element,
+                                     pretty_print=self.__pretty_print,
+                                     encoding=self.get_option('encoding'),
+                                     xml_declaration=True)
+        head, tail = feed_string.split('<!--%s-->' % self.ENTRIES_MARKER)
+        if self.__pretty_print:
+            # Drop the indentation of the marker.
+            head = head.rstrip(' ')
+            tail = tail.lstrip()
+        self._stream.write(head)
+        ns_decls = set(ns_map.items())
+        for entry_data_el in entry_data_elements:
+            entry_string = self._serialize(entry_data_el)
+            self._stream.write(
+                    self.__strip_namespace_declarations(entry_string,
+                                                        ns_decls))
+        self._stream.write(tail)
+
+    def __strip_namespace_declarations(self, entry_string, ns_decls):
+        # Removes the namespace declarations already made on the feed element
+        # from the start tag of the given serialized entry.
+        def replace(match):
+            if (match.group(1), match.group(2)) in ns_decls:
+                result = ''
+            else:
+                result = match.group(0)
+            return result
+        end = entry_string.index('>')
+        return self.__ns_decl_regex.sub(replace, entry_string[:end]) \
+               + entry_string[end:]
+
+    @property
+    def __pretty_print(self):
+        return self.get_option('pretty_print', True)
 
 
 class AtomMapping(Mapping):
@@ -62,20 +159,47 @@ class AtomMapping(Mapping):
     VND_MIME = 'application/vnd.everest+xml'
 
     def map_to_data_element(self, resource):
-        # We use the XML mapping for the content serialization.
-        xml_mp_reg = get_mapping_registry(XmlMime)
-        xml_mp = xml_mp_reg.find_or_create_mapping(type(resource))
-        ns_map = self.mapping_registry.namespace_map
-        atom_mp = self.mapping_registry.find_or_create_mapping(type(resource))
-        data_el = \
-            atom_mp.data_element_class.create_from_resource(resource,
-                                                            ns_map=ns_map)
         if provides_member_resource(resource):
-            self.__map_member_to_data_element(data_el, resource, xml_mp)
+            data_el = self.__create_data_element(resource)
+            self.__map_member_to_data_element(data_el, resource,
+                                              self.__get_xml_mapping(resource))
         else:
-            self.__map_collection_to_data_element(data_el, resource, xml_mp)
+            data_el = self.map_to_feed_data_element(resource)
+            for entry_data_el in self.iterate_entry_data_elements(resource):
+                data_el.append(entry_data_el)
+        return data_el
+
+    def map_to_feed_data_element(self, collection):
+        """
+        Maps the given collection resource to an ATOM feed data element
+        without entries.
+        """
+        data_el = self.__create_data_element(collection)
+        self.__map_collection_to_data_element(data_el, collection)
         return data_el
 
+    def iterate_entry_data_elements(self, collection):
+        """
+        Maps the members of the given collection resource to ATOM entry data
+        elements, one member at a time.
+        """
+        # We use the XML mapping for the content serialization.
+        xml_mp = self.__get_xml_mapping(collection)
+        for member in collection:
+            member_data_el = self.__create_data_element(member)
+            self.__map_member_to_data_element(member_data_el, member, xml_mp)
+            yield member_data_el
+
+    def __create_data_element(self, resource):
+        ns_map = self.mapping_registry.namespace_map
+        atom_mp = self.mapping_registry.find_or_create_mapping(type(resource))
+        return atom_mp.data_element_class.create_from_resource(resource,
+                                                               ns_map=ns_map)
+
+    def __get_xml_mapping(self, resource):
+        xml_mp_reg = get_mapping_registry(XmlMime)
+        return xml_mp_reg.find_or_create_mapping(type(resource))
+
     def __map_member_to_data_element(self, data_el, member, xml_mp):
         # Fill in ATOM tags.
         # FIXME: Should not use etree API here pylint: disable=W0511
@@ -91,7 +215,7 @@ class AtomMapping(Mapping):
         cnt_wrapper_el.append(content_data_el)
         data_el.append(cnt_wrapper_el)
 
-    def __map_collection_to_data_element(self, data_el, collection, xml_mp):
+    def __map_collection_to_data_element(self, data_el, collection):
         # Fill in ATOM tags.
         # FIXME: Should not use etree API here pylint: disable=W0511
         data_el.title = collection.title
@@ -108,11 +232,6 @@ class AtomMapping(Mapping):
         #
         self.__append_opensearch_elements(data_el, collection)
         self.__append_links(data_el, collection.links)
-        # Iterate over members and serialize as ATOM entries.
-        for member in collection:
-            member_data_el = self.create_data_element_from_resource(member)
-            self.__map_member_to_data_element(member_data_el, member, xml_mp)
-            data_el.append(member_data_el)
 
     def __append_links(self, resource_data_el, links):
         for link in links:
@@ -145,9 +264,10 @@ class AtomMapping(Mapping):
                                             sortTerms=sort_terms),
                                 nsmap=self.mapping_registry.namespace_map)
         coll_data_el.append(q_el)
-        # Total results.
-        tr_tag = '{%s}%s' % (XML_NS_OPEN_SEARCH, 'totalResults')
-        setattr(coll_data_el, tr_tag, str(len(collection)))
+        if collection.exact_count:
+            # Total results.
+            tr_tag = '{%s}%s' % (XML_NS_OPEN_SEARCH, 'totalResults')
+            setattr(coll_data_el, tr_tag, str(len(collection)))
         if not collection.slice is None:
             # Start index.
             si_tag = '{%s}%s' % (XML_NS_OPEN_SEARCH, 'startIndex')
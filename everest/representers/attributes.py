@@ -55,10 +55,20 @@ class MappedAttribute(object):
 
     Wraps a (read-only) resource attribute and mapping options which can be
     configured dynamically.
+
+    For terminal attributes, the functions converting values to and from
+    their representation can be bound at mapping build time; they are
+    available through the :attr:`to_representation` and
+    :attr:`from_representation` attributes (which are `None` if no
+    converters were bound).
     """
-    def __init__(self, attr, options=None):
+    def __init__(self, attr, options=None, converter_registry=None):
         """
         :param attr: Resource attribute.
+        :param converter_registry: Registry to bind the representation
+          converters for terminal attributes from.
+        :type converter_registry:
+          :class:`everest.representers.converters.ConverterRegistry`
         """
         # Check given options.
         if options is None:
@@ -75,13 +85,24 @@ class MappedAttribute(object):
         self.options = options
         #
         self.__attr = attr
+        if not converter_registry is None \
+           and attr.kind == ResourceAttributeKinds.TERMINAL:
+            self.to_representation, self.from_representation = \
+                converter_registry.get_converter_functions(attr.value_type)
+        else:
+            self.to_representation = None
+            self.from_representation = None
 
     def clone(self, options=None):
         if options is None:
             options = {}
         new_options = self.options.copy()
         new_options.update(options)
-        return MappedAttribute(self.__attr, options=new_options)
+        clnd_attr = MappedAttribute(self.__attr, options=new_options)
+        # Clones share the bound converters.
+        clnd_attr.to_representation = self.to_representation
+        clnd_attr.from_representation = self.from_representation
+        return clnd_attr
 
     def should_ignore(self, ignore_option_name, attribute_key):
         """
@@ -7,6 +7,7 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 Created on May 18, 2011.
 """
 from StringIO import StringIO
+from copy import copy
 from everest.representers.utils import get_mapping_registry
 from everest.resources.base import Resource
 
@@ -258,12 +259,16 @@ class RepresenterRegistry(object):
         self.__rpr_classes = {}
         self.__mp_regs = {}
         self.__rpr_factories = {}
+        self.__rpr_cache = {}
+        self.__version = 0
 
     def register_representer_class(self, representer_class):
         if representer_class in self.__rpr_classes.values():
             raise ValueError('The representer class "%s" has already been '
                              'registered.' % representer_class)
         self.__rpr_classes[representer_class.content_type] = representer_class
+        self.__rpr_cache.clear()
+        self.__version += 1
         if issubclass(representer_class, MappingResourceRepresenter):
             # Create and hold a mapping registry for the registered resource
             # representer class.
@@ -276,6 +281,19 @@ class RepresenterRegistry(object):
     def get_mapping_registry(self, content_type):
         return self.__mp_regs.get(content_type)
 
+    def get_configuration_version(self, content_type):
+        """
+        Returns a value which changes whenever the representer configuration
+        for the given content type changes (i.e., when representers are
+        registered or the mapping registry for the content type is updated).
+        """
+        mp_reg = self.__mp_regs.get(content_type)
+        if mp_reg is None:
+            mp_version = None
+        else:
+            mp_version = mp_reg.version
+        return self.__version, mp_version
+
     def register(self, resource_class, content_type, configuration=None):
         """
         Registers a representer factory for the given combination of resource
@@ -297,6 +315,10 @@ class RepresenterRegistry(object):
         rpr_cls = self.__rpr_classes[content_type]
         self.__rpr_factories[(resource_class, content_type)] = \
                                             rpr_cls.create_from_resource
+        # The new factory may also apply to classes derived from the given
+        # resource class, so we invalidate all cached representers.
+        self.__rpr_cache.clear()
+        self.__version += 1
         if issubclass(rpr_cls, MappingResourceRepresenter):
             # Create or update an attribute mapping.
             mp_reg = self.__mp_regs[content_type]
@@ -333,7 +355,23 @@ class RepresenterRegistry(object):
         Creates a representer for the given combination of resource and 
         content type. This will also find representer factories that were
         registered for a base class of the given resource.
-        """
+
+        Representers are cached per resource class and content type; the
+        cache is cleared whenever a representer class or factory is
+        registered. Since callers may configure the representer they get,
+        each call returns a (shallow) copy of the cached representer.
+        """
+        key = (type(resource), content_type)
+        rpr = self.__rpr_cache.get(key)
+        if rpr is None:
+            rpr = self.__create(resource, content_type)
+            if not rpr is None:
+                self.__rpr_cache[key] = rpr
+        if not rpr is None:
+            rpr = copy(rpr)
+        return rpr
+
+    def __create(self, resource, content_type):
         rc_cls = type(resource)
         for base_rc_cls in rc_cls.__mro__:
             try:
@@ -13,6 +13,7 @@ from zope.interface import classProvides as class_provides # pylint: disable=E06
 from zope.interface import providedBy as provided_by # pylint: disable=E0611,F0401
 import datetime
 import iso8601
+import re
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['BooleanConverter',
@@ -78,25 +79,133 @@ class ConverterRegistry(object):
             representation_value = str(value) # FIXME: use unicode?
         return representation_value
 
+    @classmethod
+    def get_converter_functions(cls, value_type):
+        """
+        Returns a pair of functions converting values of the given type to
+        and from representation values, respectively. The returned functions
+        behave like :meth:`convert_to_representation` and
+        :meth:`convert_from_representation`, but look up the converter for
+        the value type only once.
+        """
+        if cls.__converters is None: # Lazy initialization.
+            cls.__converters = {}
+        cnv = cls.__converters.get(value_type)
+        if cnv is NoOpConverter:
+            to_representation = from_representation = _convert_noop
+        elif not cnv is None:
+            cnv_to_representation = cnv.to_representation
+            def to_representation(value):
+                if not value is None:
+                    value = cnv_to_representation(value)
+                return value
+            from_representation = cnv.from_representation
+        else:
+            def to_representation(value):
+                if not isinstance(value, basestring) and not value is None:
+                    value = str(value) # FIXME: use unicode?
+                return value
+            def from_representation(representation_value):
+                if not representation_value is None:
+                    # Use the value type's constructor.
+                    value = value_type(representation_value)
+                else:
+                    value = None
+                return value
+        return to_representation, from_representation
+
+    @classmethod
+    def convert_column_to_representation(cls, values, value_type):
+        """
+        Converts all values in the given sequence of values of the given
+        type to representation values.
+
+        :returns: list of representation values.
+        """
+        return map(cls.get_converter_functions(value_type)[0], values)
+
+    @classmethod
+    def convert_column_from_representation(cls, representation_values,
+                                           value_type):
+        """
+        Converts all representation values in the given sequence to values
+        of the given type.
+
+        :returns: list of values.
+        """
+        return map(cls.get_converter_functions(value_type)[1],
+                   representation_values)
+
 
 class SimpleConverterRegistry(ConverterRegistry):
     pass
 
 
 class DateTimeConverter(object):
+    """
+    Converter for datetime values.
+
+    Representation strings in the format generated by this converter
+    (YYYY-MM-DDThh:mm:ss[.ffffff](Z|+hh:mm|-hh:mm)) are parsed with a fast,
+    format-restricted parser; all other strings are passed on to the
+    general ISO 8601 parser. Likewise, timezone aware datetime values are
+    formatted directly while naive values are formatted by the RFC 3339
+    formatter (which assumes the local timezone).
+    """
     class_provides(IRepresentationConverter)
 
+    __regex = re.compile(r'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})'
+                         r'(?:\.(\d{1,6}))?(Z|[+-]\d{2}:\d{2})$')
+    #: Maps timezone strings to timezone info objects.
+    __tzinfos = {}
+    #: Maps UTC offsets (in seconds) to timezone strings.
+    __tz_strings = {}
+
     @classmethod
     def from_representation(cls, value):
         if value is None:
             py_val = None
         else:
-            py_val = iso8601.parse_date(value)
+            match = cls.__regex.match(value)
+            if not match is None:
+                year, month, day, hour, minute, second, fraction, tz_string = \
+                                                            match.groups()
+                if fraction is None:
+                    microsecond = 0
+                else:
+                    microsecond = int(fraction.ljust(6, '0'))
+                tzinfo = cls.__tzinfos.get(tz_string)
+                if tzinfo is None:
+                    # Let the general parser create the timezone info object.
+                    tzinfo = iso8601.parse_date('1970-01-01T00:00:00%s'
+                                                % tz_string).tzinfo
+                    cls.__tzinfos[tz_string] = tzinfo
+                py_val = datetime.datetime(int(year), int(month), int(day),
+                                           int(hour), int(minute),
+                                           int(second), microsecond,
+                                           tzinfo)
+            else:
+                py_val = iso8601.parse_date(value)
         return py_val
 
     @classmethod
     def to_representation(cls, value):
-        return rfc3339(value)
+        if isinstance(value, datetime.datetime) \
+           and not value.tzinfo is None:
+            offset = value.utcoffset()
+            offset_seconds = offset.days * 86400 + offset.seconds
+            tz_string = cls.__tz_strings.get(offset_seconds)
+            if tz_string is None:
+                hours, minutes = divmod(abs(offset_seconds) // 60, 60)
+                tz_string = '%s%02d:%02d' % (offset_seconds < 0 and '-' or '+',
+                                             hours, minutes)
+                cls.__tz_strings[offset_seconds] = tz_string
+            rpr_val = '%04d-%02d-%02dT%02d:%02d:%02d%s' \
+                      % (value.year, value.month, value.day, value.hour,
+                         value.minute, value.second, tz_string)
+        else:
+            rpr_val = rfc3339(value)
+        return rpr_val
 
 
 SimpleConverterRegistry.register(datetime.datetime, DateTimeConverter)
@@ -130,3 +239,7 @@ class NoOpConverter(object):
     @classmethod
     def to_representation(cls, value):
         return value
+
+
+def _convert_noop(value):
+    return value
@@ -417,6 +417,7 @@ class CsvDataElementTreeVisitor(ResourceDataVisitor):
         ResourceDataVisitor.__init__(self)
         self.__encoding = encoding
         self.__csv_data = None
+        self.__field_attributes = {}
 
     def visit_member(self, attribute_key, attribute, member_node, member_data,
                      is_link_node, parent_data, index=None):
@@ -430,6 +431,8 @@ class CsvDataElementTreeVisitor(ResourceDataVisitor):
             for attr, value in member_data.iteritems():
                 new_field_name = self.__get_field_name(attribute_key, attr)
                 rpr_mb_data[new_field_name] = value
+                if attr.kind == ResourceAttributeKinds.TERMINAL:
+                    self.__field_attributes[new_field_name] = attr
             mb_data = CsvData(rpr_mb_data)
         if not index is None:
             # Collection member. Store in parent data with index as key.
@@ -461,6 +464,14 @@ class CsvDataElementTreeVisitor(ResourceDataVisitor):
     def csv_data(self):
         return self.__csv_data
 
+    @property
+    def field_attributes(self):
+        """
+        Maps the names of all fields holding terminal attribute values to the
+        corresponding mapped attributes.
+        """
+        return self.__field_attributes
+
     def __get_field_name(self, attribute_key, attribute):
         if attribute.name != attribute.repr_name:
             field_name = attribute.repr_name
@@ -490,9 +501,7 @@ class CsvRepresentationGenerator(RepresentationGenerator):
     def run(self, data_element):
         # We also emit None values to make sure every data row has the same
         # number of fields.
-        trv = DataElementTreeTraverser(data_element, self._mapping,
-                                       direction=PROCESSING_DIRECTIONS.WRITE,
-                                       ignore_none_values=False)
+        trv = _CsvDataElementTreeTraverser(data_element, self._mapping)
         vst = CsvDataElementTreeVisitor(self.get_option('encoding'))
         trv.run(vst)
         csv_data = vst.csv_data
@@ -500,8 +509,40 @@ class CsvRepresentationGenerator(RepresentationGenerator):
             csv_writer = writer(self._stream,
                                 dialect=self.get_option('dialect'))
             csv_writer.writerow(csv_data.fields)
-            for row_data in csv_data.data:
-                csv_writer.writerow(row_data)
+            csv_writer.writerows(
+                    self.__convert_rows(csv_data, vst.field_attributes))
+
+    def __convert_rows(self, csv_data, field_attributes):
+        # Converts the terminal attribute values column by column, looking
+        # up the converter only once per column.
+        columns = []
+        for field, column in zip(csv_data.fields, zip(*csv_data.data)):
+            attr = field_attributes.get(field)
+            if not attr is None:
+                if not attr.to_representation is None:
+                    column = map(attr.to_representation, column)
+                else:
+                    column = \
+                      CsvConverterRegistry.convert_column_to_representation(
+                                                            column,
+                                                            attr.value_type)
+            columns.append(column)
+        return zip(*columns)
+
+
+class _CsvDataElementTreeTraverser(DataElementTreeTraverser):
+    """
+    Data element tree traverser which does not convert terminal values (the
+    CSV generator converts them column by column).
+    """
+    def __init__(self, root, mapping):
+        DataElementTreeTraverser.__init__(
+                                    self, root, mapping,
+                                    direction=PROCESSING_DIRECTIONS.WRITE,
+                                    ignore_none_values=False)
+
+    def _get_node_terminal(self, node, attr):
+        return node.get_terminal(attr)
 
 
 class CsvResourceRepresenter(MappingResourceRepresenter):
@@ -205,9 +205,13 @@ class SimpleMemberDataElement(_SimpleDataElementMixin, MemberDataElement):
         :returns: representation string
         """
         value = self.data.get(attr.repr_name)
-        return self.converter_registry.convert_to_representation(
+        if not attr.to_representation is None:
+            rpr_value = attr.to_representation(value)
+        else:
+            rpr_value = self.converter_registry.convert_to_representation(
                                                             value,
                                                             attr.value_type)
+        return rpr_value
 
     def set_terminal_converted(self, attr, repr_value):
         """
@@ -217,7 +221,10 @@ class SimpleMemberDataElement(_SimpleDataElementMixin, MemberDataElement):
         :param attr: attribute to set.
         :param str repr_value: string value of the attribute to set.
         """
-        value = self.converter_registry.convert_from_representation(
+        if not attr.from_representation is None:
+            value = attr.from_representation(repr_value)
+        else:
+            value = self.converter_registry.convert_from_representation(
                                                             repr_value,
                                                             attr.value_type)
         self.data[attr.repr_name] = value
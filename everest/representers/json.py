@@ -30,12 +30,17 @@ from everest.resources.attributes import ResourceAttributeKinds
 from everest.resources.utils import get_member_class
 from everest.resources.utils import get_resource_class_for_relation
 from everest.resources.utils import is_resource_url
-from json import dumps
-from json import loads
+from everest.resources.utils import provides_member_resource
+from types import GeneratorType
 import datetime
+import json
+import re
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['JsonCollectionDataElement',
+__all__ = ['IncrementalJsonArrayDecoder',
+           'JsonCodec',
+           'JsonCodecRegistry',
+           'JsonCollectionDataElement',
            'JsonLinkedDataElement',
            'JsonMappingRegistry',
            'JsonMemberDataElement',
@@ -43,9 +48,18 @@ __all__ = ['JsonCollectionDataElement',
            'JsonRepresentationParser',
            'JsonRepresenterConfiguration',
            'JsonResourceRepresenter',
+           'SimplejsonJsonCodec',
+           'StdlibJsonCodec',
+           'UjsonJsonCodec',
            ]
 
 
+JSON_CODEC_OPTION = 'json_codec'
+
+#: Name of the pseudo codec selecting the fastest available codec.
+AUTO_JSON_CODEC_NAME = 'auto'
+
+
 class JsonConverterRegistry(ConverterRegistry):
     pass
 
@@ -55,6 +69,293 @@ JsonConverterRegistry.register(int, NoOpConverter)
 JsonConverterRegistry.register(float, NoOpConverter)
 
 
+class IncrementalJsonArrayDecoder(object):
+    """
+    Decodes a top-level JSON array read from a stream one item at a time.
+
+    The stream is read in chunks so that only the item currently being
+    decoded needs to be held in the read buffer. Decoding of the individual
+    items is delegated to a "raw decode" callable with the signature of
+    :meth:`json.JSONDecoder.raw_decode`.
+    """
+    __ws_pattern = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, stream, raw_decode, chunk_size=65536):
+        self.__stream = stream
+        self.__raw_decode = raw_decode
+        self.__chunk_size = chunk_size
+        self.__buffer = ''
+        self.__pos = 0
+        self.__is_eof = False
+
+    def __iter__(self):
+        if self.__peek() != '[':
+            raise ValueError('Expected JSON array.')
+        self.__pos += 1
+        if self.__peek() == ']':
+            self.__pos += 1
+        else:
+            while True:
+                yield self.__decode_item()
+                char = self.__peek()
+                self.__pos += 1
+                if char == ']':
+                    break
+                elif char != ',':
+                    raise ValueError('Expected "," or "]" after JSON array '
+                                     'item, found "%s".' % char)
+        if self.__peek() != '':
+            raise ValueError('Extra data after JSON array.')
+
+    def __peek(self):
+        # Skips whitespace and returns the next character (or the empty
+        # string at the end of the stream).
+        while True:
+            self.__pos = \
+                self.__ws_pattern.match(self.__buffer, self.__pos).end()
+            if self.__pos < len(self.__buffer) or not self.__fill():
+                break
+        return self.__buffer[self.__pos:self.__pos + 1]
+
+    def __fill(self):
+        if self.__is_eof:
+            return False
+        chunk = self.__stream.read(self.__chunk_size)
+        if not chunk:
+            self.__is_eof = True
+            return False
+        self.__buffer = self.__buffer[self.__pos:] + chunk
+        self.__pos = 0
+        return True
+
+    def __decode_item(self):
+        self.__peek()
+        while True:
+            try:
+                item, end = self.__raw_decode(self.__buffer, self.__pos)
+            except ValueError:
+                if not self.__fill():
+                    raise
+            else:
+                # Values running up to the end of the buffer (e.g., numbers)
+                # may be truncated; we only accept a value once we have seen
+                # the delimiter following it.
+                next_pos = self.__ws_pattern.match(self.__buffer, end).end()
+                if self.__buffer[next_pos:next_pos + 1] in (',', ']') \
+                   or not self.__fill():
+                    break
+        self.__pos = end
+        return item
+
+
+class JsonCodec(object):
+    """
+    Abstract base class for JSON codecs.
+
+    A JSON codec encodes Python data structures to JSON strings and decodes
+    JSON strings back to Python data structures.
+    """
+    #: The name under which the codec is registered.
+    name = None
+
+    @classmethod
+    def is_available(cls):
+        """
+        Checks if the libraries this codec relies on are installed.
+        """
+        return True
+
+    @classmethod
+    def encode(cls, data):
+        raise NotImplementedError('Abstract method.')
+
+    @classmethod
+    def decode(cls, string):
+        raise NotImplementedError('Abstract method.')
+
+    @classmethod
+    def iterdecode(cls, stream):
+        """
+        Returns an iterator over the items of the top-level JSON array
+        read from the given stream.
+
+        This default implementation decodes the whole stream in one go;
+        codecs supporting partial decoding should override this.
+        """
+        data = cls.decode(stream.read())
+        if not isinstance(data, list):
+            raise ValueError('Expected JSON array.')
+        for item in data:
+            yield item
+
+
+class StdlibJsonCodec(JsonCodec):
+    """
+    JSON codec using the :mod:`json` module from the standard library.
+    """
+    name = 'json'
+
+    __decoder = json.JSONDecoder()
+
+    @classmethod
+    def encode(cls, data):
+        return json.dumps(data)
+
+    @classmethod
+    def decode(cls, string):
+        return json.loads(string)
+
+    @classmethod
+    def iterdecode(cls, stream):
+        return iter(IncrementalJsonArrayDecoder(stream,
+                                                cls.__decoder.raw_decode))
+
+
+class SimplejsonJsonCodec(JsonCodec):
+    """
+    JSON codec using the :mod:`simplejson` package. This codec is only
+    considered available if the C speedups of simplejson are installed.
+    """
+    name = 'simplejson'
+
+    __decoder = None
+
+    @classmethod
+    def is_available(cls):
+        try:
+            import simplejson # pylint: disable=F0401
+        except ImportError:
+            is_avl = False
+        else:
+            is_avl = not simplejson._import_c_make_encoder() is None # pylint: disable=W0212
+        return is_avl
+
+    @classmethod
+    def encode(cls, data):
+        import simplejson # pylint: disable=F0401
+        return simplejson.dumps(data)
+
+    @classmethod
+    def decode(cls, string):
+        import simplejson # pylint: disable=F0401
+        return simplejson.loads(string)
+
+    @classmethod
+    def iterdecode(cls, stream):
+        if cls.__decoder is None:
+            import simplejson # pylint: disable=F0401
+            cls.__decoder = simplejson.JSONDecoder()
+        return iter(IncrementalJsonArrayDecoder(stream,
+                                                cls.__decoder.raw_decode))
+
+
+class UjsonJsonCodec(JsonCodec):
+    """
+    JSON codec using the :mod:`ujson` package. ujson does not support
+    partial decoding, so the default (non-incremental) array decoding is
+    used.
+    """
+    name = 'ujson'
+
+    @classmethod
+    def is_available(cls):
+        try:
+            import ujson # pylint: disable=F0401,W0612
+        except ImportError:
+            is_avl = False
+        else:
+            is_avl = True
+        return is_avl
+
+    @classmethod
+    def encode(cls, data):
+        import ujson # pylint: disable=F0401
+        # Do not escape forward slashes in URLs.
+        return ujson.dumps(data, escape_forward_slashes=False)
+
+    @classmethod
+    def decode(cls, string):
+        import ujson # pylint: disable=F0401
+        return ujson.loads(string)
+
+
+class JsonCodecRegistry(object):
+    """
+    Registry for JSON codecs.
+
+    Codecs are looked up by name; the special name
+    %(AUTO_JSON_CODEC_NAME)s selects the first available codec in order of
+    registration priority.
+    """ % globals() # doc string must not be assigned pylint: disable=W0106
+    __codecs = None
+    __priorities = None
+
+    @classmethod
+    def register(cls, codec_class, priority=0):
+        """
+        Registers the given codec class under its name.
+
+        :param int priority: priority used when the codec is selected
+          automatically (higher values take precedence).
+        """
+        if cls.__codecs is None: # Lazy initialization.
+            cls.__codecs = {}
+            cls.__priorities = {}
+        if not (isinstance(codec_class, type)
+                and issubclass(codec_class, JsonCodec)):
+            raise ValueError('Codec class must inherit from JsonCodec.')
+        if codec_class.name in cls.__codecs:
+            raise ValueError('A JSON codec has already been registered '
+                             'with the name "%s" (%s).'
+                             % (codec_class.name,
+                                cls.__codecs[codec_class.name]))
+        cls.__codecs[codec_class.name] = codec_class
+        cls.__priorities[codec_class.name] = priority
+
+    @classmethod
+    def get(cls, name=None):
+        """
+        Returns the codec class registered under the given name. If no name
+        is given, the standard library codec is returned.
+
+        :raises ValueError: If the requested codec has not been registered
+          or is not available.
+        """
+        if name is None:
+            name = StdlibJsonCodec.name
+        if name == AUTO_JSON_CODEC_NAME:
+            codec_cls = cls.__get_auto()
+        else:
+            codec_cls = cls.__codecs.get(name)
+            if codec_cls is None:
+                raise ValueError('Unknown JSON codec "%s".' % name)
+            if not codec_cls.is_available():
+                raise ValueError('The JSON codec "%s" is not available '
+                                 '(missing library?).' % name)
+        return codec_cls
+
+    @classmethod
+    def get_available(cls):
+        """
+        Returns a list of all available codec classes, sorted by descending
+        priority.
+        """
+        codec_clss = [codec_cls for codec_cls in cls.__codecs.itervalues()
+                      if codec_cls.is_available()]
+        return sorted(codec_clss,
+                      key=lambda codec_cls: cls.__priorities[codec_cls.name],
+                      reverse=True)
+
+    @classmethod
+    def __get_auto(cls):
+        # The stdlib codec is always available.
+        return cls.get_available()[0]
+
+JsonCodecRegistry.register(StdlibJsonCodec)
+JsonCodecRegistry.register(SimplejsonJsonCodec, priority=1)
+JsonCodecRegistry.register(UjsonJsonCodec, priority=2)
+
+
 class JsonDataTreeTraverser(ResourceDataTreeTraverser):
     """
     Specialized traverser that extracts resource data from a tree of JSON data.
@@ -66,7 +367,8 @@ class JsonDataTreeTraverser(ResourceDataTreeTraverser):
     def _dispatch(self, attr_key, attr, node, parent_data, visitor):
         if isinstance(node, dict):
             traverse_fn = self._traverse_member
-        elif isinstance(node, list):
+        elif isinstance(node, (list, GeneratorType)):
+            # Top-level collection data may be decoded incrementally.
             traverse_fn = self._traverse_collection
         else:
             if not isinstance(node, basestring):
@@ -113,8 +415,18 @@ class JsonDataTreeTraverser(ResourceDataTreeTraverser):
 
 
 class JsonRepresentationParser(RepresentationParser):
+    """
+    A JSON parser for resource data.
+
+    Collection representations are decoded incrementally, one array item
+    at a time.
+    """
     def run(self):
-        json_data = loads(self._stream.read())
+        codec = self.get_option('codec', StdlibJsonCodec)
+        if provides_member_resource(self._resource_class):
+            json_data = codec.decode(self._stream.read())
+        else:
+            json_data = codec.iterdecode(self._stream)
         trv = JsonDataTreeTraverser(json_data, self._mapping)
         vst = DataElementBuilderRepresentationDataVisitor(self._mapping)
         trv.run(vst)
@@ -175,7 +487,8 @@ class JsonRepresentationGenerator(RepresentationGenerator):
                                        direction=PROCESSING_DIRECTIONS.WRITE)
         vst = JsonDataElementTreeVisitor()
         trv.run(vst)
-        rpr_string = dumps(vst.json_data)
+        codec = self.get_option('codec', StdlibJsonCodec)
+        rpr_string = codec.encode(vst.json_data)
         self._stream.write(rpr_string)
 
 
@@ -189,12 +502,18 @@ class JsonResourceRepresenter(MappingResourceRepresenter):
 
     def _make_representation_parser(self, stream, resource_class, mapping):
         parser = JsonRepresentationParser(stream, resource_class, mapping)
+        parser.set_option('codec', self.__get_codec(mapping))
         return parser
 
     def _make_representation_generator(self, stream, resource_class, mapping):
         generator = JsonRepresentationGenerator(stream, resource_class, mapping)
+        generator.set_option('codec', self.__get_codec(mapping))
         return generator
 
+    def __get_codec(self, mapping):
+        codec_name = mapping.configuration.get_option(JSON_CODEC_OPTION)
+        return JsonCodecRegistry.get(codec_name)
+
 
 class JsonMemberDataElement(SimpleMemberDataElement):
     converter_registry = JsonConverterRegistry
@@ -209,7 +528,18 @@ class JsonLinkedDataElement(SimpleLinkedDataElement):
 
 
 class JsonRepresenterConfiguration(RepresenterConfiguration):
-    pass
+    """
+    Specialized configuration class for JSON representers.
+
+    Allowed configuration attribute names:
+
+    json_codec :
+        The name of the JSON codec to use for encoding and decoding (see
+        :class:`JsonCodecRegistry`). Defaults to the standard library codec.
+    """
+    _default_config_options = \
+            dict(RepresenterConfiguration._default_config_options.items()
+                 + [(JSON_CODEC_OPTION, None)])
 
 
 class JsonMappingRegistry(SimpleMappingRegistry):
@@ -167,11 +167,16 @@ class Mapping(object):
             # Bootstrapping: fetch resource attributes and create new
             # mapped attributes.
             rc_attrs = get_resource_class_attributes(self.__mapped_cls)
+            # Bind the converters of the member data element class to the
+            # new mapped attributes.
+            de_cls = self.__mp_reg.member_data_element_base_class
+            cnv_reg = getattr(de_cls, 'converter_registry', None)
             for rc_attr in rc_attrs.itervalues():
                 attr_key = key + (rc_attr.name,)
                 attr_mp_opts = \
                         self.__configuration.get_attribute_options(attr_key)
-                new_mp_attr = MappedAttribute(rc_attr, options=attr_mp_opts)
+                new_mp_attr = MappedAttribute(rc_attr, options=attr_mp_opts,
+                                              converter_registry=cnv_reg)
                 collected_mp_attrs[rc_attr.name] = new_mp_attr
         else:
             # Indirect access - fetch mapped attributes from some other
@@ -214,6 +219,9 @@ class MappingRegistry(object):
         self.__configuration = self.configuration_class() # pylint: disable=E1102
         self.__mappings = {}
         self.__is_initialized = False
+        #: Counter which is incremented each time the configuration or the
+        #: mappings of this registry change.
+        self.version = 0
 
     def _initialize(self):
         # Implement this for static initializations.
@@ -221,6 +229,7 @@ class MappingRegistry(object):
 
     def set_default_config_option(self, name, value):
         self.__configuration.set_option(name, value)
+        self.version += 1
 
     def create_mapping(self, mapped_class, configuration=None):
         """
@@ -261,6 +270,7 @@ class MappingRegistry(object):
         :type mapping: :class:`Mapping`
         """
         self.__mappings[mapping.mapped_class] = mapping
+        self.version += 1
 
     def find_mapping(self, mapped_class):
         """
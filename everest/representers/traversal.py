@@ -21,10 +21,10 @@ from everest.resources.descriptors import CARDINALITY
 from everest.resources.interfaces import ICollectionResource
 from everest.resources.interfaces import IMemberResource
 from everest.resources.kinds import ResourceKinds
+from everest.resources.link import get_link_resolver
 from everest.resources.staging import create_staging_collection
 from everest.resources.utils import get_collection_class
 from everest.resources.utils import get_member_class
-from everest.resources.utils import url_to_resource
 from zope.interface import providedBy as provided_by # pylint: disable=E0611,F0401
 
 __docformat__ = 'reStructuredText en'
@@ -219,41 +219,74 @@ class DataElementBuilderResourceTreeVisitor(
         data_element.set_terminal(attribute, value)
 
 
+class _MemberLink(object):
+    """
+    Placeholder for a linked member entity which has not been resolved yet.
+    """
+    def __init__(self, url):
+        self.url = url
+
+
+class _CollectionLink(object):
+    """
+    Placeholder for the entities of a linked collection which have not been
+    resolved yet.
+    """
+    def __init__(self, url):
+        self.url = url
+
+
+class _DeferredEntity(object):
+    """
+    Placeholder for an entity which depends on linked entities which have
+    not been resolved yet.
+    """
+    def __init__(self, entity_class, member_data):
+        self.entity_class = entity_class
+        self.member_data = member_data
+
+
 class ResourceBuilderDataElementTreeVisitor(ResourceDataVisitor):
-    def __init__(self):
+    """
+    Builds a resource from a data element tree.
+
+    Links are not resolved one at a time while the tree is traversed;
+    instead, the creation of all entities which depend on linked entities
+    is deferred until the top level node is visited, at which point all
+    collected link URLs are resolved in batches with a link resolver (see
+    :class:`everest.resources.link.LinkResolver`).
+    """
+    def __init__(self, link_resolver=None):
         ResourceDataVisitor.__init__(self)
+        if link_resolver is None:
+            link_resolver = get_link_resolver()
+        self.__link_resolver = link_resolver
         self.__resource = None
+        self.__has_links = False
 
     def visit_member(self, attribute_key, attribute, member_node, member_data,
                      is_link_node, parent_data, index=None):
         if is_link_node:
             url = member_node.get_url()
-            rc = url_to_resource(url)
-            entity = rc.get_entity()
+            self.__link_resolver.add(url)
+            self.__has_links = True
+            entity = _MemberLink(url)
         else:
             entity_cls = get_entity_class(member_node.mapping.mapped_class)
-            entity_data = {}
-            nested_entity_data = {}
-            for attr, value in member_data.iteritems():
-                if '.' in attr.entity_name:
-                    nested_entity_data[attr.entity_name] = value
-                else:
-                    entity_data[attr.entity_name] = value
-            entity = entity_cls.create_from_data(entity_data)
-            # Set nested attribute values.
-            # FIXME: lazy loading of nested attributes is not supported.
-            for nested_attr, value in nested_entity_data.iteritems():
-                tokens = nested_attr.split('.')
-                parent = reduce(getattr, tokens[:-1], entity)
-                if not parent is None:
-                    setattr(parent, tokens[-1], value)
+            if self.__has_links:
+                # Nodes are visited bottom up, so this member's data may
+                # contain unresolved links.
+                entity = _DeferredEntity(entity_cls, member_data)
+            else:
+                entity = self.__create_entity(entity_cls, member_data)
         if not index is None:
             # Collection member. Store in parent data with index as key.
             parent_data[index] = entity
         elif len(attribute_key) == 0:
             # Top level. Store root entity and create resource.
             mapped_cls = member_node.mapping.mapped_class
-            self.__resource = mapped_cls.create_from_entity(entity)
+            self.__resource = \
+                    mapped_cls.create_from_entity(self.__resolve(entity))
         else:
             # Nested member. Store in parent data with attribute as key.
             parent_data[attribute] = entity
@@ -261,9 +294,8 @@ class ResourceBuilderDataElementTreeVisitor(ResourceDataVisitor):
     def visit_collection(self, attribute_key, attribute, collection_node,
                          collection_data, is_link_node, parent_data):
         if is_link_node:
-            url = collection_node.get_url()
-            coll = url_to_resource(url)
-            entities = [mb.get_entity() for mb in coll]
+            self.__has_links = True
+            entities = _CollectionLink(collection_node.get_url())
         else:
             entities = []
             for item in sorted(collection_data.items()):
@@ -271,7 +303,7 @@ class ResourceBuilderDataElementTreeVisitor(ResourceDataVisitor):
         if len(attribute_key) == 0: # Top level.
             mapped_cls = collection_node.mapping.mapped_class
             self.__resource = create_staging_collection(mapped_cls)
-            for ent in entities:
+            for ent in self.__resolve(entities):
                 self.__resource.create_member(ent)
         else:
             parent_data[attribute] = entities
@@ -280,6 +312,45 @@ class ResourceBuilderDataElementTreeVisitor(ResourceDataVisitor):
     def resource(self):
         return self.__resource
 
+    def __resolve(self, value):
+        # Replaces all placeholders in the given value with entities.
+        if self.__has_links:
+            self.__link_resolver.resolve()
+            value = self.__resolve_value(value)
+        return value
+
+    def __resolve_value(self, value):
+        if isinstance(value, _MemberLink):
+            value = self.__link_resolver.get_entity(value.url)
+        elif isinstance(value, _DeferredEntity):
+            member_data = OrderedDict()
+            for attr, attr_value in value.member_data.iteritems():
+                member_data[attr] = self.__resolve_value(attr_value)
+            value = self.__create_entity(value.entity_class, member_data)
+        elif isinstance(value, _CollectionLink):
+            value = self.__link_resolver.get_entities(value.url)
+        elif isinstance(value, list):
+            value = [self.__resolve_value(item) for item in value]
+        return value
+
+    def __create_entity(self, entity_class, member_data):
+        entity_data = {}
+        nested_entity_data = {}
+        for attr, value in member_data.iteritems():
+            if '.' in attr.entity_name:
+                nested_entity_data[attr.entity_name] = value
+            else:
+                entity_data[attr.entity_name] = value
+        entity = entity_class.create_from_data(entity_data)
+        # Set nested attribute values.
+        # FIXME: lazy loading of nested attributes is not supported.
+        for nested_attr, value in nested_entity_data.iteritems():
+            tokens = nested_attr.split('.')
+            parent = reduce(getattr, tokens[:-1], entity)
+            if not parent is None:
+                setattr(parent, tokens[-1], value)
+        return entity
+
 
 class DataTreeTraverser(object):
     """
@@ -502,7 +573,9 @@ class ResourceTreeTraverser(ResourceDataTreeTraverser):
         return getattr(node, attr.name)
 
     def _get_node_members(self, node):
-        return iter(node)
+        # The member nodes are not retained after they have been visited,
+        # so we can reuse the member resources where this is safe.
+        return node.flyweight_iterator()
 
     def _is_link_node(self, node, attr):
         return not attr is None and \
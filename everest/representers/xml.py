@@ -30,6 +30,8 @@ from everest.resources.utils import resource_to_url
 from lxml import etree
 from lxml import objectify
 from pkg_resources import resource_filename # pylint: disable=E0611
+from threading import Lock
+from threading import local
 from zope.interface import providedBy as provided_by # pylint: disable=E0611,F0401
 import datetime
 
@@ -54,6 +56,7 @@ XML_TAG_OPTION = 'xml_tag'
 XML_SCHEMA_OPTION = 'xml_schema'
 XML_NAMESPACE_OPTION = 'xml_ns'
 XML_PREFIX_OPTION = 'xml_prefix'
+XML_PRETTY_PRINT_OPTION = 'xml_pretty_print'
 
 NAMESPACE_MAPPING_OPTION = 'namespace'
 
@@ -81,32 +84,84 @@ class XmlRepresentationParser(RepresentationParser):
 
 class XmlRepresentationGenerator(RepresentationGenerator):
     def run(self, data_element):
+        self._stream.write(self._serialize(data_element,
+                                           xml_declaration=True))
+
+    def _serialize(self, data_element, xml_declaration=False):
         objectify.deannotate(data_element)
         etree.cleanup_namespaces(data_element)
         encoding = self.get_option('encoding')
-        self._stream.write(etree.tostring(data_element,
-                                          pretty_print=True,
-                                          encoding=encoding,
-                                          xml_declaration=True))
+        return etree.tostring(data_element,
+                              pretty_print=self.get_option('pretty_print',
+                                                           True),
+                              encoding=encoding,
+                              xml_declaration=xml_declaration)
 
 
 class XmlParserFactory(object):
-    __parser = None
+    """
+    Factory for XML parsers.
+
+    Compiled XML schemata are cached per schema location; configured parsers
+    are pooled per thread (lxml parsers must not be shared between threads)
+    and are rebuilt when the parsing lookup of the XML mapping registry
+    changes.
+    """
+    __schemata = {}
+    __lock = Lock()
+    __parsers = local()
 
     @classmethod
     def create(cls, schema_location=None):
-        if not schema_location is None:
-            schema = cls.__get_xml_schema(schema_location)
-            parser = objectify.makeparser(schema=schema)
-        else:
-            parser = objectify.makeparser()
         # Get the class lookup from the mapping registry.
         mp_reg = get_mapping_registry(XmlMime)
-        parser.set_element_class_lookup(mp_reg.parsing_lookup)
+        lookup = mp_reg.parsing_lookup
+        parser_map = getattr(cls.__parsers, 'parser_map', None)
+        if parser_map is None:
+            parser_map = cls.__parsers.parser_map = {}
+        parser_lookup, parser = parser_map.get(schema_location, (None, None))
+        if parser is None or not parser_lookup is lookup:
+            if not schema_location is None:
+                schema = cls.get_xml_schema(schema_location)
+                parser = objectify.makeparser(schema=schema)
+            else:
+                parser = objectify.makeparser()
+            parser.set_element_class_lookup(lookup)
+            parser_map[schema_location] = (lookup, parser)
         return parser
 
     @classmethod
-    def __get_xml_schema(cls, xml_schema_path):
+    def get_xml_schema(cls, schema_location):
+        """
+        Returns the compiled XML schema for the given schema location,
+        compiling it on first access.
+
+        :param str schema_location: schema location in the format
+          "<package>:<path>".
+        :raises SyntaxError: if the schema can not be parsed or compiled.
+        """
+        schema = cls.__schemata.get(schema_location)
+        if schema is None:
+            with cls.__lock:
+                schema = cls.__schemata.get(schema_location)
+                if schema is None:
+                    schema = cls.__compile_xml_schema(schema_location)
+                    cls.__schemata[schema_location] = schema
+        return schema
+
+    @classmethod
+    def precompile_xml_schemata(cls, mapping_registry):
+        """
+        Compiles the XML schemata for all mappings in the given XML mapping
+        registry.
+        """
+        for mapping in mapping_registry.get_mappings():
+            schema_loc = mapping.configuration.get_option(XML_SCHEMA_OPTION)
+            if not schema_loc is None:
+                cls.get_xml_schema(schema_loc)
+
+    @classmethod
+    def __compile_xml_schema(cls, xml_schema_path):
         try:
             doc = etree.parse(resource_filename(*xml_schema_path.split(':')))
         except etree.XMLSyntaxError, err:
@@ -141,6 +196,10 @@ class XmlResourceRepresenter(MappingResourceRepresenter):
     def _make_representation_generator(self, stream, resource_class, mapping):
         generator = XmlRepresentationGenerator(stream, resource_class, mapping)
         generator.set_option('encoding', self.ENCODING)
+        pretty_print = \
+                mapping.configuration.get_option(XML_PRETTY_PRINT_OPTION)
+        if not pretty_print is None:
+            generator.set_option('pretty_print', pretty_print)
         return generator
 
 
@@ -228,7 +287,10 @@ class XmlMemberDataElement(objectify.ObjectifiedElement,
             q_tag = self.__get_q_tag(attr)
             val_el = getattr(self, q_tag, None)
             if not val_el is None:
-                val = XmlConverterRegistry.convert_from_representation(
+                if not attr.from_representation is None:
+                    val = attr.from_representation(val_el.text)
+                else:
+                    val = XmlConverterRegistry.convert_from_representation(
                                                             val_el.text,
                                                             attr.value_type)
             else:
@@ -241,7 +303,10 @@ class XmlMemberDataElement(objectify.ObjectifiedElement,
             self.set('id', str(value))
         else:
             q_tag = self.__get_q_tag(attr)
-            xml_value = XmlConverterRegistry.convert_to_representation(
+            if not attr.to_representation is None:
+                xml_value = attr.to_representation(value)
+            else:
+                xml_value = XmlConverterRegistry.convert_to_representation(
                                                             value,
                                                             attr.value_type)
             setattr(self, q_tag, xml_value)
@@ -370,11 +435,15 @@ class XmlRepresenterConfiguration(RepresenterConfiguration):
         The XML namespace to use for the represented data element class.
     xml_prefix :
         The XML namespace prefix to use for the represented data element class.
+    xml_pretty_print :
+        Flag indicating if generated representations should be indented
+        (defaults to *True*).
     """
     _default_config_options = \
             dict(RepresenterConfiguration._default_config_options.items()
                  + [(XML_TAG_OPTION, None), (XML_SCHEMA_OPTION, None),
-                    (XML_NAMESPACE_OPTION, None), (XML_PREFIX_OPTION, None)])
+                    (XML_NAMESPACE_OPTION, None), (XML_PREFIX_OPTION, None),
+                    (XML_PRETTY_PRINT_OPTION, None)])
     _default_attributes_options = \
             dict(RepresenterConfiguration._default_attributes_options.items()
                  + [(NAMESPACE_MAPPING_OPTION, None)])
@@ -426,6 +495,9 @@ class XmlMappingRegistry(MappingRegistry):
     def namespace_map(self):
         return self.__ns_map.copy()
 
+    def on_app_created(self, event): # pylint: disable=W0613
+        XmlParserFactory.precompile_xml_schemata(self)
+
     @property
     def parsing_lookup(self):
         if self.__ns_lookup is None:
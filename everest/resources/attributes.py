@@ -136,6 +136,12 @@ class MetaResourceAttributeCollector(type):
             attr_map = mcs.__collect_attributes(dicts)
             # Store in class namespace.
             mcs._attributes = attr_map
+            # Precompute the entity attribute paths for all attributes
+            # of this class; paths into nested resources are added lazily.
+            mcs._entity_attribute_paths = \
+                    dict([(attr.name, attr.entity_name)
+                          for attr in attr_map.itervalues()
+                          if not attr.entity_name is None])
         type.__init__(mcs, name, bases, class_dict)
 
     def __collect_attributes(mcs, dicts):
@@ -180,9 +186,13 @@ class MetaResourceAttributeCollector(type):
 
 class ResourceAttributeControllerMixin(object):
     __metaclass__ = MetaResourceAttributeCollector
+    __slots__ = ()
 
     # Populated by the meta class.
     _attributes = None
+    # Maps resource attribute paths to entity attribute paths. Populated by
+    # the meta class and extended on demand.
+    _entity_attribute_paths = None
 
     @classmethod
     def is_terminal(cls, attr):
@@ -233,6 +243,34 @@ class ResourceAttributeControllerMixin(object):
         """
         return cls._attributes
 
+    @classmethod
+    def get_entity_attribute_path(cls, attr_path):
+        """
+        Returns the entity attribute path corresponding to the given
+        (dotted) resource attribute path. Translated paths are cached.
+
+        :raises ValueError: if one of the resource attributes in the path
+          does not have a corresponding entity attribute.
+        """
+        entity_attr_path = cls._entity_attribute_paths.get(attr_path)
+        if entity_attr_path is None:
+            entity_attr_tokens = []
+            mb_cls = cls
+            for attr_token in attr_path.split('.'):
+                attr = mb_cls.get_attributes()[attr_token]
+                if attr.entity_name is None:
+                    raise ValueError('Resource attribute "%s" does not have '
+                                     'a corresponding entity attribute.'
+                                     % attr.name)
+                if attr.kind != ResourceAttributeKinds.TERMINAL:
+                    # Look up the member class for the specified member or
+                    # collection resource interface.
+                    mb_cls = get_member_class(attr.value_type)
+                entity_attr_tokens.append(attr.entity_name)
+            entity_attr_path = '.'.join(entity_attr_tokens)
+            cls._entity_attribute_paths[attr_path] = entity_attr_path
+        return entity_attr_path
+
 
 def is_terminal_attribute(rc, attr_name):
     mb_cls = get_member_class(rc)
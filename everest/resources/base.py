@@ -25,6 +25,7 @@ from everest.resources.utils import as_member
 from everest.resources.utils import get_member_class
 from everest.resources.utils import resource_to_url
 from everest.resources.utils import url_to_resource
+from everest.utils import LruCache
 from pyramid.security import Allow
 from pyramid.security import Authenticated
 from pyramid.traversal import model_path
@@ -43,8 +44,13 @@ __all__ = ['Collection',
 class Resource(object):
     """
     This is the abstract base class for all resources.
+
+    The resource base classes declare their instance attributes in
+    `__slots__`. Derived classes may declare empty `__slots__` to avoid
+    the allocation of an instance dictionary for each resource.
     """
     implements(IResource)
+    __slots__ = ('__parent__', '__name__', '__links', '__weakref__')
 
     #: Authentication specifier. Override as needed.
     __acl__ = [
@@ -53,10 +59,6 @@ class Resource(object):
         (Allow, Authenticated, 'update'),
         (Allow, Authenticated, 'delete'),
         ]
-    #: The parent of this resource. This is `None` for the service resource.
-    __parent__ = None
-    #: The name of the resource. This has to be unique within the parent.
-    __name__ = None
     #: The relation identifier to show in links to this resource. Needs to
     #: be specified in derived classes.
     relation = None
@@ -74,8 +76,13 @@ class Resource(object):
         if self.__class__.relation is None:
             raise ValueError('Resource classes must have a relation '
                              'attribute.')
-        #: A set of links to other resources.
-        self.links = set()
+        #: The parent of this resource. This is `None` for the service
+        #: resource.
+        self.__parent__ = None
+        #: The name of the resource. This has to be unique within the parent.
+        self.__name__ = None
+        # The set of links is created on first access.
+        self.__links = None
 
     def add_link(self, link):
         """
@@ -86,6 +93,24 @@ class Resource(object):
         """
         self.links.add(link)
 
+    @property
+    def links(self):
+        """
+        The set of links to other resources.
+        """
+        if self.__links is None:
+            self.__links = self._create_links()
+        return self.__links
+
+    def _create_links(self):
+        # Creates the initial set of links of this resource.
+        return set()
+
+    def _reset_links(self):
+        # Discards the current set of links; the initial set is created
+        # again on next access.
+        self.__links = None
+
     @property
     def path(self):
         """
@@ -118,6 +143,7 @@ class Member(ResourceAttributeControllerMixin, Resource):
     This is an abstract class for all member resources.
     """
     implements(IMemberResource)
+    __slots__ = ('__entity', '__name')
 
     id = terminal_attribute(int, 'id')
 
@@ -139,8 +165,6 @@ class Member(ResourceAttributeControllerMixin, Resource):
                     % (entity.__class__.__name__, self.__class__.__name__))
         super(Member, self).__init__()
         self.__entity = entity
-        # Add the rel="self" link.
-        self.add_link(Link(self, "self"))
         self.__name = name
 
     def _get__name__(self):
@@ -160,6 +184,17 @@ class Member(ResourceAttributeControllerMixin, Resource):
         """
         return cls(entity)
 
+    def _rebind(self, entity):
+        # Rebinds this member to the given entity. This is only safe if no
+        # references to this member are kept for the previous entity.
+        self.__entity = entity
+        self.__name = None
+        self._reset_links()
+
+    def _create_links(self):
+        # Add the rel="self" link.
+        return set([Link(self, "self")])
+
     def get_entity(self):
         """
         Returns the entity this resource manages.
@@ -190,12 +225,18 @@ class Member(ResourceAttributeControllerMixin, Resource):
         """
         Updates this member from the given data element.
 
+        Only attributes with values that differ from the current state of
+        this member are set; nested resources are updated recursively and
+        links are only followed if the URL changed. This keeps the set of
+        modified entities in the underlying repository session minimal.
+
         :param data_element: data element (hierarchical) to create a resource
             from
         :type data_element: object implementing
          `:class:everest.resources.representers.interfaces.IExplicitDataElement`
-
+        :returns: list of the names of the attributes that were changed.
         """
+        changed_attr_names = []
         mp = data_element.mapping
         for attr in mp.attribute_iterator():
             if attr.kind == ResourceAttributeKinds.TERMINAL:
@@ -203,8 +244,17 @@ class Member(ResourceAttributeControllerMixin, Resource):
                 if other_value is None:
                     # Optional attribute - continue.
                     continue
-                else:
-                    setattr(self, attr.name, other_value)
+                try:
+                    is_unchanged = getattr(self, attr.name) == other_value
+                except TypeError:
+                    # Incomparable values (e.g., offset-naive and
+                    # offset-aware datetimes) - treat as changed.
+                    is_unchanged = False
+                if is_unchanged:
+                    # Unchanged - continue.
+                    continue
+                setattr(self, attr.name, other_value)
+                changed_attr_names.append(attr.name)
             else: # attr.kind MEMBER or COLLECTION
                 rc_data_el = data_element.get_nested(attr)
                 if rc_data_el is None:
@@ -216,16 +266,24 @@ class Member(ResourceAttributeControllerMixin, Resource):
                     url = rc_data_el.get_url()
                     if not self_rc is None \
                        and resource_to_url(self_rc) == url:
-                        #
                         continue
                     new_rc = url_to_resource(url)
                     setattr(self, attr.name, new_rc)
+                    changed_attr_names.append(attr.name)
+                elif self_rc is None:
+                    new_rc = mp.map_to_resource(rc_data_el)
+                    setattr(self, attr.name, new_rc)
+                    changed_attr_names.append(attr.name)
                 else:
-                    if self_rc is None:
-                        new_rc = mp.map_to_resource(rc_data_el)
-                        setattr(self, attr.name, new_rc)
+                    result = self_rc.update_from_data(rc_data_el)
+                    if attr.kind == ResourceAttributeKinds.COLLECTION:
+                        # Numbers of added, updated and removed members.
+                        is_changed = sum(result) > 0
                     else:
-                        self_rc.update_from_data(rc_data_el)
+                        is_changed = len(result) > 0
+                    if is_changed:
+                        changed_attr_names.append(attr.name)
+        return changed_attr_names
 
     def __getitem__(self, item):
         ident = identifier_from_slug(item)
@@ -261,6 +319,8 @@ class Collection(Resource):
     and sliced.
     """
     implements(ICollectionResource)
+    __slots__ = ('_filter_spec', '_order_spec', '_query_strings',
+                 '__aggregate', '__relationship')
 
     #: The title of the collection.
     title = None
@@ -278,6 +338,16 @@ class Collection(Resource):
     #: this is set in derived classes, no limit is enforced (i.e., the
     #: default maximum limit is None).
     max_limit = None
+    #: Flag indicating if the exact size of the collection should be
+    #: determined for batch navigation. Setting this to `False` in derived
+    #: classes avoids potentially expensive count queries for each
+    #: requested page; the "last" navigation link and the total result
+    #: count are then omitted from representations.
+    exact_count = True
+    #: Cache for the entity specifications converted from resource filter
+    #: and order specifications, keyed by member class, visitor class and
+    #: resource specification.
+    entity_specification_cache = LruCache(1024)
 
     def __init__(self, aggregate, name=None):
         """
@@ -304,6 +374,9 @@ class Collection(Resource):
         #: The order specification for this resource. Attribute names in
         #: this specification are relative to the resource.
         self._order_spec = None
+        #: Cache for the query strings generated from the filter ("q") and
+        #: order ("sort") specifications of this resource.
+        self._query_strings = {}
         # The underlying aggregate.
         self.__aggregate = aggregate
         #
@@ -331,6 +404,7 @@ class Collection(Resource):
           :class:`everest.relationship.Relationship` instance.
         """
         self.__relationship = relationship
+        self._query_strings.pop('q', None)
 
     def get_aggregate(self):
         """
@@ -354,6 +428,15 @@ class Collection(Resource):
     def is_nested(self):
         return not self.__parent__ is get_service()
 
+    @property
+    def query_strings(self):
+        """
+        Dictionary caching the query strings generated from the filter
+        ("q") and order ("sort") specifications of this collection. Entries
+        are discarded when the corresponding specification changes.
+        """
+        return self._query_strings
+
     def __len__(self):
         """
         Returns the size (count) of the collection.
@@ -386,6 +469,45 @@ class Collection(Resource):
             rc = as_member(obj, parent=self)
             yield rc
 
+    def flyweight_iterator(self):
+        """
+        Returns an iterator over the (possibly filtered and ordered)
+        collection which reuses a single member resource for all entities
+        of the same class, rebinding it to each entity in turn.
+
+        This avoids allocating a new member resource for each entity when
+        iterating for serialization. The members returned by this
+        iterator must not be retained across iteration steps.
+
+        Only members of classes that declare empty `__slots__` are reused
+        since rebinding can not reset any other per-instance state; for
+        all other member classes, a new member is created for each entity.
+        """
+        flyweights = {}
+        for obj in self.__aggregate.iterator():
+            ent_cls = type(obj)
+            if not ent_cls in flyweights:
+                rc = as_member(obj, parent=self)
+                if self.__is_flyweight_class(type(rc)):
+                    flyweights[ent_cls] = rc
+                else:
+                    flyweights[ent_cls] = None
+            else:
+                rc = flyweights[ent_cls]
+                if rc is None:
+                    rc = as_member(obj, parent=self)
+                else:
+                    rc._rebind(obj) # pylint: disable=W0212
+            yield rc
+
+    def __is_flyweight_class(self, member_class):
+        # Members can only be rebound safely if they keep no other state
+        # than the one declared by the member base class.
+        return member_class.__dictoffset__ == 0 \
+               and all([not cls.__dict__.get('__slots__')
+                        for cls in member_class.__mro__
+                        if issubclass(cls, Member) and not cls is Member])
+
     def __str__(self):
         return "<%s name:%s parent:%s>" % (self.__class__.__name__,
                                            self.__name__, self.__parent__)
@@ -405,6 +527,21 @@ class Collection(Resource):
         self.__aggregate.add(member.get_entity())
         member.__parent__ = self
 
+    def add_all(self, members, check_conflicts=True):
+        """
+        Adds all given members to this collection in one bulk operation.
+
+        :param members: sequence of members to add.
+        :param bool check_conflicts: if this is set to `False`, the members
+          are not checked for IDs or slugs of members already in this
+          collection. Only use this for trusted data.
+        :raise ValueError: if a member with the same name exists
+        """
+        self.__aggregate.add_all([mb.get_entity() for mb in members],
+                                 check_conflicts=check_conflicts)
+        for mb in members:
+            mb.__parent__ = self
+
     def remove(self, member):
         """
         Removes the given member from this collection.
@@ -432,12 +569,14 @@ class Collection(Resource):
         """
         Updates this collection from the given data element.
 
-        This iterates over the members of this collection and checks if
-        a member with the same ID exists in the given update data. If yes, 
-        the existing member is updated with the update member; if no,
-        the member is removed. All data elements in the update data that
-        have no ID are added as new members. Data elements with an ID that
-        can not be found in this collection trigger an error.
+        This computes the difference between the members of this collection
+        and the given update data by member ID: Existing members with an ID
+        that is present in the update data are updated with the update
+        member data; existing members with an ID that is not present are
+        removed. All data elements in the update data that have no ID are
+        added as new members. Data elements with an ID that can not be found
+        in this collection trigger an error; in this case, the collection
+        is not modified.
 
         :param data_element: data element (hierarchical) to create a resource
             from
@@ -445,43 +584,50 @@ class Collection(Resource):
          `:class:everest.resources.interfaces.IExplicitDataElement`
         :raises ValueError: when a data element with an ID that is not present
           in this collection is encountered.
+        :returns: tuple containing the numbers of added, updated (i.e.,
+          actually changed) and removed members.
         """
         attrs = data_element.mapping.get_attribute_map()
         id_attr = attrs['id']
+        # Build the diff in one pass over the entities and one pass over
+        # the update data.
+        ent_map = dict([(ent.id, ent)
+                        for ent in self.__aggregate.iterator()])
         update_ids = set()
+        updates = []
         new_mb_els = []
-        self_id_map = dict([(self_mb.id, self_mb) for self_mb in iter(self)])
         for member_el in data_element.get_members():
-#            if ILinkedDataElement in provided_by(member_el):
-#                # Found a link - do not do anything.
-#                mb_id = member_el.get_id()
-#            else:
             mb_id = member_el.get_terminal(id_attr)
             if mb_id is None:
                 # New data element without an ID - queue for adding.
                 new_mb_els.append(member_el)
-                continue
             else:
-                self_mb = self_id_map.get(mb_id)
-                if not self_mb is None:
-                    # Found an existing member - update.
-                    self_mb.update_from_data(member_el)
-                else:
+                ent = ent_map.get(mb_id)
+                if ent is None:
                     # New data element with a new ID. This is suspicious.
                     raise ValueError('New member data should not provide '
                                      'an ID attribute.')
-            update_ids.add(mb_id)
-        # Before adding any new members, check for delete operations.
-        for self_mb in iter(self):
-            if not self_mb.id in update_ids:
-                # Found an existing member ID that was not supplied with
-                # the update data- remove.
-                self.remove(self_mb)
+                # Found an existing entity - queue for updating.
+                updates.append((ent, member_el))
+                update_ids.add(mb_id)
+        # Apply the updates.
+        num_updated = 0
+        for ent, member_el in updates:
+            if as_member(ent, parent=self).update_from_data(member_el):
+                num_updated += 1
+        # Before adding any new members, remove all entities with IDs that
+        # were not supplied with the update data.
+        removed_ents = [ent for (ent_id, ent) in ent_map.iteritems()
+                        if not ent_id in update_ids]
+        if len(removed_ents) > 0:
+            self.__aggregate.remove_all(removed_ents)
         # Now, add new members.
-        mb_cls = get_member_class(self.__class__)
-        for new_member_el in new_mb_els:
-            new_member = mb_cls.create_from_data(new_member_el)
-            self.add(new_member)
+        if len(new_mb_els) > 0:
+            mb_cls = get_member_class(self.__class__)
+            new_ents = [mb_cls.create_from_data(new_member_el).get_entity()
+                        for new_member_el in new_mb_els]
+            self.__aggregate.add_all(new_ents)
+        return len(new_mb_els), num_updated, len(removed_ents)
 
     def update_from_entity(self, member, source_entity):
         """
@@ -515,13 +661,13 @@ class Collection(Resource):
         if not filter_spec is None:
             # Translate to entity filter expression before passing on to the
             # aggregate.
-            visitor = ResourceToEntityFilterSpecificationVisitor(
-                                                        get_member_class(self))
-            filter_spec.accept(visitor)
-            self.__aggregate.filter = visitor.expression
+            self.__aggregate.filter = self.__convert_to_entity_spec(
+                                filter_spec,
+                                ResourceToEntityFilterSpecificationVisitor)
         else:
             self.__aggregate.filter = None
         self._filter_spec = filter_spec
+        self._query_strings.pop('q', None)
 
     filter = property(_get_filter, _set_filter)
 
@@ -532,13 +678,13 @@ class Collection(Resource):
         if not order_spec is None:
             # Translate to entity order expression before passing on to the
             # aggregate.
-            visitor = ResourceToEntityOrderSpecificationVisitor(
-                                                        get_member_class(self))
-            order_spec.accept(visitor)
-            self.__aggregate.order = visitor.expression
+            self.__aggregate.order = self.__convert_to_entity_spec(
+                                order_spec,
+                                ResourceToEntityOrderSpecificationVisitor)
         else:
             self.__aggregate.order = None
         self._order_spec = order_spec
+        self._query_strings.pop('sort', None)
 
     order = property(_get_order, _set_order)
 
@@ -562,8 +708,29 @@ class Collection(Resource):
         # at the aggregate level).
         clone._filter_spec = self._filter_spec # pylint: disable=W0212
         clone._order_spec = self._order_spec # pylint: disable=W0212
+        clone._query_strings = \
+                self._query_strings.copy() # pylint: disable=W0212
         return clone
 
+    def __convert_to_entity_spec(self, spec, visitor_class):
+        # Specifications are immutable, so the converted entity
+        # specifications can be shared between collections.
+        mb_cls = get_member_class(self)
+        key = (mb_cls, visitor_class, spec)
+        cache = self.entity_specification_cache
+        try:
+            entity_spec = cache.get(key)
+        except TypeError:
+            # Unhashable specification value.
+            key = entity_spec = None
+        if entity_spec is None:
+            visitor = visitor_class(mb_cls)
+            spec.accept(visitor)
+            entity_spec = visitor.expression
+            if not key is None and visitor.is_cacheable:
+                cache.set(key, entity_spec)
+        return entity_spec
+
 
 class ResourceToEntitySpecificationVisitor(SpecificationVisitorBase):
     """
@@ -575,9 +742,19 @@ class ResourceToEntitySpecificationVisitor(SpecificationVisitorBase):
     def __init__(self, rc_class):
         SpecificationVisitorBase.__init__(self)
         self.__rc_class = rc_class
+        self._is_cacheable = True
+
+    @property
+    def is_cacheable(self):
+        """
+        Flag indicating if the converted specification may be cached, i.e.,
+        if it does not reference resources.
+        """
+        return self._is_cacheable
 
     def visit_nullary(self, spec):
-        entity_attr_name = self.__convert_to_entity_attr(spec.attr_name)
+        entity_attr_name = \
+                self.__rc_class.get_entity_attribute_path(spec.attr_name)
         new_spec = self._make_new_spec(entity_attr_name, spec)
         self._push(new_spec)
 
@@ -592,23 +769,6 @@ class ResourceToEntitySpecificationVisitor(SpecificationVisitorBase):
         new_spec = spec.__class__(left, right)
         self._push(new_spec)
 
-    def __convert_to_entity_attr(self, rc_attr_name):
-        entity_attr_tokens = []
-        rc_class = self.__rc_class
-        for rc_attr_token in rc_attr_name.split('.'):
-            rc_attr = get_resource_class_attributes(rc_class)[rc_attr_token]
-            ent_attr_name = rc_attr.entity_name
-            if ent_attr_name is None:
-                raise ValueError('Resource attribute "%s" does not have a '
-                                 'corresponding entity attribute.'
-                                 % rc_attr.name)
-            if rc_attr.kind != ResourceAttributeKinds.TERMINAL:
-                # Look up the member class for the specified member or
-                # collection resource interface.
-                rc_class = get_member_class(rc_attr.value_type)
-            entity_attr_tokens.append(ent_attr_name)
-        return '.'.join(entity_attr_tokens)
-
     def _make_new_spec(self, new_attr_name, old_spec):
         raise NotImplementedError('Abstract method.')
 
@@ -620,7 +780,17 @@ class ResourceToEntityFilterSpecificationVisitor(
     entity attribute names.
     """
     def _make_new_spec(self, new_attr_name, old_spec):
-        return old_spec.__class__(new_attr_name, old_spec.attr_value)
+        value = old_spec.attr_value
+        if isinstance(value, (list, tuple, set, frozenset)):
+            values = value
+        else:
+            values = [value]
+        for item in values:
+            if IResource.providedBy(item): # pylint: disable=E1101
+                # Resources are bound to the current request; do not cache.
+                self._is_cacheable = False
+                break
+        return old_spec.__class__(new_attr_name, value)
 
 
 class ResourceToEntityOrderSpecificationVisitor(
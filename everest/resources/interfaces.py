@@ -15,6 +15,7 @@ __all__ = ['ICollectionResource',
            'IMemberResource',
            'IResource',
            'IResourceLink',
+           'IResourceLookupCache',
            'ITraversable',
            ]
 
@@ -132,6 +133,15 @@ class ICollectionResource(IResource):
             :class:`everest.resources.interfaces.IMember` interface
         """
 
+    def add_all(members, check_conflicts=True):
+        """
+        Adds all given members to the collection.
+
+        :param members: a sequence of member instances
+        :param bool check_conflicts: flag indicating if the members should
+            be checked for conflicts with existing members
+        """
+
     def remove(member):
         """
         Removes a member from the collection.
@@ -196,6 +206,43 @@ class IResourceLink(Interface):
     title = Attribute('Title for the linked resource.')
 
 
+class IResourceLookupCache(Interface):
+    """
+    Interface for caches of registered resource classes and member
+    factories.
+    """
+
+    def register(interface, member, collection, entity):
+        """
+        Registers the given member, collection and entity classes for the
+        given marker interface.
+        """
+
+    def get_member_factory(entity_class):
+        """
+        Returns the member factory for the given entity class or `None` if
+        the class was not registered.
+        """
+
+    def get_member_class(resource):
+        """
+        Returns the member class for the given marker interface, resource
+        class or instance or `None` if it was not registered.
+        """
+
+    def get_collection_class(resource):
+        """
+        Returns the collection class for the given marker interface,
+        resource class or instance or `None` if it was not registered.
+        """
+
+    def get_entity_class(resource):
+        """
+        Returns the entity class for the given marker interface, resource
+        class or instance or `None` if it was not registered.
+        """
+
+
 class IService(IResource):
     """
     Marker interface for the service object.
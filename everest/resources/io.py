@@ -6,20 +6,33 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Jan 27, 2012.
 """
+from __future__ import absolute_import # Makes the import below absolute
 from StringIO import StringIO
+from array import array
 from collections import OrderedDict
+from collections import deque
 from everest.mime import CsvMime
 from everest.mime import MimeTypeRegistry
+from everest.repositories.memory.repository import MemoryRepository
+from everest.repositories.utils import as_repository
 from everest.representers.utils import as_representer
+from everest.resources.attributes import ResourceAttributeKinds
 from everest.resources.staging import create_staging_collection
 from everest.resources.utils import get_member_class
 from everest.resources.utils import provides_member_resource
-from pygraph.algorithms.sorting import topological_sorting # pylint: disable=E0611,F0401
+from io import BytesIO
+from multiprocessing.pool import ThreadPool
 from pygraph.classes.digraph import digraph # pylint: disable=E0611,F0401
+from pyramid.threadlocal import manager
+from tempfile import mkdtemp
+from threading import Lock
 from urlparse import urlparse
 from zipfile import ZIP_DEFLATED
 from zipfile import ZipFile
+import logging
 import os
+import shutil
+import time
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['ConnectedResourcesSerializer',
@@ -41,6 +54,8 @@ __all__ = ['ConnectedResourcesSerializer',
            'load_into_collections_from_zipfile',
            ]
 
+logger = logging.getLogger(__name__)
+
 
 def load_collection_from_url(collection_class, url,
                              content_type=None):
@@ -101,7 +116,8 @@ def load_collection_from_stream(collection_class, stream, content_type):
     return rpr.resource_from_data(data_el)
 
 
-def load_into_collections_from_zipfile(collections, zipfile):
+def load_into_collections_from_zipfile(collections, zipfile, max_workers=1,
+                                       check_conflicts=True):
     """
     Loads resources contained in the given ZIP archive for each of the
     given collection classes. 
@@ -109,14 +125,28 @@ def load_into_collections_from_zipfile(collections, zipfile):
     The ZIP file is expected to contain a list of file names obtained with
     the :func:`get_collection_filename` function, each pointing to a file
     of zipped collection resource data.
+
+    The members loaded from each file are added to the corresponding
+    collection in one bulk operation, in the order of the given
+    collections. Files for collections which do not reference any of the
+    other given collections are parsed concurrently if more than one worker
+    is requested and the collections are held in a memory (or file system)
+    repository; all other files are parsed after the preceding
+    collections have been loaded so that references can be resolved.
     
     :param collection_classes: sequence of collection resource classes
     :param str zipfile: ZIP file name
+    :param int max_workers: maximum number of threads to use for parsing
+      independent files concurrently.
+    :param bool check_conflicts: flag indicating if the loaded members
+      should be checked for conflicts with existing members. Switching this
+      off speeds up restoring trusted data into empty collections.
     """
     with ZipFile(zipfile) as zipf:
         names = zipf.namelist()
         name_map = dict([(os.path.splitext(name)[0], index)
                          for (index, name) in enumerate(names)])
+        entries = []
         for coll in collections:
             coll_name = get_collection_name(coll)
             index = name_map.get(coll_name)
@@ -130,13 +160,125 @@ def load_into_collections_from_zipfile(collections, zipfile):
             except KeyError:
                 raise ValueError('Could not infer MIME type for file '
                                  'extension "%s".' % ext)
-            for mb in load_collection_from_stream(type(coll),
-                                                  zipf.open(coll_fn, 'r'),
-                                                  content_type):
-                coll.add(mb)
+            entries.append((coll, coll_fn, content_type))
+        if max_workers > 1 and len(entries) > 1:
+            loader = _ParallelZipFileLoader(zipf, entries, max_workers)
+        else:
+            loader = None
+        try:
+            for coll, coll_fn, content_type in entries:
+                if not loader is None:
+                    mbs = loader.load(coll)
+                else:
+                    mbs = list(load_collection_from_stream(
+                                                type(coll),
+                                                zipf.open(coll_fn, 'r'),
+                                                content_type))
+                coll.add_all(mbs, check_conflicts=check_conflicts)
+        finally:
+            if not loader is None:
+                loader.close()
     return collections
 
 
+class _ParallelZipFileLoader(object):
+    """
+    Parses collection resource files in a ZIP archive on a pool of worker
+    threads.
+
+    Files for collections that do not reference any of the other loaded
+    collections are parsed on the pool if the collections are held in a
+    memory repository; all other files are parsed in the calling thread
+    on demand. Links in the files are resolved in the repository session
+    of the parsing thread, which would not be the one of the calling
+    thread for other repositories (e.g., a SQLAlchemy session).
+
+    To bound the memory held by parsed members that have not been consumed
+    yet, at most as many files as there are workers are submitted at a
+    time; the next file is submitted whenever a result is consumed. The
+    entries are read from the archive while holding a lock since the
+    archive file is shared.
+    """
+    def __init__(self, zipf, entries, max_workers):
+        self.__zipf = zipf
+        self.__lock = Lock()
+        self.__entry_map = {}
+        self.__results = {}
+        self.__pending_entries = deque()
+        mb_classes = set([get_member_class(entry[0]) for entry in entries])
+        independent_entries = []
+        for entry in entries:
+            self.__entry_map[id(entry[0])] = entry
+            mb_cls = get_member_class(entry[0])
+            if isinstance(as_repository(entry[0]), MemoryRepository) \
+               and not self.__references_any(mb_cls, mb_classes):
+                independent_entries.append(entry)
+        if independent_entries:
+            # The worker threads need the registry and request of the
+            # current thread.
+            self.__thread_state = manager.get().copy()
+            self.__pool = ThreadPool(min(max_workers,
+                                         len(independent_entries)))
+            self.__pending_entries.extend(independent_entries)
+            for _ in xrange(max_workers):
+                self.__submit_next()
+        else:
+            self.__pool = None
+
+    def load(self, collection):
+        """
+        Returns the list of members loaded for the given collection.
+        """
+        result = self.__results.pop(id(collection), None)
+        if result is None:
+            entry = self.__entry_map[id(collection)]
+            # Independent entries that are requested before they were
+            # submitted are parsed in the calling thread.
+            self.__pending_entries = deque([pending_entry for pending_entry
+                                            in self.__pending_entries
+                                            if not pending_entry is entry])
+            mbs = self.__load(entry)
+        else:
+            mbs = result.get()
+            self.__submit_next()
+        return mbs
+
+    def close(self):
+        """
+        Shuts down the worker threads.
+        """
+        if not self.__pool is None:
+            self.__pool.close()
+            self.__pool.join()
+
+    def __submit_next(self):
+        if self.__pending_entries:
+            entry = self.__pending_entries.popleft()
+            self.__results[id(entry[0])] = \
+                self.__pool.apply_async(self.__load_in_thread, (entry,))
+
+    def __load_in_thread(self, entry):
+        manager.push(self.__thread_state)
+        try:
+            return self.__load(entry)
+        finally:
+            manager.pop()
+
+    def __load(self, entry):
+        coll, coll_fn, content_type = entry
+        with self.__lock:
+            data = self.__zipf.read(coll_fn)
+        return list(load_collection_from_stream(type(coll), BytesIO(data),
+                                                content_type))
+
+    def __references_any(self, mb_cls, mb_classes):
+        for attr in mb_cls.get_attributes().itervalues():
+            if attr.kind != ResourceAttributeKinds.TERMINAL \
+               and get_member_class(attr.value_type) in mb_classes:
+                return True
+        return False
+
+
 def dump_resource(resource, stream, content_type=None):
     """
     Dumps the given resource to the given stream using the specified MIME
@@ -164,33 +306,137 @@ def build_resource_dependency_graph(resource_classes,
       introduced by back-references (e.g., a child resource referencing its
       parent) should be included in the dependency graph.
     """
-    def visit(mb_cls, grph, path, incl_backrefs):
-        for attr_name in mb_cls.get_attribute_names():
-            if mb_cls.is_terminal(attr_name):
-                continue
-            child_descr = getattr(mb_cls, attr_name)
-            child_mb_cls = get_member_class(child_descr.attr_type)
-            # We do not follow cyclic references back to a resource class
-            # that is last in the path.
-            if len(path) > 0 and child_mb_cls is path[-1] \
-               and not incl_backrefs:
-                continue
-            if not grph.has_node(child_mb_cls):
-                grph.add_node(child_mb_cls)
-                path.append(mb_cls)
-                visit(child_mb_cls, grph, path, incl_backrefs)
-                path.pop()
-            if not grph.has_edge((mb_cls, child_mb_cls)):
-                grph.add_edge((mb_cls, child_mb_cls))
+    def child_classes(mb_cls):
+        for attr in mb_cls.get_attributes().itervalues():
+            if attr.kind != ResourceAttributeKinds.TERMINAL:
+                yield get_member_class(attr.value_type)
     dep_grph = digraph()
     for resource_class in resource_classes:
         mb_cls = get_member_class(resource_class)
-        if not dep_grph.has_node(mb_cls):
-            dep_grph.add_node(mb_cls)
-            visit(mb_cls, dep_grph, [], include_backrefs)
+        if dep_grph.has_node(mb_cls):
+            continue
+        dep_grph.add_node(mb_cls)
+        # Depth-first traversal with an explicit stack of frames holding
+        # the member class, the class it was reached from, the iterator
+        # over its child classes and the child class currently visited.
+        # The edge to a visited child class is added after the child class
+        # has been traversed.
+        stack = [[mb_cls, None, child_classes(mb_cls), None]]
+        while stack:
+            frame = stack[-1]
+            cur_mb_cls, parent_mb_cls, child_it = frame[:3]
+            for child_mb_cls in child_it:
+                # We do not follow cyclic references back to a resource
+                # class that is last in the path.
+                if child_mb_cls is parent_mb_cls and not include_backrefs:
+                    continue
+                if not dep_grph.has_node(child_mb_cls):
+                    dep_grph.add_node(child_mb_cls)
+                    frame[3] = child_mb_cls
+                    stack.append([child_mb_cls, cur_mb_cls,
+                                  child_classes(child_mb_cls), None])
+                    break
+                if not dep_grph.has_edge((cur_mb_cls, child_mb_cls)):
+                    dep_grph.add_edge((cur_mb_cls, child_mb_cls))
+            else:
+                stack.pop()
+                if stack:
+                    parent_frame = stack[-1]
+                    edge = (parent_frame[0], parent_frame[3])
+                    if not dep_grph.has_edge(edge):
+                        dep_grph.add_edge(edge)
+                    parent_frame[3] = None
     return dep_grph
 
 
+def _collect_connected_entities(resource, dependency_graph):
+    """
+    Collects the entities of all resources reachable from the given
+    resource.
+
+    The graph is traversed with a worklist of node indices grouped by
+    member resource class; each batch of pending entities of a class is
+    expanded one relationship at a time. Nodes are keyed by entity class
+    and ID so that every entity is visited only once (cyclic references
+    are ignored). Related entities are accessed through the corresponding
+    entity attributes; resource attributes without an entity attribute are
+    accessed through a member resource wrapper.
+
+    :returns: tuple holding the list of (member class, entity) nodes in the
+      order they were found and the list of child node index arrays for
+      each node. Every node is found before its children.
+    """
+    nodes = []
+    children = []
+    node_map = {}
+    pending = OrderedDict()
+    relationship_map = {}
+
+    def add_node(mb_cls, ent):
+        key = (type(ent), ent.id)
+        if key in node_map:
+            index = None
+        else:
+            index = node_map[key] = len(nodes)
+            nodes.append((mb_cls, ent))
+            children.append(array('l'))
+            pending.setdefault(mb_cls, []).append(index)
+        return index
+
+    def get_relationships(mb_cls):
+        rels = relationship_map.get(mb_cls)
+        if rels is None:
+            rels = []
+            for attr in mb_cls.get_attributes().itervalues():
+                if attr.kind == ResourceAttributeKinds.TERMINAL:
+                    continue
+                # Only follow the resource attribute if the dependency
+                # graph has an edge here.
+                child_mb_cls = get_member_class(attr.value_type)
+                if dependency_graph.has_edge((mb_cls, child_mb_cls)):
+                    rels.append((attr, child_mb_cls))
+            relationship_map[mb_cls] = rels
+        return rels
+
+    def get_related_entities(mb_cls, ent, attr):
+        if attr.entity_name is None:
+            rc = getattr(mb_cls.create_from_entity(ent), attr.name)
+            if rc is None:
+                value = None
+            elif attr.kind == ResourceAttributeKinds.COLLECTION:
+                value = [mb.get_entity() for mb in rc]
+            else:
+                value = rc.get_entity()
+        else:
+            value = ent
+            for token in attr.entity_name.split('.'):
+                value = getattr(value, token)
+                if value is None:
+                    break
+        if value is None:
+            value = []
+        elif attr.kind == ResourceAttributeKinds.MEMBER:
+            value = [value]
+        return value
+
+    if provides_member_resource(resource):
+        rcs = [resource]
+    else:
+        rcs = resource
+    for rc in rcs:
+        add_node(type(rc), rc.get_entity())
+    while pending:
+        mb_cls, indices = pending.popitem(last=False)
+        for attr, child_mb_cls in get_relationships(mb_cls):
+            for index in indices:
+                ent = nodes[index][1]
+                for child_ent in get_related_entities(mb_cls, ent, attr):
+                    child_index = add_node(child_mb_cls, child_ent)
+                    if not child_index is None:
+                        children[index].append(child_index)
+    return nodes, children
+
+
 def build_resource_graph(resource, dependency_graph=None):
     """
     Traverses the graph of resources that is reachable from the given 
@@ -205,40 +451,17 @@ def build_resource_graph(resource, dependency_graph=None):
     :returns: a :class:`ResourceGraph` instance representing the graph of 
         resources reachable from the given resource.
     """
-    def visit(rc, grph, dep_grph):
-        mb_cls = type(rc)
-        attr_map = mb_cls.get_attributes()
-        for attr_name, attr in attr_map.iteritems():
-            if mb_cls.is_terminal(attr_name):
-                continue
-            # Only follow the resource attribute if the dependency graph
-            # has an edge here.
-            child_mb_cls = get_member_class(attr.value_type)
-            if not dep_grph.has_edge((mb_cls, child_mb_cls)):
-                continue
-            child_rc = getattr(rc, attr_name)
-            if mb_cls.is_collection(attr_name):
-                for child_mb in child_rc:
-                    if not grph.has_node(child_mb): # Ignore cyclic references.
-                        grph.add_node(child_mb)
-                        grph.add_edge((rc, child_mb))
-                        visit(child_mb, grph, dep_grph)
-            else: # Member.
-                if not grph.has_node(child_rc): # Ignore cyclic references.
-                    grph.add_node(child_rc)
-                    grph.add_edge((rc, child_rc))
-                    visit(child_rc, grph, dep_grph)
     if  dependency_graph is None:
         dependency_graph = build_resource_dependency_graph(
                                             [get_member_class(resource)])
+    nodes, children = _collect_connected_entities(resource, dependency_graph)
+    rcs = [mb_cls.create_from_entity(ent) for (mb_cls, ent) in nodes]
     graph = ResourceGraph()
-    if provides_member_resource(resource):
-        rcs = [resource]
-    else:
-        rcs = resource
     for rc in rcs:
         graph.add_node(rc)
-        visit(rc, graph, dependency_graph)
+    for index, child_indices in enumerate(children):
+        for child_index in child_indices:
+            graph.add_edge((rcs[index], rcs[child_index]))
     return graph
 
 
@@ -247,21 +470,23 @@ def find_connected_resources(resource, dependency_graph=None):
     Collects all resources connected to the given resource and returns a 
     dictionary mapping member resource classes to new collections containing
     the members found.
+
+    The collections are ordered such that the members of a collection are
+    reachable from the members of the preceding collections.
     """
-    # Build a resource_graph.
-    resource_graph = \
-                build_resource_graph(resource,
-                                     dependency_graph=dependency_graph)
+    if  dependency_graph is None:
+        dependency_graph = build_resource_dependency_graph(
+                                            [get_member_class(resource)])
+    nodes = _collect_connected_entities(resource, dependency_graph)[0]
     # Build an ordered dictionary of collections.
     collections = OrderedDict()
-    for mb in topological_sorting(resource_graph):
-        mb_cls = get_member_class(mb)
+    for mb_cls, ent in nodes:
         coll = collections.get(mb_cls)
         if coll is None:
             # Create new collection.
-            coll = create_staging_collection(mb)
+            coll = create_staging_collection(mb_cls)
             collections[mb_cls] = coll
-        coll.add(mb)
+        coll.add(mb_cls.create_from_entity(ent))
     return collections
 
 
@@ -299,8 +524,15 @@ class ResourceGraph(digraph):
 class ConnectedResourcesSerializer(object):
     """
     Serializer for a graph of connected resources.
+
+    Each collection of connected resources is written directly to its
+    target stream as it is serialized. Since the collections are built
+    up front, they do not depend on each other during serialization and
+    can be serialized concurrently on a pool of worker threads if the
+    resources are held in a memory (or file system) repository.
     """
-    def __init__(self, content_type, dependency_graph=None):
+    def __init__(self, content_type, dependency_graph=None, max_workers=1,
+                 progress_callback=None):
         """
         :param content_type: MIME content type to use for representations
         :type content_type: object implementing 
@@ -308,9 +540,22 @@ class ConnectedResourcesSerializer(object):
         :param dependency_graph: graph determining which resource connections
             to follow when the graph of connected resources for a given
             resource is built.
+        :param int max_workers: maximum number of threads to use for
+            serializing collections concurrently. With the default of 1,
+            all collections are serialized in the calling thread. This is
+            also done for resources from other than memory repositories
+            since their entities may be bound to a session that must not
+            be used from other threads (e.g., a SQLAlchemy session).
+        :param progress_callback: callable to notify after each collection
+            has been serialized; it is passed the member resource class,
+            the number of members in the collection and the time it took
+            to serialize the collection in seconds. Independently, the
+            progress is logged to the logger of this module.
         """
         self.__content_type = content_type
         self.__dependency_graph = dependency_graph
+        self.__max_workers = max_workers
+        self.__progress_callback = progress_callback
 
     def to_strings(self, resource):
         """
@@ -321,15 +566,11 @@ class ConnectedResourcesSerializer(object):
         :returns: dictionary mapping resource member classes to string 
             representations
         """
-        collections = \
-            find_connected_resources(resource,
-                                     dependency_graph=self.__dependency_graph)
         # Build a map of representations.
         rpr_map = OrderedDict()
-        for (mb_cls, coll) in collections.iteritems():
-            strm = StringIO('w')
-            dump_resource(coll, strm, content_type=self.__content_type)
+        for mb_cls, strm in self.__dump(resource, lambda mb_cls: StringIO()):
             rpr_map[mb_cls] = strm.getvalue()
+            strm.close()
         return rpr_map
 
     def to_files(self, resource, directory):
@@ -337,29 +578,89 @@ class ConnectedResourcesSerializer(object):
         Dumps the given resource and all resources linked to it into a set of
         representation files in the given directory.
         """
-        collections = \
-            find_connected_resources(resource,
-                                     dependency_graph=self.__dependency_graph)
-        for (mb_cls, coll) in collections.iteritems():
+        def open_file(mb_cls):
             fn = get_write_collection_path(mb_cls,
                                            self.__content_type,
                                            directory=directory)
-            with open(os.path.join(directory, fn), 'wb') as strm:
-                dump_resource(coll, strm, content_type=self.__content_type)
+            return open(fn, 'wb')
+        for _, strm in self.__dump(resource, open_file):
+            strm.close()
 
     def to_zipfile(self, resource, zipfile):
         """
         Dumps the given resource and all resources linked to it into the given
         ZIP file.
-        """
-        rpr_map = self.to_strings(resource)
-        with ZipFile(zipfile, 'w') as zipf:
-            for (mb_cls, rpr_string) in rpr_map.iteritems():
-                fn = get_collection_filename(mb_cls, self.__content_type)
-                zipf.writestr(fn, rpr_string, compress_type=ZIP_DEFLATED)
-
 
-def dump_resource_to_files(resource, content_type=None, directory=None):
+        Since ZIP file entries can not be streamed to, the representation of
+        each collection is dumped to a temporary file first which is moved
+        to the ZIP file as soon as it is complete.
+        """
+        tmp_dir = mkdtemp()
+        try:
+            def open_file(mb_cls):
+                fn = get_write_collection_path(mb_cls,
+                                               self.__content_type,
+                                               directory=tmp_dir)
+                return open(fn, 'wb')
+            with ZipFile(zipfile, 'w') as zipf:
+                for mb_cls, strm in self.__dump(resource, open_file):
+                    strm.close()
+                    fn = get_collection_filename(mb_cls, self.__content_type)
+                    zipf.write(strm.name, fn, compress_type=ZIP_DEFLATED)
+                    os.remove(strm.name)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def __dump(self, resource, open_stream):
+        # Dumps each collection of resources connected to the given resource
+        # to the stream returned by the given stream factory. Generates
+        # (member class, stream) tuples in dependency order; closing the
+        # streams is up to the caller.
+        collections = \
+            find_connected_resources(resource,
+                                     dependency_graph=self.__dependency_graph)
+        if self.__max_workers > 1 and len(collections) > 1 \
+           and isinstance(as_repository(resource), MemoryRepository):
+            # The worker threads need the registry and request of the
+            # current thread.
+            thread_state = manager.get().copy()
+            def dump_in_thread(item):
+                manager.push(thread_state)
+                try:
+                    return self.__dump_collection(item, open_stream)
+                finally:
+                    manager.pop()
+            pool = ThreadPool(min(self.__max_workers, len(collections)))
+            try:
+                for result in pool.imap(dump_in_thread,
+                                        collections.iteritems()):
+                    yield result
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for item in collections.iteritems():
+                yield self.__dump_collection(item, open_stream)
+
+    def __dump_collection(self, item, open_stream):
+        mb_cls, coll = item
+        start_time = time.time()
+        strm = open_stream(mb_cls)
+        try:
+            dump_resource(coll, strm, content_type=self.__content_type)
+        except:
+            strm.close()
+            raise
+        elapsed = time.time() - start_time
+        logger.info('Serialized %d %s resources in %.3f s.',
+                    len(coll), get_collection_name(mb_cls), elapsed)
+        if not self.__progress_callback is None:
+            self.__progress_callback(mb_cls, len(coll), elapsed)
+        return mb_cls, strm
+
+
+def dump_resource_to_files(resource, content_type=None, directory=None,
+                           max_workers=1):
     """
     Convenience function. See 
     :meth:`everest.resources.io.ConnectedResourcesSerializer.to_files` for 
@@ -372,11 +673,13 @@ def dump_resource_to_files(resource, content_type=None, directory=None):
         directory = os.getcwd() # pragma: no cover
     if content_type is None:
         content_type = CsvMime
-    srl = ConnectedResourcesSerializer(content_type)
+    srl = ConnectedResourcesSerializer(content_type,
+                                       max_workers=max_workers)
     srl.to_files(resource, directory=directory)
 
 
-def dump_resource_to_zipfile(resource, zipfile, content_type=None):
+def dump_resource_to_zipfile(resource, zipfile, content_type=None,
+                             max_workers=1):
     """
     Convenience function. See 
     :meth:`everest.resources.io.ConnectedResourcesSerializer.to_zipfile` for 
@@ -386,7 +689,8 @@ def dump_resource_to_zipfile(resource, zipfile, content_type=None):
     """
     if content_type is None:
         content_type = CsvMime
-    srl = ConnectedResourcesSerializer(content_type)
+    srl = ConnectedResourcesSerializer(content_type,
+                                       max_workers=max_workers)
     srl.to_zipfile(resource, zipfile)
 
 
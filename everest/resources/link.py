@@ -6,12 +6,19 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Jun 29, 2011.
 """
+from everest.querying.utils import get_filter_specification_factory
 from everest.resources.interfaces import IResourceLink
+from everest.resources.utils import get_resource_url_converter
+from everest.resources.utils import provides_collection_resource
 from everest.resources.utils import resource_to_url
+from everest.resources.utils import split_member_url
+from pyramid.threadlocal import get_current_request
 from zope.interface import implements # pylint: disable=E0611,F0401
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['Link',
+           'LinkResolver',
+           'get_link_resolver',
            ]
 
 
@@ -36,3 +43,117 @@ class Link(object):
     def href(self):
         return resource_to_url(self.__linked_resource)
 
+
+class LinkResolver(object):
+    """
+    Resolves link URLs to entities.
+
+    Resolved entities are cached by URL. Member URLs which are registered
+    with :meth:`add` before they are requested are resolved in batches:
+    the URLs are grouped by their parent collection and the entities for
+    each group are loaded with a single "contained" query on the entity
+    slugs.
+    """
+    def __init__(self, request=None):
+        self.__request = request
+        #: Maps member URLs to entities.
+        self.__entities = {}
+        #: Maps collection URLs to lists of entities.
+        self.__collection_entities = {}
+        #: Member URLs waiting to be resolved.
+        self.__pending = set()
+
+    def add(self, url):
+        """
+        Registers the given member URL for batch resolution.
+        """
+        if not url in self.__entities:
+            self.__pending.add(url)
+
+    def resolve(self):
+        """
+        Resolves all registered member URLs.
+
+        :raises KeyError: if a linked member does not exist.
+        """
+        cnv = self.__get_url_converter()
+        groups = {}
+        for url in self.__pending:
+            parts = split_member_url(url)
+            if parts is None:
+                self.__entities[url] = cnv.url_to_resource(url).get_entity()
+            else:
+                parent_url, slug = parts
+                groups.setdefault(parent_url, {})[slug] = url
+        self.__pending.clear()
+        spec_fac = get_filter_specification_factory()
+        for parent_url, urls in groups.iteritems():
+            parent = cnv.url_to_resource(parent_url)
+            if provides_collection_resource(parent) \
+               and parent.filter is None and len(urls) > 1:
+                agg = parent.get_aggregate().clone()
+                agg.filter = spec_fac.create_contained('slug', set(urls))
+                for ent in agg.iterator():
+                    url = urls.pop(ent.slug, None)
+                    if not url is None:
+                        self.__entities[url] = ent
+                if len(urls) > 0:
+                    raise KeyError('Could not resolve linked member(s) %s.'
+                                   % ', '.join(sorted(urls.values())))
+            else:
+                for slug, url in urls.iteritems():
+                    self.__entities[url] = parent[slug].get_entity()
+
+    def get_entity(self, url):
+        """
+        Returns the entity for the given member URL.
+        """
+        ent = self.__entities.get(url)
+        if ent is None:
+            self.add(url)
+            self.resolve()
+            ent = self.__entities[url]
+        return ent
+
+    def get_entities(self, url):
+        """
+        Returns the list of entities in the collection with the given URL.
+        """
+        ents = self.__collection_entities.get(url)
+        if ents is None:
+            coll = self.__get_url_converter().url_to_resource(url)
+            ents = [mb.get_entity() for mb in coll]
+            self.__collection_entities[url] = ents
+        return ents
+
+    def clear(self):
+        """
+        Clears the cache of resolved entities.
+        """
+        self.__entities.clear()
+        self.__collection_entities.clear()
+        self.__pending.clear()
+
+    def __get_url_converter(self):
+        return get_resource_url_converter(self.__request)
+
+
+def get_link_resolver(request=None):
+    """
+    Returns the link resolver for the given request (defaults to the current
+    request).
+
+    The resolver is stored in the request environment so that resolved links
+    are cached for the lifetime of the request. If there is no request, a
+    new resolver is returned.
+    """
+    if request is None:
+        request = get_current_request()
+    if request is None:
+        resolver = LinkResolver()
+    else:
+        resolver = request.environ.get('everest.link_resolver')
+        if resolver is None:
+            resolver = LinkResolver(request)
+            request.environ['everest.link_resolver'] = resolver
+    return resolver
@@ -9,11 +9,11 @@ Created on Feb 27, 2013.
 from collections import defaultdict
 from everest.entities.utils import get_entity_class
 from everest.repositories.memory.aggregate import MemoryAggregate
-from everest.repositories.memory.cache import EntityCache
 from everest.resources.utils import get_collection_class
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['create_staging_collection',
+__all__ = ['StagingSession',
+           'create_staging_collection',
            ]
 
 
@@ -24,16 +24,56 @@ class StagingSession(object):
     A staging session serves as a temporary container for entities. Unlike
     a "real" session, it does not maintain a unit of work and is not
     connected to a repository backend.
+
+    Staging sessions are append-only; the entities are kept in a plain list
+    per entity class and are not checked for duplicate IDs or slugs. The
+    indexes for looking up entities by ID or slug are only built when a
+    lookup is performed and are discarded when more entities are added.
     """
     def __init__(self):
-        self.__cache_map = \
-                        defaultdict(lambda: EntityCache(allow_none_id=True))
+        self.__entity_map = defaultdict(list)
+        # Maps (entity class, attribute name) tuples to lookup indexes.
+        self.__index_map = {}
 
     def add(self, entity_class, entity):
-        self.__cache_map[entity_class].add(entity)
+        self.__entity_map[entity_class].append(entity)
+        self.__invalidate_indexes(entity_class)
+
+    def add_all(self, entity_class, entities,
+                check_conflicts=True): # pylint: disable=W0613
+        self.__entity_map[entity_class].extend(entities)
+        self.__invalidate_indexes(entity_class)
+
+    def get_by_id(self, entity_class, entity_id):
+        return self.__get_index(entity_class, 'id').get(entity_id)
+
+    def get_by_slug(self, entity_class, entity_slug):
+        return self.__get_index(entity_class, 'slug').get(entity_slug)
 
     def iterator(self, entity_class):
-        return self.__cache_map[entity_class].iterator()
+        return iter(self.__entity_map[entity_class])
+
+    def get_columnar_view(self, entity_class): # pylint: disable=W0613
+        # Staged entities are never held in columnar caches.
+        return None
+
+    def __get_index(self, entity_class, attr):
+        key = (entity_class, attr)
+        index = self.__index_map.get(key)
+        if index is None:
+            index = {}
+            # The first entity with a given ID or slug wins.
+            for ent in reversed(self.__entity_map[entity_class]):
+                value = getattr(ent, attr)
+                if not value is None:
+                    index[value] = ent
+            self.__index_map[key] = index
+        return index
+
+    def __invalidate_indexes(self, entity_class):
+        if self.__index_map:
+            self.__index_map.pop((entity_class, 'id'), None)
+            self.__index_map.pop((entity_class, 'slug'), None)
 
 
 def create_staging_collection(resource):
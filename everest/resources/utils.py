@@ -6,6 +6,7 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Nov 3, 2011.
 """
+from everest.entities.interfaces import IEntity
 from everest.interfaces import IResourceUrlConverter
 from everest.repositories.interfaces import IRepositoryManager
 from everest.repositories.utils import as_repository
@@ -13,31 +14,95 @@ from everest.resources.interfaces import ICollectionResource
 from everest.resources.interfaces import IMemberResource
 from everest.resources.interfaces import IRelation
 from everest.resources.interfaces import IResource
+from everest.resources.interfaces import IResourceLookupCache
 from everest.resources.interfaces import IService
 from pyramid.threadlocal import get_current_registry
 from pyramid.threadlocal import get_current_request
 from pyramid.traversal import model_path
+from pyramid.traversal import traversal_path
 from urlparse import urlparse
 from urlparse import urlunparse
+from zope.interface import implementedBy as implemented_by # pylint: disable=E0611,F0401
+from zope.interface import implements # pylint: disable=E0611,F0401
 from zope.interface import providedBy as provided_by # pylint: disable=E0611,F0401
+from zope.interface.interface import InterfaceClass # pylint: disable=E0611,F0401
 from zope.interface.interfaces import IInterface # pylint: disable=E0611,F0401
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['as_member',
+__all__ = ['ResourceLookupCache',
+           'as_member',
            'get_collection_class',
            'get_member_class',
            'get_resource_class_for_relation',
            'get_resource_url',
+           'get_resource_url_converter',
            'get_root_collection',
            'is_resource_url',
            'provides_collection_resource',
            'provides_member_resource',
            'provides_resource',
            'resource_to_url',
+           'split_member_url',
            'url_to_resource',
+           'urls_to_resources',
            ]
 
 
+class ResourceLookupCache(object):
+    """
+    Cache for the registered resource classes and member factories.
+
+    The component registry lookups performed by :func:`as_member`,
+    :func:`get_member_class`, :func:`get_collection_class` and
+    :func:`everest.entities.utils.get_entity_class` require computing the
+    interfaces provided by the given object for every call. This cache is
+    populated when resources are registered (see
+    :meth:`everest.configuration.Configurator.add_resource`) and maps marker
+    interfaces and registered classes directly to the registered classes.
+    Lookups for unregistered classes (and for classes registered more than
+    once with different resource classes) fall back to the registry.
+    """
+    implements(IResourceLookupCache)
+
+    def __init__(self):
+        self.__member_factories = {}
+        self.__classes = {IMemberResource : {},
+                          ICollectionResource : {},
+                          IEntity : {}}
+
+    def register(self, interface, member, collection, entity):
+        self.__set(self.__member_factories, entity,
+                   member.create_from_entity)
+        for key in (interface, member, collection, entity):
+            self.__set(self.__classes[IMemberResource], key, member)
+            self.__set(self.__classes[ICollectionResource], key, collection)
+            self.__set(self.__classes[IEntity], key, entity)
+
+    def get_member_factory(self, entity_class):
+        return self.__member_factories.get(entity_class)
+
+    def get_member_class(self, resource):
+        return self.__get(IMemberResource, resource)
+
+    def get_collection_class(self, resource):
+        return self.__get(ICollectionResource, resource)
+
+    def get_entity_class(self, resource):
+        return self.__get(IEntity, resource)
+
+    def __get(self, kind, resource):
+        if not isinstance(resource, (type, InterfaceClass)):
+            resource = type(resource)
+        return self.__classes[kind].get(resource)
+
+    def __set(self, cache_map, key, value):
+        if cache_map.get(key, value) is not value:
+            # Ambiguous registration; mark with None to fall back to the
+            # registry.
+            value = None
+        cache_map[key] = value
+
+
 def get_root_collection(resource):
     """
     Returns a clone of the collection from the repository registered for the
@@ -60,11 +125,15 @@ def get_member_class(resource):
         a registered resource interface.
     """
     reg = get_current_registry()
-    if IInterface in provided_by(resource):
-        member_class = reg.getUtility(resource, name='member-class')
-    else:
-        member_class = reg.getAdapter(resource, IMemberResource,
-                                      name='member-class')
+    cache = reg.queryUtility(IResourceLookupCache)
+    member_class = None if cache is None \
+                   else cache.get_member_class(resource)
+    if member_class is None:
+        if IInterface in provided_by(resource):
+            member_class = reg.getUtility(resource, name='member-class')
+        else:
+            member_class = reg.getAdapter(resource, IMemberResource,
+                                          name='member-class')
     return member_class
 
 
@@ -78,11 +147,15 @@ def get_collection_class(resource):
         a registered resource interface.
     """
     reg = get_current_registry()
-    if IInterface in provided_by(resource):
-        coll_class = reg.getUtility(resource, name='collection-class')
-    else:
-        coll_class = reg.getAdapter(resource, ICollectionResource,
-                                    name='collection-class')
+    cache = reg.queryUtility(IResourceLookupCache)
+    coll_class = None if cache is None \
+                 else cache.get_collection_class(resource)
+    if coll_class is None:
+        if IInterface in provided_by(resource):
+            coll_class = reg.getUtility(resource, name='collection-class')
+        else:
+            coll_class = reg.getAdapter(resource, ICollectionResource,
+                                        name='collection-class')
     return coll_class
 
 
@@ -113,7 +186,13 @@ def as_member(entity, parent=None):
         :class:`everest.resources.interfaces.IMemberResource`
     """
     reg = get_current_registry()
-    rc = reg.getAdapter(entity, IMemberResource)
+    cache = reg.queryUtility(IResourceLookupCache)
+    mb_factory = None if cache is None \
+                 else cache.get_member_factory(type(entity))
+    if mb_factory is None:
+        rc = reg.getAdapter(entity, IMemberResource)
+    else:
+        rc = mb_factory(entity)
     if not parent is None:
         rc.__parent__ = parent # interface method pylint: disable=E1121
     return rc
@@ -146,8 +225,10 @@ def provides_resource(obj):
     :class:`everest.resources.interfaces.IResource` interface.
     """
     if isinstance(obj, type):
-        obj = object.__new__(obj)
-    return IResource in provided_by(obj)
+        ifcs = implemented_by(obj)
+    else:
+        ifcs = provided_by(obj)
+    return IResource in ifcs
 
 
 def provides_member_resource(obj):
@@ -156,8 +237,10 @@ def provides_member_resource(obj):
     :class:`everest.resources.interfaces.IMemberResource` interface.
     """
     if isinstance(obj, type):
-        obj = object.__new__(obj)
-    return IMemberResource in provided_by(obj)
+        ifcs = implemented_by(obj)
+    else:
+        ifcs = provided_by(obj)
+    return IMemberResource in ifcs
 
 
 def provides_collection_resource(obj):
@@ -166,8 +249,10 @@ def provides_collection_resource(obj):
     :class:`everest.resources.interfaces.ICollectionResource` interface.
     """
     if isinstance(obj, type):
-        obj = object.__new__(obj)
-    return ICollectionResource in provided_by(obj)
+        ifcs = implemented_by(obj)
+    else:
+        ifcs = provided_by(obj)
+    return ICollectionResource in ifcs
 
 
 def get_registered_collection_resources():
@@ -200,15 +285,35 @@ def get_service():
     return reg.getUtility(IService)
 
 
-def resource_to_url(resource, request=None):
+def get_resource_url_converter(request=None):
     """
-    Converts the given resource to a URL.
+    Returns the resource URL converter for the given request (defaults to
+    the current request).
+
+    The converter is stored in the request environment so that the adapter
+    lookup is performed only once per request; this also allows the
+    converter to cache URL prefixes for the lifetime of the request.
     """
     if request is None:
         request = get_current_request()
-#    cnv = request.registry.getAdapter(request, IResourceUrlConverter)
-    reg = get_current_registry()
-    cnv = reg.getAdapter(request, IResourceUrlConverter)
+    environ = getattr(request, 'environ', None)
+    if environ is None:
+        cnv = None
+    else:
+        cnv = environ.get('everest.url_converter')
+    if cnv is None:
+        reg = get_current_registry()
+        cnv = reg.getAdapter(request, IResourceUrlConverter)
+        if not environ is None:
+            environ['everest.url_converter'] = cnv
+    return cnv
+
+
+def resource_to_url(resource, request=None):
+    """
+    Converts the given resource to a URL.
+    """
+    cnv = get_resource_url_converter(request)
     return cnv.resource_to_url(resource)
 
 
@@ -216,10 +321,63 @@ def url_to_resource(url, request=None):
     """
     Converts the given URL to a resource.
     """
-    if request is None:
-        request = get_current_request()
-#    cnv = request.registry.getAdapter(request, IResourceUrlConverter)
-    reg = get_current_registry()
-    cnv = reg.getAdapter(request, IResourceUrlConverter)
+    cnv = get_resource_url_converter(request)
     return cnv.url_to_resource(url)
 
+
+def split_member_url(url):
+    """
+    Splits the given resource URL into the URL of its parent resource and
+    the (decoded) name of the resource within its parent.
+
+    :returns: tuple (parent URL, name) or `None` if the given URL has a
+        query string, is a top level URL, or contains relative path
+        segments.
+    """
+    parsed = urlparse(url)
+    # namedtuple problem pylint: disable=E1101
+    parent_path, dummy, name = parsed.path.rstrip('/').rpartition('/')
+    if parsed.query or parsed.params or parent_path == '' \
+       or name in ('.', '..'):
+        parts = None
+    else:
+        parent_url = urlunparse((parsed.scheme, parsed.netloc,
+                                 parent_path + '/', '', '', ''))
+        parts = parent_url, traversal_path(name)[0]
+    # pylint: enable=E1101
+    return parts
+
+
+def urls_to_resources(urls, request=None):
+    """
+    Converts the given URLs to resources.
+
+    Member URLs without a query string are grouped by their parent resource
+    URL so that each parent is looked up only once; the members are then
+    fetched from their (cached) parent.
+
+    :param urls: sequence of URL strings.
+    :returns: list of resources in the order of the given URLs.
+    """
+    cnv = get_resource_url_converter(request)
+    if len(urls) < 2:
+        return [cnv.url_to_resource(url) for url in urls]
+    parents = {}
+    rcs = []
+    for url in urls:
+        parts = split_member_url(url)
+        if parts is None:
+            rc = cnv.url_to_resource(url)
+        else:
+            parent_url, name = parts
+            parent = parents.get(parent_url)
+            if parent is None:
+                parent = cnv.url_to_resource(parent_url)
+                parents[parent_url] = parent
+            rc = parent[name]
+            if not (provides_member_resource(rc)
+                    or provides_collection_resource(rc)):
+                raise ValueError('Traversal found non-resource object "%s".'
+                                 % rc)
+        rcs.append(rc)
+    return rcs
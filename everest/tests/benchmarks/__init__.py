@@ -0,0 +1,56 @@
+"""
+Benchmarks.
+
+This file is part of the everest project. 
+See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
+
+Benchmarks are written as test cases with methods prefixed "benchmark" so 
+they are not picked up by the regular test runner. Run a benchmark module 
+directly to execute them, e.g.
+
+  python -m everest.tests.benchmarks.json_codecs
+
+Created on Oct 18, 2026.
+"""
+from timeit import repeat
+from unittest import TestLoader
+from unittest import TextTestRunner
+import sys
+
+__docformat__ = 'reStructuredText en'
+__all__ = ['report',
+           'run_benchmarks',
+           'time_call',
+           ]
+
+
+def time_call(func, repetitions=5):
+    """
+    Returns the best time (in seconds) of the given number of calls to the
+    given callable.
+    """
+    return min(repeat(func, number=1, repeat=repetitions))
+
+
+def report(title, rows, stream=None):
+    """
+    Writes a simple benchmark report table to the given stream (defaults
+    to stdout).
+
+    :param rows: sequence of (label, seconds) tuples.
+    """
+    if stream is None:
+        stream = sys.stdout
+    stream.write('\n%s\n%s\n' % (title, '-' * len(title)))
+    for label, secs in rows:
+        stream.write('%-40s %10.2f ms\n' % (label, secs * 1000))
+
+
+def run_benchmarks(benchmark_case_class):
+    """
+    Runs all benchmark methods of the given test case class.
+    """
+    loader = TestLoader()
+    loader.testMethodPrefix = 'benchmark'
+    suite = loader.loadTestsFromTestCase(benchmark_case_class)
+    TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,82 @@
+"""
+Benchmark comparing query evaluation on entities with query evaluation on
+columnar entity caches.
+
+This file is part of the everest project.
+See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
+
+Created on Oct 18, 2026.
+"""
+from everest.querying.specifications import DescendingOrderSpecification
+from everest.querying.specifications import ValueGreaterThanFilterSpecification
+from everest.querying.specifications import ValueStartsWithFilterSpecification
+from everest.repositories.memory.cache import ColumnarEntityCache
+from everest.repositories.memory.cache import ColumnarEntityCacheView
+from everest.repositories.memory.querying import \
+        ObjectFilterSpecificationVisitor
+from everest.repositories.memory.querying import \
+        ObjectOrderSpecificationVisitor
+from everest.repositories.memory.querying import evaluate_columnar_query
+from everest.repositories.memory.querying import numpy
+from everest.testing import Pep8CompliantTestCase
+from everest.tests.benchmarks import report
+from everest.tests.benchmarks import run_benchmarks
+from everest.tests.benchmarks import time_call
+from everest.tests.simple_app.entities import FooEntity
+
+__docformat__ = 'reStructuredText en'
+__all__ = ['ColumnarQueryBenchmark',
+           ]
+
+
+class ColumnarQueryBenchmark(Pep8CompliantTestCase):
+    #: Number of entities in the benchmarked cache.
+    entity_count = 100000
+    #: Size of the requested page.
+    page_size = 100
+
+    def set_up(self):
+        self._entities = [FooEntity(id=idx, name='foo%d' % idx)
+                          for idx in xrange(self.entity_count)]
+        self._cache = ColumnarEntityCache(FooEntity)
+        for ent in self._entities:
+            self._cache.add(ent, check_conflicts=False)
+        self._filter_spec = \
+            ValueStartsWithFilterSpecification('name', 'foo1') \
+            & ValueGreaterThanFilterSpecification('id',
+                                                  self.entity_count / 20)
+        self._order_spec = DescendingOrderSpecification('name')
+
+    def benchmark_queries(self):
+        rows = [('entities', time_call(self.__query_entities,
+                                       repetitions=3))]
+        modes = [('columns', False)]
+        if not numpy is None:
+            modes.append(('columns (NumPy)', True))
+        for label, use_numpy in modes:
+            rows.append((label,
+                         time_call(lambda: self.__query_columns(use_numpy),
+                                   repetitions=3)))
+        report('Filter, order and page (%d entities)' % self.entity_count,
+               rows)
+
+    def __query_entities(self):
+        filter_visitor = ObjectFilterSpecificationVisitor()
+        self._filter_spec.accept(filter_visitor)
+        order_visitor = ObjectOrderSpecificationVisitor()
+        self._order_spec.accept(order_visitor)
+        ents = order_visitor.expression(
+                                filter_visitor.expression(self._entities))
+        return ents[:self.page_size]
+
+    def __query_columns(self, use_numpy):
+        # Each query runs in a new session view.
+        view = ColumnarEntityCacheView(self._cache, lambda ent: ent)
+        return evaluate_columnar_query(view, self._filter_spec,
+                                       self._order_spec,
+                                       slice(0, self.page_size),
+                                       use_numpy=use_numpy)[0]
+
+
+if __name__ == '__main__':
+    run_benchmarks(ColumnarQueryBenchmark)
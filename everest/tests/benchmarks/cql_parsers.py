@@ -0,0 +1,81 @@
+"""
+Benchmark comparing the CQL parser engines.
+
+This file is part of the everest project.
+See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
+
+Created on Oct 18, 2026.
+"""
+from everest.resources.utils import get_root_collection
+from everest.testing import ResourceTestCase
+from everest.tests.benchmarks import report
+from everest.tests.benchmarks import run_benchmarks
+from everest.tests.benchmarks import time_call
+from everest.tests.complete_app.interfaces import IMyEntity
+from everest.tests.complete_app.interfaces import IMyEntityParent
+from everest.tests.complete_app.testing import create_entity
+from everest.url import UrlPartsConverter
+
+__docformat__ = 'reStructuredText en'
+__all__ = ['CqlParserBenchmark',
+           ]
+
+
+class CqlParserBenchmark(ResourceTestCase):
+    package_name = 'everest.tests.complete_app'
+    config_file_name = 'configure_no_rdb.zcml'
+    #: Number of values in the benchmarked long value lists.
+    value_count = 500
+
+    def set_up(self):
+        ResourceTestCase.set_up(self)
+        coll = get_root_collection(IMyEntity)
+        parent_coll = get_root_collection(IMyEntityParent)
+        for idx in xrange(self.value_count):
+            mb = coll.create_member(create_entity(entity_id=idx,
+                                                  entity_text='text%d' % idx))
+            parent_coll.add(mb.parent)
+
+    def benchmark_filter_parsers(self):
+        url_values = ','.join(['"http://0.0.0.0:6543/my-entity-parents/%d/"'
+                               % idx for idx in xrange(self.value_count)])
+        exprs = [
+            ('simple', 'name:equal-to:"Nikos"'),
+            ('junctions',
+             '(name:starts-with:"Ni" AND name:ends-with:"kos") OR '
+             '(age:greater-than:34 AND age:less-than:44) OR '
+             'birthday:equal-to:"1966-04-21T15:23:01Z"'),
+            ('old-style', 'name:starts-with:"Ni","Ol"~age:equal-to:34,44~'
+                          'discount:equal-to:-20,-30'),
+            ('long value list',
+             'id:contained:%s' % ','.join([str(idx % (self.value_count / 2))
+                                           for idx in
+                                           xrange(self.value_count)])),
+            ('long URL list', 'parent:equal-to:%s' % url_values),
+            ]
+        rows = []
+        for engine, parse in \
+                sorted(UrlPartsConverter.filter_parsers.iteritems()):
+            for label, expr in exprs:
+                repetitions = 5 if label == 'long URL list' else 50
+                rows.append(('%s: %s' % (engine, label),
+                             time_call(lambda: parse(expr),
+                                       repetitions=repetitions)))
+        report('CQL filter parsers', rows)
+
+    def benchmark_order_parsers(self):
+        exprs = [('simple', 'name:asc'),
+                 ('multiple', 'name:asc~age:desc~address.street:asc'),
+                 ]
+        rows = []
+        for engine, parse in \
+                sorted(UrlPartsConverter.order_parsers.iteritems()):
+            for label, expr in exprs:
+                rows.append(('%s: %s' % (engine, label),
+                             time_call(lambda: parse(expr),
+                                       repetitions=50)))
+        report('CQL order parsers', rows)
+
+
+if __name__ == '__main__':
+    run_benchmarks(CqlParserBenchmark)
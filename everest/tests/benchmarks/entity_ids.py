@@ -0,0 +1,55 @@
+"""
+Benchmark comparing the entity ID generation strategies.
+
+This file is part of the everest project.
+See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
+
+Created on Oct 18, 2026.
+"""
+from everest.repositories.memory import Aggregate
+from everest.repositories.memory import Repository
+from everest.repositories.memory import Session
+from everest.repositories.memory.ids import ENTITY_ID_GENERATORS
+from everest.testing import Pep8CompliantTestCase
+from everest.tests.benchmarks import report
+from everest.tests.benchmarks import run_benchmarks
+from everest.tests.benchmarks import time_call
+from everest.tests.simple_app.entities import FooEntity
+
+__docformat__ = 'reStructuredText en'
+__all__ = ['EntityIdBenchmark',
+           ]
+
+
+class EntityIdBenchmark(Pep8CompliantTestCase):
+    #: Number of entities added in one bulk add.
+    entity_count = 100000
+
+    def benchmark_bulk_add(self):
+        rows = []
+        for name, gen_cls in sorted(ENTITY_ID_GENERATORS.iteritems()):
+            rows.extend([
+                ('%s: generate' % name,
+                 time_call(lambda: self.__generate(gen_cls()),
+                           repetitions=3)),
+                ('%s: bulk add' % name,
+                 time_call(lambda: self.__add_all(gen_cls()),
+                           repetitions=3)),
+                ])
+        report('Entity IDs (%d entities)' % self.entity_count, rows)
+
+    def __generate(self, id_generator):
+        new_id = id_generator.new_id
+        for _ in xrange(self.entity_count):
+            new_id(FooEntity)
+
+    def __add_all(self, id_generator):
+        repo = Repository('BENCHMARK', Aggregate)
+        repo.configure(id_generator=id_generator)
+        session = Session(repo)
+        ents = [FooEntity() for _ in xrange(self.entity_count)]
+        session.add_all(FooEntity, ents)
+
+
+if __name__ == '__main__':
+    run_benchmarks(EntityIdBenchmark)
@@ -0,0 +1,70 @@
+"""
+Benchmark comparing the registered JSON codecs.
+
+This file is part of the everest project. 
+See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
+
+Created on Oct 18, 2026.
+"""
+from StringIO import StringIO
+from everest.mime import JsonMime
+from everest.representers.json import JSON_CODEC_OPTION
+from everest.representers.json import JsonCodecRegistry
+from everest.representers.utils import as_representer
+from everest.resources.utils import get_root_collection
+from everest.testing import ResourceTestCase
+from everest.tests.benchmarks import report
+from everest.tests.benchmarks import run_benchmarks
+from everest.tests.benchmarks import time_call
+from everest.tests.complete_app.interfaces import IMyEntity
+from everest.tests.complete_app.interfaces import IMyEntityParent
+from everest.tests.complete_app.testing import create_entity
+
+__docformat__ = 'reStructuredText en'
+__all__ = ['JsonCodecBenchmark',
+           ]
+
+
+class JsonCodecBenchmark(ResourceTestCase):
+    package_name = 'everest.tests.complete_app'
+    config_file_name = 'configure_no_rdb.zcml'
+    #: Number of members in the benchmarked MyEntity collection.
+    collection_size = 2000
+
+    def set_up(self):
+        ResourceTestCase.set_up(self)
+        coll = get_root_collection(IMyEntity)
+        parent_coll = get_root_collection(IMyEntityParent)
+        for idx in xrange(self.collection_size):
+            mb = coll.create_member(create_entity(entity_id=idx,
+                                                  entity_text='text%d' % idx))
+            parent_coll.add(mb.parent)
+        self._collection = coll
+
+    def benchmark_codecs(self):
+        rpr = as_representer(self._collection, JsonMime)
+        rows = []
+        for codec_cls in JsonCodecRegistry.get_available():
+            rpr.configure(options={JSON_CODEC_OPTION:codec_cls.name})
+            rpr_str = rpr.to_string(self._collection)
+            json_data = codec_cls.decode(rpr_str)
+            name = codec_cls.name
+            rows.extend([
+                ('%s: encode' % name,
+                 time_call(lambda: codec_cls.encode(json_data))),
+                ('%s: decode' % name,
+                 time_call(lambda: codec_cls.decode(rpr_str))),
+                ('%s: incremental decode' % name,
+                 time_call(lambda: list(codec_cls.iterdecode(
+                                                    StringIO(rpr_str))))),
+                ('%s: collection -> JSON' % name,
+                 time_call(lambda: rpr.to_string(self._collection))),
+                ('%s: JSON -> collection' % name,
+                 time_call(lambda: rpr.from_string(rpr_str))),
+                ])
+        report('JSON codecs (%d MyEntity members)' % self.collection_size,
+               rows)
+
+
+if __name__ == '__main__':
+    run_benchmarks(JsonCodecBenchmark)
@@ -0,0 +1,103 @@
+"""
+Benchmark comparing the append-only staging session with a staging session
+backed by entity caches.
+
+This file is part of the everest project.
+See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
+
+Created on Oct 18, 2026.
+"""
+from StringIO import StringIO
+from collections import defaultdict
+from everest.mime import CsvMime
+from everest.repositories.memory.aggregate import MemoryAggregate
+from everest.repositories.memory.cache import EntityCache
+from everest.resources.io import dump_resource
+from everest.resources.staging import StagingSession
+from everest.resources.utils import get_collection_class
+from everest.resources.utils import get_member_class
+from everest.testing import ResourceTestCase
+from everest.tests.benchmarks import report
+from everest.tests.benchmarks import run_benchmarks
+from everest.tests.benchmarks import time_call
+from everest.tests.complete_app.entities import MyEntity
+from everest.tests.complete_app.interfaces import IMyEntity
+from everest.tests.complete_app.testing import create_entity
+
+__docformat__ = 'reStructuredText en'
+__all__ = ['StagingBenchmark',
+           ]
+
+
+class EntityCacheStagingSession(object):
+    """
+    Staging session holding the entities in entity caches (the former
+    staging session implementation).
+    """
+    def __init__(self):
+        self.__cache_map = \
+                        defaultdict(lambda: EntityCache(allow_none_id=True))
+
+    def add(self, entity_class, entity):
+        self.__cache_map[entity_class].add(entity)
+
+    def get_by_id(self, entity_class, entity_id):
+        return self.__cache_map[entity_class].get_by_id(entity_id)
+
+    def iterator(self, entity_class):
+        return self.__cache_map[entity_class].iterator()
+
+    def get_columnar_view(self, entity_class): # pylint: disable=W0613
+        return None
+
+
+class StagingBenchmark(ResourceTestCase):
+    package_name = 'everest.tests.complete_app'
+    config_file_name = 'configure_no_rdb.zcml'
+    #: Number of members in the benchmarked staging collections.
+    collection_size = 2000
+
+    def set_up(self):
+        ResourceTestCase.set_up(self)
+        self._entities = [create_entity(entity_id=idx,
+                                        entity_text='text%d' % idx)
+                          for idx in xrange(self.collection_size)]
+
+    def benchmark_staging_sessions(self):
+        rows = []
+        session_classes = [('entity cache', EntityCacheStagingSession),
+                           ('append-only', StagingSession)]
+        for name, session_class in session_classes:
+            rows.extend([
+                ('%s: add' % name,
+                 time_call(lambda: self.__fill(session_class))),
+                ('%s: add and iterate' % name,
+                 time_call(lambda: list(self.__fill(session_class)))),
+                ('%s: add and look up' % name,
+                 time_call(lambda: self.__look_up(session_class))),
+                ('%s: add and dump' % name,
+                 time_call(lambda: self.__dump(session_class))),
+                ])
+        report('Staging sessions (%d members)' % self.collection_size, rows)
+
+    def __fill(self, session_class):
+        session = session_class()
+        agg = MemoryAggregate.create(MyEntity, lambda: session)
+        coll = get_collection_class(IMyEntity).create_from_aggregate(agg)
+        mb_cls = get_member_class(IMyEntity)
+        for ent in self._entities:
+            coll.add(mb_cls.create_from_entity(ent))
+        return coll
+
+    def __look_up(self, session_class):
+        agg = self.__fill(session_class).get_aggregate()
+        for idx in xrange(self.collection_size):
+            agg.get_by_id(idx)
+
+    def __dump(self, session_class):
+        dump_resource(self.__fill(session_class), StringIO(),
+                      content_type=CsvMime)
+
+
+if __name__ == '__main__':
+    run_benchmarks(StagingBenchmark)
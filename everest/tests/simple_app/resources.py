@@ -3,6 +3,7 @@ from everest.resources.base import Member
 
 
 class FooMember(Member):
+    __slots__ = ()
     relation = 'http://everest.org/relations/foomember'
 
 
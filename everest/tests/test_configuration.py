@@ -7,16 +7,20 @@ Created on Jan 18, 2012.
 from everest.configuration import Configurator
 from everest.interfaces import IResourceUrlConverter
 from everest.mime import CsvMime
+from everest.mime import JsonMime
+from everest.querying.base import CQL_PARSER_ENGINES
 from everest.querying.base import EXPRESSION_KINDS
 from everest.querying.interfaces import IFilterSpecificationFactory
 from everest.querying.interfaces import IFilterSpecificationVisitor
 from everest.querying.interfaces import IOrderSpecificationFactory
 from everest.querying.interfaces import IOrderSpecificationVisitor
+from everest.querying.utils import get_cql_parser_engine
 from everest.repositories.constants import REPOSITORY_TYPES
 from everest.repositories.interfaces import IRepositoryManager
 from everest.repositories.memory import Aggregate
 from everest.representers.csv import CsvResourceRepresenter
 from everest.representers.interfaces import IRepresenterRegistry
+from everest.representers.json import JSON_CODEC_OPTION
 from everest.resources.interfaces import IService
 from everest.resources.utils import get_collection_class
 from everest.testing import Pep8CompliantTestCase
@@ -24,6 +28,8 @@ from everest.tests import simple_app as package
 from everest.tests.simple_app.entities import FooEntity
 from everest.tests.simple_app.interfaces import IFoo
 from everest.tests.simple_app.resources import FooMember
+from everest.views.cache import ResponseCache
+from everest.views.interfaces import IResponseCache
 from pyramid.testing import DummyRequest
 from pyramid.testing import setUp as testing_set_up
 from pyramid.testing import tearDown as testing_tear_down
@@ -127,6 +133,29 @@ class ConfiguratorTestCase(Pep8CompliantTestCase):
         self.assert_true(rpr_reg.is_registered_representer_class(
                                                         MyRepresenterClass))
 
+    def test_json_codec_setting(self):
+        self._config.setup_registry(settings=dict(json_codec='ujson'))
+        rpr_reg = self._registry.queryUtility(IRepresenterRegistry)
+        mp_reg = rpr_reg.get_mapping_registry(JsonMime)
+        mp = mp_reg.create_mapping(FooMember)
+        self.assert_equal(mp.configuration.get_option(JSON_CODEC_OPTION),
+                          'ujson')
+
+    def test_cql_parser_setting(self):
+        self.assert_equal(get_cql_parser_engine(),
+                          CQL_PARSER_ENGINES.PYPARSING)
+        self._config.setup_registry(settings=dict(cql_parser='native'))
+        self.assert_equal(get_cql_parser_engine(), CQL_PARSER_ENGINES.NATIVE)
+        self.assert_raises(ValueError, self._config.setup_registry,
+                           settings=dict(cql_parser='foo'))
+
+    def test_response_cache_setting(self):
+        self.assert_is_none(self._registry.queryUtility(IResponseCache))
+        self._config.setup_registry(
+                        settings=dict(response_cache_max_bytes='1000000'))
+        cache = self._registry.queryUtility(IResponseCache)
+        self.assert_true(isinstance(cache, ResponseCache))
+
     def test_add_resource_representer(self):
         self.assert_raises(ValueError, self._config.add_resource_representer,
                            NotAMember, CsvMime)
@@ -4,6 +4,7 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Jun 1, 2011.
 """
+from everest.mime import CsvMime
 from everest.querying.specifications import FilterSpecificationFactory
 from everest.repositories.rdb import SqlFilterSpecificationVisitor
 from everest.repositories.rdb.querying import OrmAttributeInspector
@@ -12,6 +13,7 @@ from everest.representers.config import IGNORE_OPTION
 from everest.representers.config import RepresenterConfiguration
 from everest.representers.config import WRITE_AS_LINK_OPTION
 from everest.representers.mapping import SimpleMappingRegistry
+from everest.representers.utils import as_representer
 from everest.resources.attributes import ResourceAttributeKinds
 from everest.resources.attributes import get_resource_class_attribute_names
 from everest.resources.attributes import is_collection_attribute
@@ -169,6 +171,19 @@ class DescriptorsTestCase(RdbTestCaseMixin, ResourceTestCase):
         context.update_from_data(data_el)
         self.assert_equal(context.text, self.UPDATED_TEXT)
 
+    def test_update_terminal_datetime(self):
+        # The naive default datetime of the entity can not be compared to
+        # the offset-aware datetime parsed from the representation.
+        my_entity = create_entity()
+        coll = get_root_collection(IMyEntity)
+        context = coll.create_member(my_entity)
+        self.assert_true(context.date_time.tzinfo is None)
+        rpr = as_representer(context, CsvMime)
+        data_el = rpr.data_from_representation(rpr.to_string(context))
+        changed_attr_names = context.update_from_data(data_el)
+        self.assert_true('date_time' in changed_attr_names)
+        self.assert_false(context.date_time.tzinfo is None)
+
     def test_update_terminal_in_parent(self):
         my_entity = create_entity()
         my_entity.parent.text = self.UPDATED_TEXT
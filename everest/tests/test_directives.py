@@ -9,6 +9,7 @@ Created on Jun 17, 2011.
 from everest.configuration import Configurator
 from everest.entities.interfaces import IEntity
 from everest.repositories.interfaces import IRepositoryManager
+from everest.repositories.memory.ids import CounterEntityIdGenerator
 from everest.mime import CsvMime
 from everest.representers.base import Representer
 from everest.representers.interfaces import IRepresenter
@@ -99,6 +100,10 @@ class DirectivesTestCase(Pep8CompliantTestCase):
         self.assert_is_not_none(repo_mgr.get('CUSTOM_MEMORY'))
         self.assert_is_not_none(repo_mgr.get('CUSTOM_FILESYSTEM'))
         self.assert_is_not_none(repo_mgr.get('CUSTOM_RDB'))
+        cnf = repo_mgr.get('CUSTOM_MEMORY').configuration
+        self.assert_equal(cnf['columnar_entity_classes'], (FooEntity,))
+        self.assert_true(isinstance(cnf['id_generator'],
+                                    CounterEntityIdGenerator))
 
     def __check(self, reg, member, ent, coll):
         for idx, obj in enumerate((member, coll, ent)):
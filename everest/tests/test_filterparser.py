@@ -6,6 +6,8 @@ Created on Feb 4, 2011.
 """
 from datetime import datetime
 from everest.querying.filterparser import parse_filter
+from everest.querying.nativeparser import parse_filter \
+        as parse_filter_native
 from everest.querying.operators import ENDS_WITH
 from everest.querying.operators import EQUAL_TO
 from everest.querying.operators import GREATER_THAN
@@ -20,7 +22,8 @@ from everest.testing import TestCaseWithConfiguration
 from pyparsing import ParseException
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['QueryParserTestCase',
+__all__ = ['NativeQueryParserTestCase',
+           'QueryParserTestCase',
            ]
 
 
@@ -100,6 +103,23 @@ class QueryParserTestCase(TestCaseWithConfiguration):
         result1 = self.parser(expr1)
         self.assert_true(isinstance(result1, DisjunctionFilterSpecification))
 
+    def test_chained_criteria_query(self):
+        expr = 'name:starts-with:"Ni" AND name:ends-with:"kos" ' \
+               'AND age:equal-to:34 OR age:equal-to:44'
+        result = self.parser(expr)
+        self.assert_true(isinstance(result,
+                                    DisjunctionFilterSpecification))
+        self.assert_true(isinstance(result.left_spec,
+                                    ConjunctionFilterSpecification))
+        self.assert_true(isinstance(result.left_spec.left_spec,
+                                    ConjunctionFilterSpecification))
+        self.assert_equal(result.left_spec.left_spec.left_spec.attr_value,
+                          'Ni')
+        self.assert_equal(result.left_spec.left_spec.right_spec.attr_value,
+                          'kos')
+        self.assert_equal(result.left_spec.right_spec.attr_value, 34)
+        self.assert_equal(result.right_spec.attr_value, 44)
+
     def test_multiple_criterion_query(self):
         def _test(expr):
             result = self.parser(expr)
@@ -295,3 +315,13 @@ class QueryParserTestCase(TestCaseWithConfiguration):
         _check_expr(expr)
         expr = 'birthday:equal-to:"1966-04-21T15:61:00Z"'
         _check_expr(expr)
+
+
+class NativeQueryParserTestCase(QueryParserTestCase):
+    """
+    Runs the filter parser tests against the native parser engine.
+    """
+
+    def set_up(self):
+        QueryParserTestCase.set_up(self)
+        self.parser = parse_filter_native
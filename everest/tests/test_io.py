@@ -10,7 +10,9 @@ from everest.repositories.rdb.utils import RdbTestCaseMixin
 from everest.repositories.rdb.utils import reset_metadata
 from everest.representers.config import IGNORE_OPTION
 from everest.resources.io import ConnectedResourcesSerializer
+from everest.resources.io import _ParallelZipFileLoader # pylint: disable=W0212
 from everest.resources.io import build_resource_dependency_graph
+from everest.resources.io import build_resource_graph
 from everest.resources.io import dump_resource
 from everest.resources.io import dump_resource_to_files
 from everest.resources.io import dump_resource_to_zipfile
@@ -36,6 +38,7 @@ from everest.tests.complete_app.interfaces import IMyEntityGrandchild
 from everest.tests.complete_app.interfaces import IMyEntityParent
 from everest.tests.complete_app.resources import MyEntityChildMember
 from everest.tests.complete_app.resources import MyEntityGrandchildMember
+from threading import current_thread
 import glob
 import os
 import shutil
@@ -141,6 +144,33 @@ class ConnectedResourcesTestCase(ResourceGraphTestCase):
                                             dependency_graph=dep_grph)
         self.assert_equal(len(coll_map[MyEntityChildMember]), 2)
 
+    def test_find_connected_order(self):
+        coll = create_staging_collection(IMyEntity)
+        for idx in xrange(10):
+            parent = MyEntityParent(id=idx)
+            entity = MyEntity(id=idx, parent=parent)
+            parent.child = entity
+            for child_idx in xrange(3):
+                child = MyEntityChild(id=3 * idx + child_idx, parent=entity)
+                entity.children.append(child)
+            coll.create_member(entity)
+        coll_map = find_connected_resources(coll)
+        self.assert_equal(coll_map.keys()[0], get_member_class(IMyEntity))
+        self.assert_equal([mb.id for mb in coll_map.values()[0]],
+                          range(10))
+        self.assert_equal(len(coll_map[get_member_class(IMyEntityParent)]),
+                          10)
+        self.assert_equal(len(coll_map[MyEntityChildMember]), 30)
+
+    def test_build_resource_graph(self):
+        member = _make_test_entity_member()
+        grph = build_resource_graph(member)
+        self.assert_equal(len(grph.nodes()), 4)
+        self.assert_true(grph.has_node(member))
+        child = iter(member.children).next()
+        self.assert_true(grph.has_node(child))
+        self.assert_equal(len(grph.edges()), 3)
+
     def test_convert_to_strings(self):
         member = _make_test_entity_member()
         srl = ConnectedResourcesSerializer(CsvMime)
@@ -179,6 +209,71 @@ class _ZipResourceIoTestCaseBase(_ResourceIoTestCaseBase):
         self.assert_equal(len(colls[2]), 1)
         self.assert_equal(len(colls[3]), 1)
 
+    def test_load_from_zipfile_parallel(self):
+        member = _make_test_entity_member()
+        strm = StringIO('w')
+        dump_resource_to_zipfile(member, strm)
+        colls = [
+                 get_root_collection(IMyEntityParent),
+                 get_root_collection(IMyEntity),
+                 get_root_collection(IMyEntityChild),
+                 get_root_collection(IMyEntityGrandchild),
+                 ]
+        colls = load_into_collections_from_zipfile(colls, strm,
+                                                   max_workers=4,
+                                                   check_conflicts=False)
+        self.assert_equal([len(coll) for coll in colls], [1, 1, 1, 1])
+        self.assert_equal(iter(colls[3]).next().parent.id, 0)
+
+    def test_load_from_zipfile_parallel_independent(self):
+        # Neither collection references the other, so both are parsed on
+        # worker threads.
+        strm = StringIO('w')
+        zipf = zipfile.ZipFile(strm, 'w')
+        for ent in (MyEntityParent(id=0), MyEntityGrandchild(id=0)):
+            coll = create_staging_collection(type(ent))
+            coll.create_member(ent)
+            rpr_strm = StringIO('w')
+            dump_resource(coll, rpr_strm)
+            zipf.writestr(get_collection_filename(type(ent)),
+                          rpr_strm.getvalue())
+        zipf.close()
+        colls = [
+                 get_root_collection(IMyEntityParent),
+                 get_root_collection(IMyEntityGrandchild),
+                 ]
+        colls = load_into_collections_from_zipfile(colls, strm,
+                                                   max_workers=2)
+        self.assert_equal([len(coll) for coll in colls], [1, 1])
+
+    def test_parallel_zipfile_loader_bounded(self):
+        # With fewer workers than independent files, the remaining files
+        # are submitted as results are consumed or parsed on demand.
+        ents = (MyEntityParent(id=0), MyEntityGrandchild(id=0))
+        strm = StringIO('w')
+        zipf = zipfile.ZipFile(strm, 'w')
+        for ent in ents:
+            coll = create_staging_collection(type(ent))
+            coll.create_member(ent)
+            rpr_strm = StringIO('w')
+            dump_resource(coll, rpr_strm)
+            zipf.writestr(get_collection_filename(type(ent)),
+                          rpr_strm.getvalue())
+        zipf.close()
+        for reverse in (False, True):
+            entries = [(create_staging_collection(type(ent)),
+                        get_collection_filename(type(ent)), CsvMime)
+                       for ent in ents]
+            loader = _ParallelZipFileLoader(zipfile.ZipFile(strm), entries,
+                                            1)
+            try:
+                for coll, _, __ in entries[::-1 if reverse else 1]:
+                    mbs = loader.load(coll)
+                    self.assert_equal(len(mbs), 1)
+                    self.assert_equal(mbs[0].id, 0)
+            finally:
+                loader.close()
+
 
 class ZipResourceIoTestCaseNoRdb(_ZipResourceIoTestCaseBase):
     config_file_name = 'configure_no_rdb.zcml'
@@ -204,14 +299,80 @@ class ZipResourceIoTestCaseNoRdb(_ZipResourceIoTestCaseBase):
         colls = load_into_collections_from_zipfile(colls, strm)
         self.assert_equal(len(colls[0]), 0)
 
+    def test_dump_to_zipfile_parallel(self):
+        member = _make_test_entity_member()
+        progress = []
+        srl = ConnectedResourcesSerializer(
+                    CsvMime, max_workers=4,
+                    progress_callback=lambda *args: progress.append(args))
+        strm = StringIO('w')
+        srl.to_zipfile(member, strm)
+        self.assert_equal(len(progress), 4)
+        self.assert_true(all([args[1] == 1 for args in progress]))
+        seq_strm = StringIO('w')
+        dump_resource_to_zipfile(member, seq_strm)
+        zipf = zipfile.ZipFile(strm)
+        seq_zipf = zipfile.ZipFile(seq_strm)
+        self.assert_equal(zipf.namelist(), seq_zipf.namelist())
+        for name in zipf.namelist():
+            self.assert_equal(zipf.read(name), seq_zipf.read(name))
+
 
 class ZipResourceIoTestCaseRdb(RdbTestCaseMixin, _ZipResourceIoTestCaseBase):
     config_file_name = 'configure.zcml'
 
+    def test_dump_to_zipfile_parallel(self):
+        # The entities are bound to the session of the calling thread, so
+        # the collections are serialized in the calling thread.
+        member = _make_test_entity_member()
+        coll = get_root_collection(IMyEntity)
+        member = coll.create_member(member.get_entity())
+        threads = []
+        srl = ConnectedResourcesSerializer(
+                    CsvMime, max_workers=4,
+                    progress_callback=
+                        lambda *args: threads.append(current_thread()))
+        strm = StringIO('w')
+        srl.to_zipfile(member, strm)
+        self.assert_equal(threads, [current_thread()] * 4)
+        seq_strm = StringIO('w')
+        dump_resource_to_zipfile(member, seq_strm)
+        zipf = zipfile.ZipFile(strm)
+        seq_zipf = zipfile.ZipFile(seq_strm)
+        self.assert_equal(zipf.namelist(), seq_zipf.namelist())
+        for name in zipf.namelist():
+            self.assert_equal(zipf.read(name), seq_zipf.read(name))
+
     @classmethod
     def teardown_class(cls):
         reset_metadata()
 
+    def test_load_from_zipfile_parallel_external_link(self):
+        # The child file links to a resource outside of the loaded
+        # collections which has to be resolved in the session of the
+        # calling thread.
+        get_root_collection(IMyEntity).create_member(
+                            MyEntity(id=0, parent=MyEntityParent(id=0)))
+        strm = StringIO('w')
+        zipf = zipfile.ZipFile(strm, 'w')
+        for ent in (MyEntityParent(id=1),
+                    MyEntityChild(id=0, parent=MyEntity(id=0))):
+            coll = create_staging_collection(type(ent))
+            coll.create_member(ent)
+            rpr_strm = StringIO('w')
+            dump_resource(coll, rpr_strm)
+            zipf.writestr(get_collection_filename(type(ent)),
+                          rpr_strm.getvalue())
+        zipf.close()
+        colls = [
+                 get_root_collection(IMyEntityParent),
+                 get_root_collection(IMyEntityChild),
+                 ]
+        colls = load_into_collections_from_zipfile(colls, strm,
+                                                   max_workers=2)
+        self.assert_equal([len(coll) for coll in colls], [2, 1])
+        self.assert_equal(iter(colls[1]).next().parent.id, 0)
+
 
 class StreamResourceIoTestCase(_ResourceIoTestCaseBase):
     config_file_name = 'configure_no_rdb.zcml'
@@ -6,6 +6,8 @@ Created on Feb 4, 2011.
 """
 from everest.querying.operators import ASCENDING
 from everest.querying.operators import DESCENDING
+from everest.querying.nativeparser import parse_order \
+        as parse_order_native
 from everest.querying.orderparser import parse_order
 from everest.querying.specifications import AscendingOrderSpecification
 from everest.querying.specifications import ConjunctionOrderSpecification
@@ -14,7 +16,8 @@ from everest.testing import TestCaseWithConfiguration
 from pyparsing import ParseException
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['OrderSpecificationParserTestCase',
+__all__ = ['NativeOrderSpecificationParserTestCase',
+           'OrderSpecificationParserTestCase',
            ]
 
 
@@ -54,3 +57,25 @@ class OrderSpecificationParserTestCase(TestCaseWithConfiguration):
         self.assert_equal(result.left.operator, DESCENDING)
         self.assert_equal(result.right.attr_name, 'age')
         self.assert_equal(result.right.operator, ASCENDING)
+
+    def test_three_sort_orders(self):
+        expr = 'name:desc~age:asc~(height:desc)'
+        result = self.parser(expr)
+        self.assert_true(isinstance(result, ConjunctionOrderSpecification))
+        self.assert_true(isinstance(result.left,
+                                    ConjunctionOrderSpecification))
+        self.assert_equal(result.left.left.attr_name, 'name')
+        self.assert_equal(result.left.right.attr_name, 'age')
+        self.assert_equal(result.right.attr_name, 'height')
+        self.assert_equal(result.right.operator, DESCENDING)
+
+
+class NativeOrderSpecificationParserTestCase(
+                                        OrderSpecificationParserTestCase):
+    """
+    Runs the order parser tests against the native parser engine.
+    """
+
+    def set_up(self):
+        OrderSpecificationParserTestCase.set_up(self)
+        self.parser = parse_order_native
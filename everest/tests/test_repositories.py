@@ -4,13 +4,40 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Jun 1, 2012.
 """
+from everest.entities.base import Entity
 from everest.entities.system import UserMessage
 from everest.entities.utils import get_root_aggregate
+from everest.exceptions import UnsupportedOperationException
 from everest.interfaces import IUserMessage
 from everest.mime import CsvMime
+from everest.querying.specifications import NaturalOrderSpecification
+from everest.querying.specifications import asc
+from everest.querying.specifications import cntd
+from everest.querying.specifications import cnts
+from everest.querying.specifications import desc
+from everest.querying.specifications import ends
+from everest.querying.specifications import eq
+from everest.querying.specifications import ge
+from everest.querying.specifications import gt
+from everest.querying.specifications import le
+from everest.querying.specifications import lt
+from everest.querying.specifications import rng
+from everest.querying.specifications import starts
 from everest.repositories.constants import REPOSITORY_TYPES
+from everest.repositories.filesystem.repository import FileSystemRepository
 from everest.repositories.memory import Aggregate
 from everest.repositories.memory import Repository
+from everest.repositories.memory.cache import ColumnarEntityCache
+from everest.repositories.memory.cache import ColumnarEntityCacheView
+from everest.repositories.memory.ids import CounterEntityIdGenerator
+from everest.repositories.memory.querying import \
+        ObjectFilterSpecificationVisitor
+from everest.repositories.memory.querying import \
+        ObjectOrderSpecificationVisitor
+from everest.repositories.memory.querying import evaluate_columnar_query
+from everest.repositories.memory.querying import numpy
+from everest.repositories.rdb.utils import RdbTestCaseMixin
+from everest.repositories.utils import as_repository
 from everest.resources.io import get_collection_name
 from everest.resources.io import get_read_collection_path
 from everest.resources.staging import create_staging_collection
@@ -20,15 +47,18 @@ from everest.resources.utils import get_service
 from everest.testing import Pep8CompliantTestCase
 from everest.testing import ResourceTestCase
 from everest.tests.complete_app.entities import MyEntity
+from everest.tests.complete_app.entities import MyEntityParent
 from everest.tests.complete_app.interfaces import IMyEntity
 from everest.tests.complete_app.interfaces import IMyEntityChild
 from everest.tests.complete_app.interfaces import IMyEntityGrandchild
 from everest.tests.complete_app.interfaces import IMyEntityParent
 from everest.tests.complete_app.resources import MyEntityMember
+from everest.tests.complete_app.testing import create_entity
 from everest.tests.simple_app.entities import FooEntity
 from everest.tests.simple_app.interfaces import IFoo
 from everest.tests.simple_app.resources import FooMember
 from everest.utils import get_repository_manager
+from unittest import SkipTest
 import glob
 import os
 import shutil
@@ -37,11 +67,15 @@ import transaction
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['BasicRepositoryTestCase',
+           'ColumnarEntityCacheTestCase',
            'MemorySystemRepositoryTestCase',
            'RdbSystemRepositoryTestCase',
            'RepositoryTestCase',
            'FileSystemEmptyRepositoryTestCase',
            'FileSystemRepositoryTestCase',
+           'MemoryRepoWithColumnarCacheTestCase',
+           'MemoryRepositoryVersionsTestCase',
+           'RdbRepositoryVersionsTestCase',
            ]
 
 
@@ -120,6 +154,46 @@ class RdbSystemRepositoryTestCase(_SystemRepositoryBaseTestCase):
         self.config.setup_system_repository(REPOSITORY_TYPES.RDB)
 
 
+class _RepositoryVersionsTestCaseBase(ResourceTestCase):
+    package_name = 'everest.tests.complete_app'
+
+    def test_versions(self):
+        repo = as_repository(IMyEntity)
+        init_time, version, last_modified = repo.get_version(MyEntity)
+        self.assert_equal(version, 0)
+        self.assert_equal(last_modified, init_time)
+        coll = get_root_collection(IMyEntity)
+        coll.create_member(create_entity())
+        transaction.commit()
+        init_time1, version1, last_modified1 = repo.get_version(MyEntity)
+        self.assert_equal(init_time1, init_time)
+        self.assert_equal(version1, 1)
+        self.assert_true(last_modified1 >= last_modified)
+        # Reading does not change the version.
+        self.assert_equal(len(coll), 1)
+        transaction.commit()
+        self.assert_equal(repo.get_version(MyEntity)[1], 1)
+        # Changing does.
+        mb = iter(coll).next()
+        mb.text = 'Changed.'
+        transaction.commit()
+        self.assert_equal(repo.get_version(MyEntity)[1], 2)
+        # Aborted changes do not change the version.
+        mb = iter(coll).next()
+        mb.text = 'Changed again.'
+        transaction.abort()
+        self.assert_equal(repo.get_version(MyEntity)[1], 2)
+
+
+class MemoryRepositoryVersionsTestCase(_RepositoryVersionsTestCaseBase):
+    config_file_name = 'configure_no_rdb.zcml'
+
+
+class RdbRepositoryVersionsTestCase(RdbTestCaseMixin,
+                                    _RepositoryVersionsTestCaseBase):
+    config_file_name = 'configure.zcml'
+
+
 class _FileSystemRepositoryTestCaseMixin(object):
     _data_dir = None
     package_name = 'everest.tests.complete_app'
@@ -282,6 +356,24 @@ class FileSystemRepositoryTestCase(_FileSystemRepositoryTestCaseMixin,
         repo = repo_mgr.get(REPOSITORY_TYPES.FILE_SYSTEM)
         self.assert_raises(ValueError, repo.configure, foo='bar')
 
+    def test_id_counters(self):
+        repo_mgr = get_repository_manager()
+        repo = repo_mgr.get(REPOSITORY_TYPES.FILE_SYSTEM)
+        repo.configure(id_generator=CounterEntityIdGenerator())
+        coll = get_root_collection(IMyEntityParent)
+        mb = coll.create_member(MyEntityParent())
+        # The counter starts after the largest loaded ID.
+        self.assert_equal(mb.id, 1)
+        transaction.commit()
+        coll.remove(mb)
+        transaction.commit()
+        # A new repository does not hand out the ID of the removed entity.
+        new_repo = repo_mgr.new(REPOSITORY_TYPES.FILE_SYSTEM)
+        new_repo.configure(directory=self._data_dir,
+                           id_generator=CounterEntityIdGenerator())
+        self.assert_equal(len(list(new_repo.iterator(MyEntityParent))), 1)
+        self.assert_equal(new_repo.id_generator.new_id(MyEntityParent), 2)
+
     def __copy_data_files(self):
         orig_data_dir = os.path.join(self._data_dir, 'original')
         for fn in glob.glob1(orig_data_dir, "*.csv"):
@@ -290,6 +382,10 @@ class FileSystemRepositoryTestCase(_FileSystemRepositoryTestCaseMixin,
     def __remove_data_files(self):
         for fn in glob.glob1(self._data_dir, '*.csv'):
             os.unlink(os.path.join(self._data_dir, fn))
+        counters_fn = os.path.join(self._data_dir,
+                                   FileSystemRepository.id_counters_file_name)
+        if os.path.isfile(counters_fn):
+            os.unlink(counters_fn)
 
 
 class MemoryRepoWithCacheLoaderTestCase(ResourceTestCase):
@@ -303,5 +399,207 @@ class MemoryRepoWithCacheLoaderTestCase(ResourceTestCase):
         self.assert_equal(len(list(agg.iterator())), 1)
 
 
+class ColumnarEntityCacheTestCase(Pep8CompliantTestCase):
+
+    def test_basics(self):
+        cache = ColumnarEntityCache(FooEntity)
+        for idx in range(3):
+            cache.add(FooEntity(id=idx, name='foo%d' % idx))
+        self.assert_equal(cache.attribute_names, ('id', 'name'))
+        self.assert_equal(cache.get_column('id').typecode, 'l')
+        ent = cache.get_by_id(1)
+        self.assert_true(isinstance(ent, FooEntity))
+        self.assert_equal(ent.name, 'foo1')
+        # Entities are materialized on demand.
+        self.assert_false(ent is cache.get_by_id(1))
+        self.assert_equal(cache.get_by_slug('foo2').id, 2)
+        self.assert_true(cache.has_slug('foo0'))
+        self.assert_is_none(cache.get_by_id(3))
+        self.assert_raises(ValueError, cache.add, FooEntity(id=0))
+        self.assert_raises(ValueError, cache.add, FooEntity(id=None))
+        cache.replace(FooEntity(id=0, name='bar0'))
+        self.assert_false(cache.has_slug('foo0'))
+        self.assert_equal([ent.name for ent in cache.iterator()],
+                          ['foo1', 'foo2', 'bar0'])
+        cache.remove(FooEntity(id=1))
+        cache.remove(FooEntity(id=2))
+        self.assert_equal([(ent.id, ent.name) for ent in cache.iterator()],
+                          [(0, 'bar0')])
+        self.assert_equal(cache.get_by_slug('bar0').id, 0)
+
+    def test_column_types(self):
+        cache = ColumnarEntityCache(FooEntity)
+        cache.add(FooEntity(id=0, name='foo0'))
+        # Values that do not fit the typed array convert it to a list.
+        cache.add(FooEntity(id='one', name='foo1'))
+        self.assert_equal(cache.get_column('id'), [0, 'one'])
+        self.assert_equal(cache.get_by_id('one').name, 'foo1')
+
+    def test_invalid_entities(self):
+        cache = ColumnarEntityCache(FooEntity)
+        cache.add(FooEntity(id=0))
+        ent = FooEntity(id=1)
+        ent.other = 'other'
+        self.assert_raises(ValueError, cache.add, ent)
+        self.assert_raises(ValueError, cache.add,
+                           FooEntity(id=1, name=FooEntity(id=2)))
+
+
+class MemoryRepoWithColumnarCacheTestCase(ResourceTestCase):
+    package_name = 'everest.tests.simple_app'
+    config_file_name = 'configure.zcml'
+
+    def set_up(self):
+        ResourceTestCase.set_up(self)
+        self.__repo = as_repository(IFoo)
+        self.__repo.configure(columnar_entity_classes=(FooEntity,))
+
+    def test_add_update_remove(self):
+        coll = get_root_collection(IFoo)
+        for idx in range(3):
+            coll.create_member(FooEntity(id=idx, name='foo%d' % idx))
+        transaction.commit()
+        cache = self.__repo._get_cache(FooEntity) # pylint: disable=W0212
+        self.assert_true(isinstance(cache, ColumnarEntityCache))
+        self.assert_equal(len(list(cache.iterator())), 3)
+        self.assert_equal(len(coll), 3)
+        mb = coll['foo1']
+        self.assert_true(mb.get_entity() is coll['foo1'].get_entity())
+        mb.get_entity().name = 'bar1'
+        coll.remove(coll['foo2'])
+        self.assert_equal(sorted([mb.get_entity().name for mb in coll]),
+                          ['bar1', 'foo0'])
+        transaction.commit()
+        self.assert_equal([ent.name for ent in cache.iterator()],
+                          ['foo0', 'bar1'])
+        coll.get_aggregate().get_by_id(0).name = 'changed'
+        transaction.abort()
+        self.assert_equal(cache.get_by_id(0).name, 'foo0')
+
+    def test_columnar_query(self):
+        coll = get_root_collection(IFoo)
+        for idx in range(20):
+            coll.create_member(FooEntity(id=idx,
+                                         name='foo%d-%d' % (idx % 7, idx)))
+        transaction.commit()
+        view = self.__repo.session_factory().get_columnar_view(FooEntity)
+        filter_spec = (starts(name='foo1') | gt(id=15)) & ~cntd(id=[8, 18])
+        order_spec = desc('name') & asc('id')
+        ents, count = evaluate_columnar_query(view, filter_spec, order_spec,
+                                              slice(1, 3), use_numpy=False)
+        self.assert_equal([ent.id for ent in ents], [17, 16])
+        self.assert_equal(count, 5)
+        # Only the entities in the slice were materialized.
+        self.assert_equal(sorted([ent.id for ent
+                                  in view.get_overridden_rows().values()]),
+                          [16, 17])
+        # Entities changed, removed and added in the session are evaluated
+        # as objects.
+        view.get_by_id(13).name = 'foo1-13'
+        view.remove(view.get_by_id(1))
+        new_ent = FooEntity(id=20, name='foo1-20')
+        self.__repo.session_factory().add(FooEntity, new_ent)
+        ents, count = evaluate_columnar_query(view, filter_spec, order_spec,
+                                              use_numpy=False)
+        self.assert_equal([ent.id for ent in ents], [19, 17, 16, 20, 15, 13])
+        self.assert_equal(count, 6)
+        agg = get_root_aggregate(IFoo)
+        agg.filter = filter_spec
+        agg.order = order_spec
+        self.assert_equal([ent.id for ent in agg.iterator()],
+                          [19, 17, 16, 20, 15, 13])
+        # Specifications that can not be evaluated on the columns fall
+        # back to evaluating them on the entities.
+        agg.filter = None
+        agg.order = NaturalOrderSpecification('name')
+        self.assert_raises(UnsupportedOperationException,
+                           evaluate_columnar_query, view,
+                           order_spec=agg.order)
+        self.assert_equal(agg.count(), 20)
+        self.assert_equal([ent.name for ent in agg.iterator()][:3],
+                          ['foo0-0', 'foo0-7', 'foo0-14'])
+
+    def test_columnar_query_matches_objects(self):
+        self.__check_columnar_queries(False)
+
+    def test_columnar_query_numpy(self):
+        if numpy is None:
+            raise SkipTest('NumPy is not installed.')
+        self.__check_columnar_queries(True)
+
+    def __check_columnar_queries(self, use_numpy):
+        # Compares the results of columnar query evaluation with the results
+        # of evaluating the queries on the entities.
+        cache = ColumnarEntityCache(_ColumnarEntity)
+        for idx in range(30):
+            cache.add(_ColumnarEntity(id=idx, name='n%02d' % (idx * 7 % 30),
+                                      number=idx % 5 + 0.5,
+                                      flag=idx % 3 == 0))
+        filter_specs = [None,
+                        gt(id=10) & le(id=25),
+                        lt(id=5) | ge(id=28),
+                        cntd(id=[3, 4, 99]),
+                        eq(number=2.5),
+                        rng(number=(1.0, 3.0)),
+                        cntd(number=[0.5, 4.5]),
+                        starts(name='n1') & ~ends(name='4'),
+                        cnts(name='2') | lt(name='n05'),
+                        cntd(name=['n07', 'n21']),
+                        eq(flag=True) & gt(number=1),
+                        ]
+        order_specs = [None,
+                       asc('number'),
+                       desc('number'),
+                       desc('name'),
+                       asc('flag') & desc('id'),
+                       desc('flag') & asc('number') & desc('name'),
+                       ]
+        for session_changes in (False, True):
+            for filter_spec in filter_specs:
+                for order_spec in order_specs:
+                    view = self.__make_view(cache, session_changes)
+                    ents = list(view.iterator())
+                    if not filter_spec is None:
+                        visitor = ObjectFilterSpecificationVisitor()
+                        filter_spec.accept(visitor)
+                        ents = visitor.expression(ents)
+                    if not order_spec is None:
+                        visitor = ObjectOrderSpecificationVisitor()
+                        order_spec.accept(visitor)
+                        ents = visitor.expression(ents)
+                    view = self.__make_view(cache, session_changes)
+                    col_ents, count = \
+                        evaluate_columnar_query(view, filter_spec,
+                                                order_spec, slice(2, 9),
+                                                use_numpy=use_numpy)
+                    self.assert_equal([ent.id for ent in col_ents],
+                                      [ent.id for ent in ents[2:9]])
+                    self.assert_equal(count, len(ents))
+        # Rows added to the cache after a query are picked up.
+        cache.add(_ColumnarEntity(id=31, name='n31', number=9.5,
+                                  flag=False))
+        view = ColumnarEntityCacheView(cache, lambda ent: ent)
+        ents = evaluate_columnar_query(view, gt(number=5), desc('number'),
+                                       use_numpy=use_numpy)[0]
+        self.assert_equal([ent.id for ent in ents], [31])
+
+    def __make_view(self, cache, session_changes):
+        view = ColumnarEntityCacheView(cache, lambda ent: ent)
+        if session_changes:
+            view.get_by_id(7).number = 3.5
+            view.remove(view.get_by_id(12))
+            view.add(_ColumnarEntity(id=30, name='n30', number=2.5,
+                                     flag=True))
+        return view
+
+
+class _ColumnarEntity(Entity):
+    def __init__(self, name=None, number=None, flag=None, **kw):
+        Entity.__init__(self, **kw)
+        self.name = name
+        self.number = number
+        self.flag = flag
+
+
 def entity_loader(entity_class):
     return [entity_class()]
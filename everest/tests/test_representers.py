@@ -4,6 +4,7 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Mar 2, 2012.
 """
+from StringIO import StringIO
 from collections import OrderedDict
 from everest.mime import AtomMime
 from everest.mime import CsvMime
@@ -11,13 +12,18 @@ from everest.mime import JsonMime
 from everest.mime import XmlMime
 from everest.querying.utils import get_filter_specification_factory
 from everest.querying.utils import get_order_specification_factory
+from everest.representers.atom import XML_NS_ATOM
 from everest.representers.attributes import MappedAttribute
 from everest.representers.config import IGNORE_OPTION
 from everest.representers.config import REPR_NAME_OPTION
 from everest.representers.config import WRITE_AS_LINK_OPTION
+from everest.representers.converters import SimpleConverterRegistry
 from everest.representers.csv import CsvData
 from everest.representers.csv import CsvResourceRepresenter
 from everest.representers.interfaces import IRepresenterRegistry
+from everest.representers.json import IncrementalJsonArrayDecoder
+from everest.representers.json import JSON_CODEC_OPTION
+from everest.representers.json import JsonCodecRegistry
 from everest.representers.json import JsonDataTreeTraverser
 from everest.representers.traversal import \
                         DataElementBuilderRepresentationDataVisitor
@@ -26,8 +32,10 @@ from everest.representers.utils import get_mapping_registry
 from everest.representers.xml import NAMESPACE_MAPPING_OPTION
 from everest.representers.xml import XML_NAMESPACE_OPTION
 from everest.representers.xml import XML_PREFIX_OPTION
+from everest.representers.xml import XML_PRETTY_PRINT_OPTION
 from everest.representers.xml import XML_SCHEMA_OPTION
 from everest.representers.xml import XML_TAG_OPTION
+from everest.representers.xml import XmlParserFactory
 from everest.resources.kinds import ResourceKinds
 from everest.resources.link import Link
 from everest.resources.staging import create_staging_collection
@@ -41,6 +49,10 @@ from everest.tests.complete_app.interfaces import IMyEntity
 from everest.tests.complete_app.resources import MyEntityMember
 from everest.tests.complete_app.resources import MyEntityParentMember
 from everest.tests.complete_app.testing import create_collection
+from json import JSONDecoder
+from json import dumps
+from lxml import etree
+from lxml import objectify
 from zope.interface import Interface # pylint: disable=E0611,F0401
 import os
 
@@ -96,6 +108,25 @@ class RepresenterRegistryTestCase(ResourceTestCase):
         mp_after = mp_reg.find_mapping(type(mb))
         self.assert_true(mp_before is mp_after)
 
+    def test_representer_cache(self):
+        coll = create_collection()
+        rpr = as_representer(coll, CsvMime)
+        # Each caller gets its own copy of the cached representer.
+        other_rpr = as_representer(coll, CsvMime)
+        self.assert_false(other_rpr is rpr)
+        self.assert_true(isinstance(other_rpr, CsvResourceRepresenter))
+        # Configuring a representer does not affect other copies.
+        rpr.configure(attribute_options={('text',):{IGNORE_OPTION:True}})
+        self.assert_equal(rpr.to_string(coll).find('"text"'), -1)
+        self.assert_not_equal(other_rpr.to_string(coll).find('"text"'), -1)
+        new_rpr = as_representer(coll, CsvMime)
+        self.assert_not_equal(new_rpr.to_string(coll).find('"text"'), -1)
+        # Registering a representer factory clears the cache.
+        rpr_reg = self.config.get_registered_utility(IRepresenterRegistry)
+        rpr_reg.register(type(coll), CsvMime)
+        self.assert_true(isinstance(as_representer(coll, CsvMime),
+                                    CsvResourceRepresenter))
+
 
 class AttributesTestCase(Pep8CompliantTestCase):
     package_name = 'everest.tests.complete_app'
@@ -126,6 +157,22 @@ class AttributesTestCase(Pep8CompliantTestCase):
         self.assert_equal(mp_attr.entity_name, mp_attr_clone.entity_name)
         self.assert_equal(mp_attr.cardinality, mp_attr_clone.cardinality)
 
+    def test_bound_converters(self):
+        rc_attrs = MyEntityMember.get_attributes()
+        mp_attr = MappedAttribute(rc_attrs['number'])
+        self.assert_true(mp_attr.to_representation is None)
+        mp_attr = MappedAttribute(rc_attrs['number'],
+                                  converter_registry=SimpleConverterRegistry)
+        self.assert_equal(mp_attr.to_representation(1), '1')
+        self.assert_equal(mp_attr.from_representation('1'), 1)
+        mp_attr_clone = mp_attr.clone()
+        self.assert_true(mp_attr_clone.to_representation
+                         is mp_attr.to_representation)
+        # Non-terminal attributes do not get converters.
+        mp_attr = MappedAttribute(rc_attrs['parent'],
+                                  converter_registry=SimpleConverterRegistry)
+        self.assert_true(mp_attr.from_representation is None)
+
 
 class TestCsvData(Pep8CompliantTestCase):
     def test_methods(self):
@@ -254,6 +301,45 @@ class JsonRepresenterTestCase(_RepresenterTestCase):
                 trv.run(vst)
             self.assert_true(cm.exception.message.startswith(exc_msg))
 
+    def test_json_codecs(self):
+        rpr_str = self._representer.to_string(self._collection)
+        for codec_cls in JsonCodecRegistry.get_available():
+            self._representer.configure(
+                                options={JSON_CODEC_OPTION:codec_cls.name})
+            codec_rpr_str = self._representer.to_string(self._collection)
+            self.assert_equal(codec_cls.decode(codec_rpr_str),
+                              codec_cls.decode(rpr_str))
+            reloaded_coll = self._representer.from_string(codec_rpr_str)
+            self.assert_equal(len(reloaded_coll), len(self._collection))
+            self._check_id(reloaded_coll)
+        self._representer.configure(options={JSON_CODEC_OPTION:'auto'})
+        self.assert_true(len(self._representer.to_string(self._collection))
+                         > 0)
+        self._representer.configure(options={JSON_CODEC_OPTION:'foo'})
+        with self.assert_raises(ValueError) as cm:
+            self._representer.to_string(self._collection)
+        self.assert_true(cm.exception.message.startswith('Unknown JSON'))
+
+    def test_json_incremental_array_decoder(self):
+        iterdecode = JsonCodecRegistry.get().iterdecode
+        data = [{'id':idx, 'text':'text%d' % idx, 'value':idx * 1001.5}
+                for idx in range(50)] + [12345, 'x', None, [], {}]
+        json_str = dumps(data)
+        for chunk_size in (1, 2, 7, 64, len(json_str)):
+            dec = IncrementalJsonArrayDecoder(StringIO(json_str),
+                                              JSONDecoder().raw_decode,
+                                              chunk_size=chunk_size)
+            self.assert_equal(list(dec), data)
+        self.assert_equal(list(iterdecode(StringIO(' [ ] '))), [])
+        for json_str, exc_msg in (('{}', 'Expected JSON array'),
+                                  ('[1 2]', 'Expected "," or "]"'),
+                                  ('[1] 2', 'Extra data'),
+                                  ('[1, 2', 'Expected "," or "]"'),
+                                  ):
+            with self.assert_raises(ValueError) as cm:
+                list(iterdecode(StringIO(json_str)))
+            self.assert_true(cm.exception.message.startswith(exc_msg))
+
 
 class CsvRepresenterTestCase(_RepresenterTestCase):
     package_name = 'everest.tests.complete_app'
@@ -462,6 +548,26 @@ class XmlRepresenterTestCase(ResourceTestCase):
         reloaded_coll = rpr.from_string(rpr_str)
         self.assert_equal(len(reloaded_coll), 2)
 
+    def test_xml_parser_factory(self):
+        mp = self.__get_member_mapping_and_representer()[0]
+        schema_loc = mp.configuration.get_option(XML_SCHEMA_OPTION)
+        mp.mapping_registry.on_app_created(None)
+        schema = XmlParserFactory.get_xml_schema(schema_loc)
+        self.assert_true(XmlParserFactory.get_xml_schema(schema_loc)
+                         is schema)
+        parser = XmlParserFactory.create(schema_location=schema_loc)
+        self.assert_true(XmlParserFactory.create(schema_location=schema_loc)
+                         is parser)
+        self.assert_false(XmlParserFactory.create() is parser)
+        # Changing a mapping resets the parsing lookup, which in turn
+        # requires a new parser.
+        mp.mapping_registry.set_mapping(mp)
+        self.assert_false(XmlParserFactory.create(schema_location=schema_loc)
+                          is parser)
+        with self.assert_raises(SyntaxError):
+            XmlParserFactory.get_xml_schema('everest:tests/complete_app/'
+                                            'configure_rpr.zcml')
+
     def test_id_attr(self):
         mp = self.__get_member_mapping_and_representer()[0]
         id_attr = mp.get_attribute_map()['id']
@@ -634,6 +740,27 @@ class AtomRepresentationTestCase(ResourceTestCase):
         self.assert_not_equal(
             rpr_str.find('<entry xmlns:ent="http://xml.test.org/tests"'), -1)
 
+    def test_atom_collection_incremental(self):
+        coll = create_collection()
+        rpr = as_representer(coll, AtomMime)
+        rpr.configure(options={XML_PRETTY_PRINT_OPTION:False})
+        rpr_str = rpr.to_string(coll)
+        self.assert_equal(rpr_str.find('\n', rpr_str.find('?>') + 3), -1)
+        # Entries do not repeat the namespace declarations of the feed.
+        self.assert_not_equal(rpr_str.find('<entry>'), -1)
+        # The incrementally written feed is equivalent to the feed built
+        # as a whole.
+        feed_el = etree.fromstring(rpr_str)
+        self.assert_equal(len(feed_el.findall('{%s}entry' % XML_NS_ATOM)),
+                          len(coll))
+        etree.cleanup_namespaces(feed_el)
+        data_el = rpr.data_from_resource(coll)
+        objectify.deannotate(data_el)
+        etree.cleanup_namespaces(data_el)
+        self.assert_equal(etree.tostring(feed_el),
+                          etree.tostring(etree.fromstring(
+                                                etree.tostring(data_el))))
+
 
 class _RepresenterConfigurationTestCase(ResourceTestCase):
     package_name = 'everest.tests.complete_app'
@@ -741,6 +868,19 @@ class UpdateResourceFromDataTestCase(ResourceTestCase):
             coll.update_from_data(de)
         exc_msg = 'New member data should not provide an ID attribute.'
         self.assert_equal(cm.exception.message, exc_msg)
+        # The collection was not modified.
+        self.assert_equal(len(coll), 2)
+
+    def test_update_collection_from_data(self):
+        coll = create_collection()
+        rpr = as_representer(coll, CsvMime)
+        upd_coll = create_staging_collection(IMyEntity)
+        upd_coll.create_member(MyEntity(id=1, text='bar1'))
+        upd_coll.create_member(MyEntity(text='new'))
+        de = rpr.data_from_resource(upd_coll)
+        self.assert_equal(coll.update_from_data(de), (1, 1, 1))
+        self.assert_equal(sorted([mb.text for mb in coll]), ['bar1', 'new'])
+        self.assert_true(coll.get('0') is None)
 
     def test_update_nested_member_from_data(self):
         # Set up member that does not have a parent.
@@ -757,6 +897,20 @@ class UpdateResourceFromDataTestCase(ResourceTestCase):
         mb.update_from_data(de)
         self.assert_equal(mb.parent.id, parent.id)
 
+    def test_update_member_from_data_changed_attributes(self):
+        coll = create_collection()
+        mb = coll.get('0')
+        rpr = as_representer(mb, CsvMime)
+        de = rpr.data_from_resource(mb)
+        # Updating with the current state does not change anything.
+        self.assert_equal(mb.update_from_data(de), [])
+        upd_mb = MyEntityMember.create_from_entity(
+                                    MyEntity(id=0, text='bar0', number=2))
+        de = rpr.data_from_resource(upd_mb)
+        self.assert_equal(sorted(mb.update_from_data(de)),
+                          ['number', 'text'])
+        self.assert_equal(mb.text, 'bar0')
+
 
 # pylint: disable=W0232
 class IDerived(Interface):
@@ -62,6 +62,56 @@ class RepresenterConverterTestCase(Pep8CompliantTestCase):
                                                         datetime.datetime),
             ldt_rpr)
 
+    def test_datetime_converter_formats(self):
+        rpr_strs = ['2012-08-29T16:20:00Z',
+                    '2012-08-29T16:20:00+00:00',
+                    '2012-08-29T16:20:00.25-05:30',
+                    '2012-08-29T16:20:00.123456+02:00',
+                    '2012-08-29 16:20:00+02:00',
+                    '20120829T162000Z',
+                    ]
+        for rpr_str in rpr_strs:
+            dt = SimpleConverterRegistry.convert_from_representation(
+                                                        rpr_str,
+                                                        datetime.datetime)
+            exp_dt = parse_date(rpr_str)
+            self.assert_equal(dt, exp_dt)
+            self.assert_equal(dt.utcoffset(), exp_dt.utcoffset())
+            self.assert_equal(
+                SimpleConverterRegistry.convert_to_representation(
+                                                        dt,
+                                                        datetime.datetime),
+                rfc3339(exp_dt))
+        # Naive datetime values are formatted with the local timezone.
+        ndt = datetime.datetime(2012, 8, 29, 16, 20, 0)
+        self.assert_equal(
+            SimpleConverterRegistry.convert_to_representation(
+                                                        ndt,
+                                                        datetime.datetime),
+            rfc3339(ndt))
+
+    def test_converter_functions(self):
+        to_rpr, from_rpr = \
+                SimpleConverterRegistry.get_converter_functions(bool)
+        self.assert_equal(to_rpr(True), 'true')
+        self.assert_true(to_rpr(None) is None)
+        self.assert_true(from_rpr('false') is False)
+        to_rpr, from_rpr = \
+                SimpleConverterRegistry.get_converter_functions(int)
+        self.assert_equal(to_rpr(1), '1')
+        self.assert_equal(to_rpr('1'), '1')
+        self.assert_equal(from_rpr('1'), 1)
+        self.assert_true(from_rpr(None) is None)
+        self.assert_equal(
+            SimpleConverterRegistry.convert_column_to_representation(
+                                                    [True, None, False],
+                                                    bool),
+            ['true', None, 'false'])
+        self.assert_equal(
+            SimpleConverterRegistry.convert_column_from_representation(
+                                                    ['1', None, '3'], int),
+            [1, None, 3])
+
     def test_parse_date_fix(self):
         d = parse_date('2012-06-13 11:06:47+02:00')
         d_copy = deepcopy(d)
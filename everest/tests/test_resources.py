@@ -5,19 +5,40 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 Created on Jun 14, 2012.
 """
 from everest.entities.base import Entity
+from everest.entities.utils import get_entity_class
 from everest.querying.specifications import ConjunctionFilterSpecification
 from everest.querying.specifications import ValueEqualToFilterSpecification
 from everest.querying.utils import get_filter_specification_factory
+from everest.resources.base import Collection
+from everest.resources.base import Member
+from everest.resources.base import Resource
+from everest.resources.interfaces import IResourceLookupCache
+from everest.resources.link import Link
+from everest.resources.link import LinkResolver
+from everest.resources.link import get_link_resolver
+from everest.resources.utils import as_member
+from everest.resources.utils import get_collection_class
+from everest.resources.utils import get_member_class
 from everest.resources.utils import get_root_collection
+from everest.resources.utils import provides_collection_resource
+from everest.resources.utils import provides_member_resource
+from everest.resources.utils import provides_resource
+from everest.resources.utils import resource_to_url
 from everest.testing import ResourceTestCase
+from everest.tests.simple_app.entities import BarEntity
 from everest.tests.simple_app.entities import FooEntity
+from everest.tests.simple_app.interfaces import IBar
 from everest.tests.simple_app.interfaces import IFoo
 from everest.tests.simple_app.resources import FooCollection
 from everest.tests.simple_app.resources import FooMember
+from everest.tests.complete_app.interfaces import IMyEntity
+from everest.tests.complete_app.interfaces import IMyEntityChild
 from everest.tests.complete_app.testing import create_collection
+from zope.interface.interfaces import ComponentLookupError # pylint: disable=E0611,F0401
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['ResourcesFilteringTestCase',
+__all__ = ['LinkResolverTestCase',
+           'ResourcesFilteringTestCase',
            'ResourcesTestCase',
            ]
 
@@ -74,6 +95,68 @@ class ResourcesTestCase(ResourceTestCase):
         coll_str = str(coll)
         self.assert_true(coll_str.startswith('<FooCollection'))
 
+    def test_lookup_cache(self):
+        cache = self.config.get_registered_utility(IResourceLookupCache)
+        coll_cls = get_collection_class(IFoo)
+        for rc in (IFoo, FooMember, coll_cls, FooEntity):
+            self.assert_true(cache.get_member_class(rc) is FooMember)
+            self.assert_true(cache.get_collection_class(rc) is coll_cls)
+            self.assert_true(cache.get_entity_class(rc) is FooEntity)
+        foo = FooEntity(id=0)
+        self.assert_true(cache.get_member_class(foo) is FooMember)
+        self.assert_true(isinstance(as_member(foo), FooMember))
+        self.assert_true(get_entity_class(as_member(foo)) is FooEntity)
+        # Unregistered classes are looked up in the registry.
+        self.assert_true(cache.get_member_factory(FooEntitySubclass) is None)
+        self.assert_true(isinstance(as_member(FooEntitySubclass(id=1)),
+                                    FooMember))
+        self.assert_true(cache.get_member_class(UnregisteredEntity) is None)
+        self.assert_raises(ComponentLookupError, get_member_class,
+                           UnregisteredEntity())
+        # Ambiguous registrations are looked up in the registry as well.
+        cache.register(IFoo, MemberWithoutRelation, coll_cls, FooEntity)
+        self.assert_true(cache.get_member_class(IFoo) is None)
+        self.assert_true(get_member_class(IFoo) is FooMember)
+
+    def test_provides_resource(self):
+        self.assert_true(provides_member_resource(FooMember))
+        self.assert_true(provides_resource(FooMember))
+        self.assert_false(provides_collection_resource(FooMember))
+        self.assert_true(provides_member_resource(
+                                as_member(FooEntity(id=0))))
+        self.assert_false(provides_resource(FooEntity))
+
+    def test_links(self):
+        foo = FooEntity(id=0)
+        mb = FooMember.create_from_entity(foo)
+        self.assert_equal([link.rel for link in mb.links], ['self'])
+        mb.add_link(Link(mb, 'alternate'))
+        self.assert_equal(set([link.rel for link in mb.links]),
+                          set(['self', 'alternate']))
+        # The resource base classes do not need an instance dictionary.
+        for rc_cls in (Resource, Member, Collection):
+            self.assert_equal(rc_cls.__dictoffset__, 0)
+
+    def test_flyweight_iterator(self):
+        coll = get_root_collection(IFoo)
+        for idx in range(3):
+            coll.create_member(FooEntity(id=idx))
+        mbs = list(coll.flyweight_iterator())
+        self.assert_true(mbs[0] is mbs[2])
+        ids = [(mb.id, mb.__name__, mb.__parent__ is coll)
+               for mb in coll.flyweight_iterator()]
+        self.assert_equal(ids, [(0, '0', True), (1, '1', True),
+                                (2, '2', True)])
+
+    def test_flyweight_iterator_instance_dict(self):
+        # Members with an instance dictionary are not reused.
+        coll = get_root_collection(IBar)
+        for idx in range(2):
+            coll.create_member(BarEntity(id=idx))
+        mbs = list(coll.flyweight_iterator())
+        self.assert_false(mbs[0] is mbs[1])
+        self.assert_equal([mb.id for mb in mbs], [0, 1])
+
 
 class ResourcesFilteringTestCase(ResourceTestCase):
     package_name = 'everest.tests.complete_app'
@@ -119,11 +202,81 @@ class ResourcesFilteringTestCase(ResourceTestCase):
         exc_msg = 'does not have a corresponding entity attribute.'
         self.assert_true(cm.exception.message.endswith(exc_msg))
 
+    def test_entity_attribute_paths(self):
+        mb_cls = get_member_class(IMyEntity)
+        self.assert_equal(mb_cls.get_entity_attribute_path('text_rc'),
+                          'text_ent')
+        self.assert_equal(mb_cls.get_entity_attribute_path('parent_text'),
+                          'parent.text_ent')
+        self.assert_equal(mb_cls.get_entity_attribute_path('parent.text_rc'),
+                          'parent.text_ent')
+        self.assert_true('parent.text_rc'
+                         in mb_cls._entity_attribute_paths) # pylint: disable=W0212
+        child_mb_cls = get_member_class(IMyEntityChild)
+        self.assert_raises(ValueError,
+                           child_mb_cls.get_entity_attribute_path,
+                           'backref_only_children')
+
+    def test_filter_conversion_caching(self):
+        coll = create_collection()
+        cache = coll.entity_specification_cache
+        cache.clear()
+        spec_fac = get_filter_specification_factory()
+        coll.filter = spec_fac.create_equal_to('id', 0)
+        self.assert_equal((cache.hits, cache.misses), (0, 1))
+        coll.clone().filter = spec_fac.create_equal_to('id', 0)
+        self.assert_equal(cache.hits, 1)
+        self.assert_equal(len(coll), 1)
+        # Specifications referencing resources are not cached.
+        parent = iter(coll).next().parent
+        coll.filter = spec_fac.create_equal_to('parent', parent)
+        self.assert_equal(len(cache), 1)
+
+
+class LinkResolverTestCase(ResourceTestCase):
+    package_name = 'everest.tests.complete_app'
+    config_file_name = 'configure_no_rdb.zcml'
+
+    def test_resolve(self):
+        coll = create_collection()
+        parents = [mb.parent for mb in coll]
+        urls = [resource_to_url(parent) for parent in parents]
+        resolver = LinkResolver()
+        for url in urls + urls:
+            resolver.add(url)
+        resolver.resolve()
+        for parent, url in zip(parents, urls):
+            ent = resolver.get_entity(url)
+            self.assert_true(ent is parent.get_entity())
+            # Resolved entities are cached.
+            self.assert_true(resolver.get_entity(url) is ent)
+        coll_url = resource_to_url(iter(coll).next().children)
+        ents = resolver.get_entities(coll_url)
+        self.assert_equal(len(ents), 1)
+        self.assert_true(resolver.get_entities(coll_url) is ents)
+        missing_url = urls[0].replace('/0/', '/2/')
+        resolver.add(urls[1])
+        resolver.add(missing_url)
+        self.assert_raises(KeyError, resolver.resolve)
+        self.assert_raises(KeyError, resolver.get_entity, missing_url)
+        resolver.clear()
+        self.assert_true(resolver.get_entity(urls[0])
+                         is parents[0].get_entity())
+
+    def test_get_link_resolver(self):
+        resolver = get_link_resolver()
+        self.assert_true(isinstance(resolver, LinkResolver))
+        self.assert_true(get_link_resolver(self._request) is resolver)
+
 
 class UnregisteredEntity(Entity):
     pass
 
 
+class FooEntitySubclass(FooEntity):
+    pass
+
+
 class MemberWithoutRelation(FooMember):
     relation = None
 
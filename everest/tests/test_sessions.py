@@ -9,11 +9,14 @@ from everest.entities.utils import new_entity_id
 from everest.repositories.memory import Aggregate
 from everest.repositories.memory import Repository
 from everest.repositories.memory import Session
+from everest.repositories.memory.ids import CounterEntityIdGenerator
+from everest.repositories.memory.ids import TimeOrderedEntityIdGenerator
 from everest.testing import Pep8CompliantTestCase
 import gc
 
 __docformat__ = 'reStructuredText en'
-__all__ = ['JoinedTransactionMemorySessionTestCase',
+__all__ = ['EntityIdGeneratorTestCase',
+           'JoinedTransactionMemorySessionTestCase',
            'TransactionLessMemorySessionTestCase',
            ]
 
@@ -237,6 +240,35 @@ class TransactionLessMemorySessionTestCase(_MemorySessionTestCaseBase):
         self.assert_equal(ent3.my_attr, my_attr_value)
 
 
+class EntityIdGeneratorTestCase(Pep8CompliantTestCase):
+
+    def test_counter(self):
+        repo = Repository('DUMMY', Aggregate)
+        repo.configure(id_generator=CounterEntityIdGenerator())
+        session = Session(repo)
+        session.add(_MyEntity, _MyEntity(id=5))
+        ents = [_MyEntity() for _ in range(3)]
+        session.add_all(_MyEntity, ents)
+        # The counter starts after the largest registered ID.
+        self.assert_equal([ent.id for ent in ents], [6, 7, 8])
+        # Each entity class has its own counter.
+        ent = _MyEntityNoneSlug()
+        session.add(_MyEntityNoneSlug, ent)
+        self.assert_equal(ent.id, 1)
+        self.assert_equal(repo.id_generator.counters,
+                          {_MyEntity : 8, _MyEntityNoneSlug : 1})
+
+    def test_time_ordered(self):
+        gen = TimeOrderedEntityIdGenerator(node=3)
+        seq_bits = gen.sequence_bits
+        # Generate more IDs than the sequence can hold in one millisecond.
+        ids = [gen.new_id(_MyEntity) for _ in range(2 ** seq_bits + 10)]
+        self.assert_equal(len(set(ids)), len(ids))
+        self.assert_equal(ids, sorted(ids))
+        self.assert_true(ids[-1] < 2 ** 63)
+        self.assert_equal((ids[0] >> seq_bits) & (2 ** gen.node_bits - 1), 3)
+
+
 class _MyEntity(Entity):
     my_attr = None
 
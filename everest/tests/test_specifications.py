@@ -744,3 +744,24 @@ class SpecificationGeneratorTestCase(TestCaseWithConfiguration):
         spec = ~eq(number_attr=1)
         self.assert_true(isinstance(spec, NegationFilterSpecification))
         self.assert_true(spec.is_satisfied_by(self.candidate))
+
+    def test_filter_specification_value_semantics(self):
+        spec1 = eq(number_attr=0) & ~cntd(text_attr=['a', 'b'])
+        spec2 = eq(number_attr=0) & ~cntd(text_attr=['a', 'b'])
+        self.assert_equal(spec1, spec2)
+        self.assert_equal(hash(spec1), hash(spec2))
+        self.assert_equal(len(set([spec1, spec2])), 1)
+        # Specifications with different operators are not equal.
+        self.assert_not_equal(eq(number_attr=0), lt(number_attr=0))
+        # Specifications can not be modified.
+        self.assert_raises(AttributeError, setattr, spec1, 'foo', 0)
+
+    def test_order_specification_value_semantics(self):
+        spec1 = asc('number_attr') & desc('text_attr')
+        spec2 = asc('number_attr') & desc('text_attr')
+        self.assert_equal(spec1, spec2)
+        self.assert_equal(hash(spec1), hash(spec2))
+        self.assert_not_equal(asc('number_attr'), desc('number_attr'))
+        self.assert_not_equal(asc('number_attr'),
+                              NaturalOrderSpecification('number_attr'))
+        self.assert_raises(AttributeError, setattr, spec1, 'foo', 0)
@@ -30,3 +30,17 @@ class StagingCollectionTestCase(ResourceTestCase):
         self.coll.add(foo_mb)
         self.assert_true(self.session.iterator(FooEntity).next() is foo)
         self.assert_equal(len(list(self.session.iterator(FooEntity))), 1)
+
+    def test_lookup(self):
+        foo0 = FooEntity(id=0, name='foo0')
+        self.coll.add(FooMember.create_from_entity(foo0))
+        self.assert_true(self.coll.get_aggregate().get_by_id(0) is foo0)
+        self.assert_true(self.session.get_by_slug(FooEntity, 'foo0') is foo0)
+        self.assert_true(self.session.get_by_id(FooEntity, 1) is None)
+        # Adding invalidates the lookup indexes.
+        foo1 = FooEntity(id=1, name='foo1')
+        self.coll.add_all([FooMember.create_from_entity(foo1)])
+        self.assert_true(self.session.get_by_id(FooEntity, 1) is foo1)
+        self.assert_true(self.coll.get_aggregate().get_by_slug('foo1')
+                         is foo1)
+        self.assert_equal(len(self.coll), 2)
@@ -12,6 +12,11 @@ from everest.tests.complete_app.testing import create_collection
 from everest.tests.complete_app.testing import create_entity
 from everest.resources.utils import resource_to_url
 from everest.resources.utils import url_to_resource
+from everest.resources.utils import urls_to_resources
+from everest.url import UrlPartsConverter
+from pyramid.threadlocal import get_current_request
+from pyramid.url import model_url
+from urllib import unquote
 from urlparse import urlparse
 
 __docformat__ = 'reStructuredText en'
@@ -81,6 +86,40 @@ class UrlTestCase(ResourceTestCase):
                          schema='http', path='/my-entities/', params='',
                          query='sort=id:asc~text:desc')
 
+    def test_resource_to_url_member(self):
+        request = get_current_request()
+        for mb in self.coll:
+            self.assert_equal(resource_to_url(mb),
+                              unquote(model_url(mb, request)))
+            for child_mb in mb.children:
+                self.assert_equal(resource_to_url(child_mb),
+                                  unquote(model_url(child_mb, request)))
+        mb = iter(self.coll).next()
+        self.assert_equal(resource_to_url(mb), '%s0/' % self.base_url)
+
+    def test_resource_to_url_query_string_caching(self):
+        flt_spec_fac = get_filter_specification_factory()
+        ord_spec_fac = get_order_specification_factory()
+        self.coll.filter = flt_spec_fac.create_equal_to('id', 0)
+        self.coll.order = ord_spec_fac.create_ascending('id')
+        url = resource_to_url(self.coll)
+        self.assert_equal(self.coll.query_strings,
+                          dict(q='id:equal-to:0', sort='id:asc'))
+        clone = self.coll.clone()
+        self.assert_equal(clone.query_strings, self.coll.query_strings)
+        self.assert_equal(resource_to_url(clone), url)
+        clone.filter = flt_spec_fac.create_equal_to('id', 1)
+        self.assert_false('q' in clone.query_strings)
+        self.__check_url(resource_to_url(clone),
+                         schema='http', path='/my-entities/', params='',
+                         query='q=id:equal-to:1&sort=id:asc')
+        # The original collection is not affected.
+        self.assert_equal(resource_to_url(self.coll), url)
+        clone.order = ord_spec_fac.create_descending('id')
+        self.__check_url(resource_to_url(clone),
+                         schema='http', path='/my-entities/', params='',
+                         query='q=id:equal-to:1&sort=id:desc')
+
     def test_url_to_resource_nonexisting_collection(self):
         with self.assert_raises(KeyError) as cm:
             url_to_resource('http://0.0.0.0:6543/my-foos/')
@@ -209,6 +248,48 @@ class UrlTestCase(ResourceTestCase):
         coll_from_url = url_to_resource(self.base_url + '?q=%s' % criterion)
         self.assert_equal(len(coll_from_url), 1)
 
+    def test_url_to_resource_with_multiple_links(self):
+        parent_url = '%s/my-entity-parents/%%d/' % self.app_url
+        criterion = 'parent:equal-to:"%s","%s","%s"' \
+                    % (parent_url % 0, parent_url % 1, parent_url % 0)
+        coll_from_url = url_to_resource(self.base_url + '?q=%s' % criterion)
+        self.assert_equal(len(coll_from_url), 2)
+
+    def test_urls_to_resources(self):
+        urls = ['%s/my-entity-parents/1/' % self.app_url,
+                '%s/my-entities/?q=id:equal-to:0' % self.app_url,
+                '%s/my-entity-parents/0' % self.app_url,
+                '%s/my-entities/0/children/' % self.app_url,
+                ]
+        rcs = urls_to_resources(urls)
+        self.assert_equal(len(rcs), 4)
+        self.assert_equal([rc.id for rc in (rcs[0], rcs[2])], [1, 0])
+        self.assert_equal(len(rcs[1]), 1)
+        self.assert_equal(len(rcs[3]), 1)
+        self.assert_raises(KeyError, urls_to_resources,
+                           urls + ['%s/my-entity-parents/2/' % self.app_url])
+
+    def test_url_to_resource_specification_caching(self):
+        flt_cache = UrlPartsConverter.filter_specification_cache
+        ord_cache = UrlPartsConverter.order_specification_cache
+        flt_cache.clear()
+        ord_cache.clear()
+        url = self.base_url + '?q=id:less-than:1&sort=id:asc'
+        coll_from_url1 = url_to_resource(url)
+        self.assert_equal((flt_cache.hits, flt_cache.misses), (0, 1))
+        self.assert_equal((ord_cache.hits, ord_cache.misses), (0, 1))
+        coll_from_url2 = url_to_resource(url)
+        self.assert_equal(flt_cache.hits, 1)
+        self.assert_equal(ord_cache.hits, 1)
+        self.assert_equal(flt_cache.hit_ratio, 0.5)
+        # Cached specifications are immutable and shared between collections.
+        self.assert_true(coll_from_url1.filter is coll_from_url2.filter)
+        self.assert_equal(len(coll_from_url2), 1)
+        # Filters referencing resources by URL are not cached.
+        criterion = 'parent:equal-to:"%s/my-entity-parents/0/"' % self.app_url
+        url_to_resource(self.base_url + '?q=%s' % criterion)
+        self.assert_equal(len(flt_cache), 1)
+
     def __check_url(self, url,
                     schema=None, path=None, params=None, query=None):
         urlp = urlparse(url)
@@ -6,6 +6,7 @@ Created on May 18, 2011.
 """
 from everest.testing import Pep8CompliantTestCase
 from everest.utils import BidirectionalLookup
+from everest.utils import LruCache
 from everest.utils import WeakList
 from everest.utils import classproperty
 from everest.utils import get_traceback
@@ -31,6 +32,50 @@ class UtilsTestCase(Pep8CompliantTestCase):
         # ID values must increase monotonically.
         self.assert_raises(ValueError, idgen.send, 6)
 
+    def test_lru_cache(self):
+        self.assert_raises(ValueError, LruCache, 0)
+        cache = LruCache(2)
+        self.assert_equal(cache.hit_ratio, 0.0)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assert_equal(cache.get('a'), 1)
+        # Adding a third item evicts the least recently used one ("b").
+        cache.set('c', 3)
+        self.assert_equal(len(cache), 2)
+        self.assert_true('a' in cache)
+        self.assert_false('b' in cache)
+        self.assert_true(cache.get('b') is None)
+        self.assert_equal(cache.get('b', -1), -1)
+        self.assert_equal(cache.hits, 1)
+        self.assert_equal(cache.misses, 2)
+        self.assert_almost_equal(cache.hit_ratio, 1 / 3.)
+        self.assert_equal(cache.evictions, 1)
+        cache.remove('a')
+        self.assert_false('a' in cache)
+        cache.clear()
+        self.assert_equal(len(cache), 0)
+        self.assert_equal(cache.hits, 0)
+        self.assert_equal(cache.misses, 0)
+        self.assert_equal(cache.evictions, 0)
+
+    def test_lru_cache_with_max_weight(self):
+        self.assert_raises(ValueError, LruCache, max_weight=0)
+        cache = LruCache(max_size=10, max_weight=5)
+        self.assert_equal(cache.set('a', 'xx'), [])
+        self.assert_equal(cache.set('b', 'yyy'), [])
+        self.assert_equal(cache.weight, 5)
+        # Adding another item evicts items until the new one fits.
+        self.assert_equal(cache.set('c', 'zz'), [('a', 'xx')])
+        self.assert_equal(cache.weight, 5)
+        self.assert_equal(cache.evictions, 1)
+        # Replacing an item adjusts the weight.
+        cache.set('c', 'z')
+        self.assert_equal(cache.weight, 4)
+        # Items heavier than the maximum weight are not cached.
+        self.assert_equal(cache.set('d', 'dddddd'), [])
+        self.assert_false('d' in cache)
+        self.assert_equal(len(cache), 2)
+
     def test_classproperty(self):
         class X(object):
             attr = 'myattr'
@@ -14,9 +14,11 @@ from everest.resources.utils import get_root_collection
 from everest.resources.utils import get_service
 from everest.resources.utils import resource_to_url
 from everest.testing import FunctionalTestCase
+from everest.testing import ResourceTestCase
 from everest.tests.complete_app.entities import MyEntity
 from everest.tests.complete_app.interfaces import IMyEntity
 from everest.tests.complete_app.interfaces import IMyEntityChild
+from everest.tests.complete_app.interfaces import IMyEntityParent
 from everest.tests.complete_app.testing import create_collection
 from everest.tests.simple_app.entities import FooEntity
 from everest.tests.simple_app.interfaces import IFoo
@@ -27,20 +29,26 @@ from everest.tests.simple_app.views import ExceptionPutMemberView
 from everest.tests.simple_app.views import UserMessagePostCollectionView
 from everest.tests.simple_app.views import UserMessagePutMemberView
 from everest.traversal import SuffixResourceTraverser
+from everest.url import UrlPartsConverter
 from everest.utils import get_repository_manager
+from everest.views.cache import ResponseCache
 from everest.views.getcollection import GetCollectionView
+from everest.views.interfaces import IResponseCache
 from everest.views.static import public_view
 from everest.views.utils import accept_csv_only
 from pkg_resources import resource_filename # pylint: disable=E0611
 from pyramid.testing import DummyRequest
+import time
 import transaction
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['BasicViewTestCase',
            'ClassicStyleConfiguredViewsTestCase',
            'ExceptionViewTestCase',
+           'GetCollectionViewTestCase',
            'NewStyleConfiguredViewsTestCase',
            'PredicatedViewTestCase',
+           'ResponseCacheViewTestCase',
            'StaticViewTestCase',
            'WarningViewMemoryTestCase',
            'WarningViewRdbTestCase',
@@ -118,6 +126,79 @@ class BasicViewTestCase(FunctionalTestCase):
                            status=200)
         self.assert_is_not_none(res)
 
+    def test_get_collection_conditional(self):
+        coll = create_collection()
+        transaction.commit()
+        self.config.registry.settings['conditional_get'] = 'true'
+        res = self.app.get(self.path, status=200)
+        etag = res.headers['ETag']
+        self.app.get(self.path, headers={'If-None-Match':etag}, status=304)
+        # No Last-Modified header for changes within the current second.
+        if not 'Last-Modified' in res.headers:
+            time.sleep(1)
+            res = self.app.get(self.path, status=200)
+        self.assert_equal(res.headers['ETag'], etag)
+        last_modified = res.headers['Last-Modified']
+        self.app.get(self.path, headers={'If-Modified-Since':last_modified},
+                     status=304)
+        # Different query string.
+        res = self.app.get(self.path, params=dict(size=1),
+                           headers={'If-None-Match':etag}, status=200)
+        self.assert_not_equal(res.headers['ETag'], etag)
+        # Changed data.
+        mb = iter(coll).next()
+        mb.text = 'Changed.'
+        transaction.commit()
+        res = self.app.get(self.path, headers={'If-None-Match':etag},
+                           status=200)
+        etag = res.headers['ETag']
+        # Changed data in a related resource.
+        parent_mb = iter(get_root_collection(IMyEntityParent)).next()
+        parent_mb.text = 'Changed.'
+        transaction.commit()
+        res = self.app.get(self.path, headers={'If-None-Match':etag},
+                           status=200)
+        self.assert_not_equal(res.headers['ETag'], etag)
+
+    def test_get_member_conditional(self):
+        create_collection()
+        transaction.commit()
+        self.config.registry.settings['conditional_get'] = 'true'
+        res = self.app.get("%s/0" % self.path, status=200)
+        etag = res.headers['ETag']
+        self.app.get("%s/0" % self.path, headers={'If-None-Match':etag},
+                     status=304)
+        self.app.get("%s/1" % self.path, headers={'If-None-Match':etag},
+                     status=200)
+
+    def test_get_conditional_disabled(self):
+        create_collection()
+        transaction.commit()
+        # Disabled by default.
+        res = self.app.get(self.path, status=200)
+        self.assert_false('ETag' in res.headers)
+        self.config.registry.settings['conditional_get'] = 'false'
+        res = self.app.get(self.path, status=200)
+        self.assert_false('ETag' in res.headers)
+
+    def test_get_last_modified_within_current_second(self):
+        create_collection()
+        transaction.commit()
+        self.config.registry.settings['conditional_get'] = 'true'
+        res = self.app.get(self.path, status=200)
+        last_modified = res.headers.get('Last-Modified')
+        if not last_modified is None:
+            # A change within the second of the Last-Modified date must
+            # not produce a stale 304 response.
+            mb = iter(get_root_collection(IMyEntity)).next()
+            mb.text = 'Changed.'
+            transaction.commit()
+            self.app.get(self.path,
+                         headers={'If-Modified-Since':last_modified},
+                         status=200)
+        res = self.app.get(self.path, status=200)
+        self.assert_false('Last-Modified' in res.headers)
+
     def test_get_member_default_content_type(self):
         coll = get_root_collection(IMyEntity)
         ent = MyEntity(id=0)
@@ -220,6 +301,49 @@ class BasicViewTestCase(FunctionalTestCase):
         return mb, mb_url
 
 
+class ResponseCacheViewTestCase(FunctionalTestCase):
+    package_name = 'everest.tests.complete_app'
+    ini_file_path = resource_filename('everest.tests.complete_app',
+                                      'complete_app.ini')
+    app_name = 'complete_app'
+    path = '/my-entities'
+
+    def set_up(self):
+        FunctionalTestCase.set_up(self)
+        self.config.load_zcml('everest.tests.complete_app:configure_rpr.zcml')
+        # Only views without a custom renderer cache their responses.
+        self.config.add_resource_view(IMyEntity, request_method='GET')
+        self.config.registry.registerUtility(ResponseCache(100000),
+                                             IResponseCache)
+
+    def test_get_collection_response_cache(self):
+        cache = self.config.get_registered_utility(IResponseCache)
+        coll = create_collection()
+        transaction.commit()
+        res = self.app.get(self.path, params=dict(sort='id:asc'),
+                           status=200)
+        res1 = self.app.get(self.path, params=dict(sort='id:asc'),
+                            status=200)
+        self.assert_equal(res1.body, res.body)
+        self.assert_equal(res1.content_type, res.content_type)
+        coll_name = get_collection_class(IMyEntity).root_name
+        self.assert_equal(cache.get_statistics()[coll_name],
+                          dict(hits=1, misses=1, evictions=0))
+        # Different content type.
+        self.app.get(self.path, params=dict(sort='id:asc'),
+                     headers={'Accept':'application/json'}, status=200)
+        self.assert_equal(cache.get_statistics()[coll_name]['misses'], 2)
+        self.assert_equal(len(cache), 2)
+        # Changed data invalidates the cached response.
+        mb = iter(coll).next()
+        mb.text = 'Changed.'
+        transaction.commit()
+        res2 = self.app.get(self.path, params=dict(sort='id:asc'),
+                            status=200)
+        self.assert_not_equal(res2.body, res.body)
+        self.assert_equal(cache.get_statistics()[coll_name]['misses'], 3)
+
+
 class PredicatedViewTestCase(FunctionalTestCase):
     package_name = 'everest.tests.complete_app'
     ini_file_path = resource_filename('everest.tests.complete_app',
@@ -531,3 +655,64 @@ class WarningWithExceptionViewTestCase(FunctionalTestCase):
                      params=req_body,
                      content_type=CsvMime.mime_type_string,
                      status=500)
+
+
+class GetCollectionViewTestCase(ResourceTestCase):
+    package_name = 'everest.tests.complete_app'
+    config_file_name = 'configure_no_rdb.zcml'
+
+    def set_up(self):
+        ResourceTestCase.set_up(self)
+        self.coll = create_collection()
+
+    def test_nav_links(self):
+        self.assert_equal(self.__get_link_rels(start=0),
+                          set(['self', 'next', 'last']))
+        self.assert_equal(self.__get_link_rels(start=1),
+                          set(['self', 'first', 'previous', 'next']))
+
+    def test_nav_links_without_exact_count(self):
+        coll_cls = type(self.coll)
+        coll_cls.exact_count = False
+        try:
+            self.assert_equal(self.__get_link_rels(start=0),
+                              set(['self', 'next']))
+            self.assert_equal(self.__get_link_rels(start=1),
+                              set(['self', 'first', 'previous']))
+        finally:
+            del coll_cls.exact_count
+
+    def test_nav_links_query_strings(self):
+        # The nav links reuse the query strings from the request.
+        calls = []
+        make_filter_string = UrlPartsConverter.make_filter_string
+        make_order_string = UrlPartsConverter.make_order_string
+        def count_calls(func):
+            def wrap(cls, spec):
+                calls.append(spec)
+                return func(spec)
+            return classmethod(wrap)
+        UrlPartsConverter.make_filter_string = \
+                                    count_calls(make_filter_string)
+        UrlPartsConverter.make_order_string = count_calls(make_order_string)
+        try:
+            request = DummyRequest(params=dict(q='id:less-than:5',
+                                               sort='id:desc',
+                                               start='1', size='1'))
+            view = GetCollectionView(self.coll.clone(), request)
+            rc = view._prepare_resource() # pylint: disable=W0212
+            hrefs = [link.href for link in rc.links]
+        finally:
+            UrlPartsConverter.make_filter_string = make_filter_string
+            UrlPartsConverter.make_order_string = make_order_string
+        self.assert_true(len(hrefs) > 1)
+        self.assert_true(all(['q=id:less-than:5' in href
+                              for href in hrefs]))
+        self.assert_equal(calls, [])
+
+    def __get_link_rels(self, start):
+        coll = self.coll.clone()
+        request = DummyRequest(params=dict(start=str(start), size='1'))
+        view = GetCollectionView(coll, request)
+        rc = view._prepare_resource() # pylint: disable=W0212
+        return set([link.rel for link in rc.links])
@@ -8,11 +8,21 @@ Created on Jun 28, 2011.
 """
 from cgi import parse_qsl
 from everest.interfaces import IResourceUrlConverter
+from everest.querying.base import CQL_PARSER_ENGINES
 from everest.querying.base import EXPRESSION_KINDS
 from everest.querying.filterparser import parse_filter
+from everest.querying.nativeparser import parse_filter \
+        as parse_filter_native
+from everest.querying.nativeparser import parse_order \
+        as parse_order_native
 from everest.querying.orderparser import parse_order
+from everest.querying.utils import get_cql_parser_engine
+from everest.querying.utils import get_filter_specification_factory
+from everest.querying.utils import get_order_specification_factory
 from everest.resources.interfaces import ICollectionResource
 from everest.resources.interfaces import IMemberResource
+from everest.resources.interfaces import IService
+from everest.utils import LruCache
 from everest.utils import get_filter_specification_visitor
 from everest.utils import get_order_specification_visitor
 from pyparsing import ParseException
@@ -36,6 +46,11 @@ class ResourceUrlConverter(object):
 
     See http://en.wikipedia.org/wiki/Query_string for information on characters
     supported in query strings.
+
+    The URLs of root collections are cached as prefixes for the URLs of
+    their members. The filter and order query string parameters generated
+    for a collection are cached in the collection (and passed on to its
+    clones) until its filter or order specification changes.
     """
 
     implements(IResourceUrlConverter)
@@ -43,6 +58,8 @@ class ResourceUrlConverter(object):
     def __init__(self, request):
         # The request is needed for access to app URL, registry, traversal.
         self.__request = request
+        # Maps root collection names to (unquoted) root collection URLs.
+        self.__root_collection_urls = {}
 
     def url_to_resource(self, url):
         """
@@ -82,12 +99,21 @@ class ResourceUrlConverter(object):
         if ICollectionResource in provided_by(resource):
             query = {}
             query.update(kw)
+            query_strings = resource.query_strings
             if not resource.filter is None:
-                query['q'] = \
-                    UrlPartsConverter.make_filter_string(resource.filter)
+                filter_string = query_strings.get('q')
+                if filter_string is None:
+                    filter_string = \
+                        UrlPartsConverter.make_filter_string(resource.filter)
+                    query_strings['q'] = filter_string
+                query['q'] = filter_string
             if not resource.order is None:
-                query['sort'] = \
-                    UrlPartsConverter.make_order_string(resource.order)
+                order_string = query_strings.get('sort')
+                if order_string is None:
+                    order_string = \
+                        UrlPartsConverter.make_order_string(resource.order)
+                    query_strings['sort'] = order_string
+                query['sort'] = order_string
             if not resource.slice is None:
                 query['start'], query['size'] = \
                     UrlPartsConverter.make_slice_strings(resource.slice)
@@ -99,14 +125,53 @@ class ResourceUrlConverter(object):
             raise ValueError('Can not convert non-resource object "%s to '
                              'URL".' % resource)
         else:
-            if resource.__parent__ is None:
+            parent = resource.__parent__
+            if parent is None:
                 raise ValueError('Can not generate URL for floating member '
                                  '"%s".' % resource)
+            if IService in provided_by(parent.__parent__):
+                # Members of root collections: Append the member name to
+                # the cached root collection URL.
+                prefix = self.__root_collection_urls.get(parent.__name__)
+                if prefix is None:
+                    prefix = unquote(model_url(parent, self.__request))
+                    self.__root_collection_urls[parent.__name__] = prefix
+                name = resource.__name__
+                if isinstance(name, unicode):
+                    name = name.encode('utf-8')
+                return '%s%s/' % (prefix, name)
             url = model_url(resource, self.__request)
         return unquote(url)
 
 
 class UrlPartsConverter(object):
+    """
+    Converts URL parts (query string parameters) to specifications and back.
+
+    Parsed filter and order specifications are cached in LRU caches keyed by
+    the specification factory in use and the raw criteria string; the
+    caches' hit and miss statistics are available through the
+    :attr:`filter_specification_cache` and :attr:`order_specification_cache`
+    attributes. Since specifications are immutable, cached specifications
+    are handed out without copying. Filter strings containing URLs are not
+    cached since the URLs are resolved to resources in the context of the
+    current request.
+
+    The CQL parser engine is selected with the "cql_parser" setting (see
+    :class:`everest.querying.base.CQL_PARSER_ENGINES`).
+    """
+    #: Cache for parsed filter specifications.
+    filter_specification_cache = LruCache(512)
+    #: Cache for parsed order specifications.
+    order_specification_cache = LruCache(512)
+    #: Maps CQL parser engine names to filter parser functions.
+    filter_parsers = {CQL_PARSER_ENGINES.PYPARSING : parse_filter,
+                      CQL_PARSER_ENGINES.NATIVE : parse_filter_native,
+                      }
+    #: Maps CQL parser engine names to order parser functions.
+    order_parsers = {CQL_PARSER_ENGINES.PYPARSING : parse_order,
+                     CQL_PARSER_ENGINES.NATIVE : parse_order_native,
+                     }
 
     @classmethod
     def make_filter_specification(cls, filter_string):
@@ -114,10 +179,18 @@ class UrlPartsConverter(object):
         Extracts the "query" parameter from the given request and converts
         the given query string into a filter specification.
         """
-        try:
-            return parse_filter(filter_string)
-        except ParseException, err:
-            raise ValueError('Expression parameters have errors. %s' % err)
+        key = (get_filter_specification_factory(), filter_string)
+        spec = cls.filter_specification_cache.get(key)
+        if spec is None:
+            try:
+                parse = cls.filter_parsers[get_cql_parser_engine()]
+                spec = parse(filter_string)
+            except ParseException, err:
+                raise ValueError('Expression parameters have errors. %s'
+                                 % err)
+            if not 'http://' in filter_string:
+                cls.filter_specification_cache.set(key, spec)
+        return spec
 
     @classmethod
     def make_filter_string(cls, filter_specification):
@@ -128,10 +201,17 @@ class UrlPartsConverter(object):
 
     @classmethod
     def make_order_specification(cls, order_string):
-        try:
-            return parse_order(order_string)
-        except ParseException, err:
-            raise ValueError('Expression parameters have errors. %s' % err)
+        key = (get_order_specification_factory(), order_string)
+        spec = cls.order_specification_cache.get(key)
+        if spec is None:
+            try:
+                parse = cls.order_parsers[get_cql_parser_engine()]
+                spec = parse(order_string)
+            except ParseException, err:
+                raise ValueError('Expression parameters have errors. %s'
+                                 % err)
+            cls.order_specification_cache.set(key, spec)
+        return spec
 
     @classmethod
     def make_order_string(cls, order_specification):
@@ -7,16 +7,19 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 Created on Oct 7, 2011.
 """
 from StringIO import StringIO
+from collections import OrderedDict
 from everest.repositories.interfaces import IRepositoryManager
 from everest.querying.interfaces import IFilterSpecificationVisitor
 from everest.querying.interfaces import IOrderSpecificationVisitor
 from pyramid.threadlocal import get_current_registry
+from threading import Lock
 from weakref import ref
 import re
 import traceback
 
 __docformat__ = 'reStructuredText en'
 __all__ = ['BidirectionalLookup',
+           'LruCache',
            'check_email',
            'classproperty',
            'get_filter_specification_visitor',
@@ -217,6 +220,140 @@ class BidirectionalLookup(object):
         self.__right.clear()
 
 
+class LruCache(object):
+    """
+    Thread-safe, size-bounded cache which discards the least recently used
+    items first.
+
+    Optionally, the total weight of the cached items (e.g., the number of
+    bytes in cached strings) can be bounded as well.
+
+    The cache keeps track of the number of hits, misses and evictions for
+    monitoring its effectiveness.
+    """
+
+    def __init__(self, max_size=128, max_weight=None, weigher=len):
+        """
+        :param int max_size: maximum number of items to keep.
+        :param int max_weight: maximum total weight of the items to keep
+          or `None` for no limit.
+        :param weigher: callable returning the weight of a cached value;
+          only used if :param:`max_weight` is given.
+        """
+        if max_size < 1:
+            raise ValueError('The maximum cache size must be a positive '
+                             'number.')
+        if not max_weight is None and max_weight < 1:
+            raise ValueError('The maximum cache weight must be a positive '
+                             'number.')
+        self.max_size = max_size
+        self.max_weight = max_weight
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        #: The total weight of the cached items.
+        self.weight = 0
+        self.__weigher = weigher
+        self.__items = OrderedDict()
+        self.__lock = Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached for the given key or the given default
+        value if the key is not cached.
+        """
+        with self.__lock:
+            try:
+                value = self.__items.pop(key)
+            except KeyError:
+                self.misses += 1
+                value = default
+            else:
+                # Re-insert to mark as most recently used.
+                self.__items[key] = value
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """
+        Caches the given value for the given key, discarding the least
+        recently used items if the cache is full. Values heavier than the
+        maximum weight are not cached.
+
+        :returns: list of the (key, value) tuples of the discarded items.
+        """
+        evicted = []
+        weight = self.__weigh(value)
+        max_weight = self.max_weight
+        with self.__lock:
+            self.__remove(key)
+            if max_weight is None or weight <= max_weight:
+                while self.__items \
+                      and (len(self.__items) >= self.max_size
+                           or (not max_weight is None
+                               and self.weight + weight > max_weight)):
+                    old_key, old_value = self.__items.popitem(last=False)
+                    self.weight -= self.__weigh(old_value)
+                    evicted.append((old_key, old_value))
+                self.__items[key] = value
+                self.weight += weight
+            self.evictions += len(evicted)
+        return evicted
+
+    def remove(self, key):
+        """
+        Removes the item cached for the given key, if any.
+        """
+        with self.__lock:
+            self.__remove(key)
+
+    def clear(self):
+        """
+        Removes all cached items and resets the hit, miss and eviction
+        counters.
+        """
+        with self.__lock:
+            self.__items.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.weight = 0
+
+    @property
+    def hit_ratio(self):
+        """
+        Ratio of cache hits to the total number of lookups (0.0 if no
+        lookups were performed yet).
+        """
+        lookups = self.hits + self.misses
+        if lookups > 0:
+            ratio = self.hits / float(lookups)
+        else:
+            ratio = 0.0
+        return ratio
+
+    def __contains__(self, key):
+        return key in self.__items
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __remove(self, key):
+        try:
+            value = self.__items.pop(key)
+        except KeyError:
+            pass
+        else:
+            self.weight -= self.__weigh(value)
+
+    def __weigh(self, value):
+        if self.max_weight is None:
+            weight = 0
+        else:
+            weight = self.__weigher(value)
+        return weight
+
+
 class WeakList(list):
     """
     List containing weakly referenced items.
@@ -6,6 +6,7 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Oct 7, 2011.j
 """
+from everest.entities.utils import get_entity_class
 from everest.messaging import UserMessageChecker
 from everest.messaging import UserMessageHandlingContextManager
 from everest.mime import CsvMime
@@ -13,22 +14,35 @@ from everest.mime import TextPlainMime
 from everest.mime import get_registered_mime_strings
 from everest.mime import get_registered_mime_type_for_name
 from everest.mime import get_registered_mime_type_for_string
+from everest.repositories.utils import as_repository
+from everest.representers.interfaces import IRepresenterRegistry
 from everest.representers.utils import as_representer
+from everest.resources.attributes import ResourceAttributeKinds
 from everest.resources.system import UserMessageMember
+from everest.resources.utils import get_collection_class
+from everest.resources.utils import get_member_class
+from everest.resources.utils import provides_resource
 from everest.utils import get_traceback
 from everest.views.interfaces import IResourceView
+from everest.views.interfaces import IResponseCache
 from pyramid.httpexceptions import HTTPBadRequest
 from pyramid.httpexceptions import HTTPConflict
 from pyramid.httpexceptions import HTTPError
 from pyramid.httpexceptions import HTTPInternalServerError # pylint: disable=F0401
 from pyramid.httpexceptions import HTTPNotAcceptable
+from pyramid.httpexceptions import HTTPNotModified
 from pyramid.httpexceptions import HTTPTemporaryRedirect # pylint: disable=F0401
 from pyramid.httpexceptions import HTTPUnsupportedMediaType
 from pyramid.response import Response
+from pyramid.settings import asbool
 from pyramid.threadlocal import get_current_request
+from urllib import urlencode
 from zope.interface import implements # pylint: disable=E0611,F0401
+import calendar
+import hashlib
 import logging
 import re
+import time
 
 __docformat__ = "reStructuredText en"
 __all__ = ['GetResourceView',
@@ -126,10 +140,21 @@ class RepresentingResourceView(ResourceView): # still abstract pylint: disable=W
           the view.
         :returns: :class:`everest.representers.base.ResourceRepresenter`
         """
+        return as_representer(self.context, self._get_response_mime_type())
+
+    def _get_response_mime_type(self):
+        """
+        Determines the MIME content type for the response from the view
+        name or the ACCEPT header of the request.
+
+        :raises: :class:`pyramid.httpexceptions.HTTPNotAcceptable` if the
+          MIME content type(s) the client specified can not be handled by 
+          the view.
+        :returns: registered MIME content type
+        """
         view_name = self.request.view_name
         if view_name != '':
             mime_type = get_registered_mime_type_for_name(view_name)
-            rpr = as_representer(self.context, mime_type)
         else:
             mime_type = None
             acc = None
@@ -161,8 +186,7 @@ class RepresentingResourceView(ResourceView): # still abstract pylint: disable=W
                                             headers=headers)
                     raise exc
                 mime_type = self.__get_default_response_mime_type()
-            rpr = as_representer(self.context, mime_type)
-        return rpr
+        return mime_type
 
     def _get_result(self, resource):
         """
@@ -200,7 +224,28 @@ class RepresentingResourceView(ResourceView): # still abstract pylint: disable=W
 class GetResourceView(RepresentingResourceView): # still abstract pylint: disable=W0223
     """
     Abstract base class for all collection views
+
+    Supports conditional GET requests: The ETag validator for the response
+    is computed from the versions of the data for all entity classes the
+    representation of the context resource may depend on (as maintained by
+    the repositories), the request path and the normalized query string;
+    the Last-Modified validator is the time of the last commit changing
+    data for any of these entity classes. If the client sends matching
+    validators in the If-None-Match or If-Modified-Since header, a 304 "Not
+    Modified" response is returned before any representer is created.
+
+    Since the versions are maintained per process, conditional GET support
+    is disabled by default. It can be enabled with the "conditional_get"
+    setting in deployments where a single process modifies the backend.
+
+    If a response cache utility is registered (see the
+    "response_cache_max_bytes" setting), rendered responses are cached
+    using the ETag to detect stale entries.
     """
+    # Maps member classes to the interfaces of all resources their
+    # representations may depend on.
+    __dependencies = {}
+
     def __init__(self, resource, request, **kw):
         if self.__class__ is GetResourceView:
             raise NotImplementedError('Abstract class')
@@ -208,12 +253,151 @@ class GetResourceView(RepresentingResourceView): # still abstract pylint: disabl
 
     def __call__(self):
         self._logger.debug('Request URL: %s' % self.request.url)
-        result = self._prepare_resource()
-        if not isinstance(result, Response):
-            # Return a response to bypass Pyramid rendering.
-            result = self._get_result(result)
+        validators = self._get_validators()
+        is_conditional = not validators is None \
+                         and self.__is_conditional_get_enabled()
+        if is_conditional and self.__is_not_modified(*validators):
+            etag, last_modified = validators
+            http_exc = HTTPNotModified()
+            http_exc.etag = etag
+            http_exc.last_modified = last_modified
+            result = self.request.get_response(http_exc)
+        else:
+            if is_conditional:
+                self.request.response.etag, \
+                    self.request.response.last_modified = validators
+            cache_key = self.__get_response_cache_key(validators)
+            if not cache_key is None:
+                result = self.__get_cached_response(cache_key, validators[0])
+            else:
+                result = None
+            if result is None:
+                result = self._prepare_resource()
+                if not isinstance(result, Response):
+                    # Return a response to bypass Pyramid rendering.
+                    result = self._get_result(result)
+                    if not cache_key is None \
+                       and result is self.request.response:
+                        self.__cache_response(cache_key, validators[0])
         return result
 
+    def _get_validators(self):
+        """
+        Computes the cache validators for the response to this request.
+
+        :returns: tuple containing the ETag string and the last modification
+          time (seconds since the epoch) or `None` if neither conditional
+          GET support nor response caching is enabled or if they are not
+          available for the context resource. The last modification time
+          is `None` if data changed within the current second.
+        """
+        has_cache = \
+            not self.request.registry.queryUtility(IResponseCache) is None
+        if not (self.__is_conditional_get_enabled() or has_cache) \
+           or not provides_resource(self.context):
+            return None
+        parts = [self.__get_canonical_url(),
+                 self.request.view_name,
+                 str(self.request.accept)]
+        last_modified = None
+        for rc in self.__get_dependencies():
+            ent_cls = get_entity_class(rc)
+            init_time, version, ent_last_modified = \
+                    as_repository(rc).get_version(ent_cls)
+            parts.append('%s.%s:%r:%d' % (ent_cls.__module__,
+                                          ent_cls.__name__,
+                                          init_time, version))
+            last_modified = max(last_modified, ent_last_modified)
+        etag = hashlib.md5('|'.join(parts)).hexdigest()
+        # The Last-Modified header has a resolution of one second; to avoid
+        # stale 304 responses for changes made later within the same
+        # second, we only send it once that second has passed.
+        last_modified = int(last_modified)
+        if time.time() < last_modified + 1:
+            last_modified = None
+        return etag, last_modified
+
+    def __is_conditional_get_enabled(self):
+        settings = self.request.registry.settings or {}
+        return asbool(settings.get('conditional_get', False))
+
+    def __get_canonical_url(self):
+        # The request URL with the query parameters sorted by name.
+        query_string = urlencode(sorted(self.request.GET.items()))
+        if query_string:
+            url = '%s?%s' % (self.request.path_url, query_string)
+        else:
+            url = self.request.path_url
+        return url
+
+    def __get_response_cache_key(self, validators):
+        # Returns the response cache key for this request or None if the
+        # response should not be cached.
+        reg = self.request.registry
+        if validators is None or not self._convert_response \
+           or reg.queryUtility(IResponseCache) is None:
+            return None
+        try:
+            mime_type = self._get_response_mime_type()
+        except HTTPError:
+            return None
+        rpr_reg = reg.getUtility(IRepresenterRegistry)
+        return (self.__get_canonical_url(), mime_type.mime_type_string,
+                rpr_reg.get_configuration_version(mime_type))
+
+    def __get_cached_response(self, cache_key, etag):
+        cache = self.request.registry.getUtility(IResponseCache)
+        cached = cache.get(cache_key, etag, self.__get_collection_name())
+        if not cached is None:
+            response = self.request.response
+            response.content_type, response.body = cached
+        else:
+            response = None
+        return response
+
+    def __cache_response(self, cache_key, etag):
+        cache = self.request.registry.getUtility(IResponseCache)
+        response = self.request.response
+        cache.set(cache_key, etag, self.__get_collection_name(),
+                  response.content_type, response.body)
+
+    def __get_collection_name(self):
+        return get_collection_class(self.context).root_name
+
+    def __is_not_modified(self, etag, last_modified):
+        if_none_match = self.request.if_none_match
+        if if_none_match:
+            # If-None-Match takes precedence over If-Modified-Since.
+            not_modified = etag in if_none_match
+        else:
+            if_modified_since = self.request.if_modified_since
+            not_modified = not if_modified_since is None \
+                and not last_modified is None \
+                and last_modified <= \
+                    calendar.timegm(if_modified_since.utctimetuple())
+        return not_modified
+
+    def __get_dependencies(self):
+        # Returns the context resource and the interfaces of all resources
+        # reachable from it through member or collection attributes.
+        mb_cls = get_member_class(self.context)
+        rcs = self.__dependencies.get(mb_cls)
+        if rcs is None:
+            rcs = []
+            seen = set([mb_cls])
+            mb_clss = [mb_cls]
+            while mb_clss:
+                for attr in mb_clss.pop().get_attributes().itervalues():
+                    if attr.kind == ResourceAttributeKinds.TERMINAL:
+                        continue
+                    attr_mb_cls = get_member_class(attr.value_type)
+                    if not attr_mb_cls in seen:
+                        seen.add(attr_mb_cls)
+                        mb_clss.append(attr_mb_cls)
+                        rcs.append(attr.value_type)
+            self.__dependencies[mb_cls] = rcs
+        return [self.context] + rcs
+
     def _prepare_resource(self):
         raise NotImplementedError('Abstract method.')
 
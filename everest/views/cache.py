@@ -0,0 +1,113 @@
+"""
+Response cache.
+
+This file is part of the everest project. 
+See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
+
+Created on Oct 18, 2026.
+"""
+from everest.utils import LruCache
+from everest.views.interfaces import IResponseCache
+from threading import Lock
+from zope.interface import implements # pylint: disable=E0611,F0401
+
+__docformat__ = 'reStructuredText en'
+__all__ = ['ResponseCache',
+           ]
+
+
+class ResponseCache(object):
+    """
+    Memory-bounded LRU cache for rendered GET responses.
+
+    Entries are keyed by the canonical request URL, the response content
+    type and the representer configuration version and hold the rendered
+    response body together with the ETag of the response. An entry becomes
+    stale as soon as the ETag for its URL changes, i.e., when changes to
+    any of the entity classes the representation depends on are
+    committed.
+
+    The numbers of cache hits, misses and evictions are recorded for each
+    collection.
+    """
+    implements(IResponseCache)
+
+    def __init__(self, max_bytes, max_entries=10000):
+        """
+        :param int max_bytes: maximum total size of the cached response
+          bodies.
+        :param int max_entries: maximum number of cached responses.
+        """
+        self.__cache = LruCache(max_size=max_entries, max_weight=max_bytes,
+                                weigher=lambda entry: len(entry[3]))
+        self.__statistics = {}
+        self.__lock = Lock()
+
+    def get(self, key, etag, collection_name):
+        """
+        Returns the cached response for the given key.
+
+        :param tuple key: cache key.
+        :param str etag: current ETag for the response.
+        :param str collection_name: name of the collection to record the
+          cache access for.
+        :returns: (content type, body) tuple or `None` if no response is
+          cached for the given key or the cached response is stale.
+        """
+        entry = self.__cache.get(key)
+        if not entry is None and entry[1] != etag:
+            self.__cache.remove(key)
+            entry = None
+        if entry is None:
+            self.__record(collection_name, 'misses')
+            result = None
+        else:
+            self.__record(collection_name, 'hits')
+            result = entry[2:]
+        return result
+
+    def set(self, key, etag, collection_name, content_type, body):
+        """
+        Caches the given rendered response.
+
+        :param tuple key: cache key.
+        :param str etag: ETag of the response.
+        :param str collection_name: name of the collection the response
+          belongs to.
+        :param str content_type: content type of the response.
+        :param str body: response body.
+        """
+        evicted = self.__cache.set(key,
+                                   (collection_name, etag, content_type, body))
+        for evicted_entry in evicted:
+            self.__record(evicted_entry[1][0], 'evictions')
+
+    def get_statistics(self):
+        """
+        Returns the cache statistics.
+
+        :returns: dictionary mapping collection names to dictionaries with
+          the keys "hits", "misses" and "evictions".
+        """
+        with self.__lock:
+            return dict((name, stats.copy())
+                        for (name, stats) in self.__statistics.iteritems())
+
+    def clear(self):
+        """
+        Removes all cached responses and resets the statistics.
+        """
+        self.__cache.clear()
+        with self.__lock:
+            self.__statistics.clear()
+
+    def __len__(self):
+        return len(self.__cache)
+
+    def __record(self, collection_name, counter):
+        with self.__lock:
+            stats = self.__statistics.get(collection_name)
+            if stats is None:
+                stats = dict(hits=0, misses=0, evictions=0)
+                self.__statistics[collection_name] = stats
+            stats[counter] += 1
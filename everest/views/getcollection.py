@@ -6,7 +6,6 @@ See LICENSE.txt for licensing, CONTRIBUTORS.txt for contributor information.
 
 Created on Oct 7, 2011.
 """
-from copy import deepcopy
 from everest.batch import Batch
 from everest.resources.base import Link
 from everest.url import UrlPartsConverter
@@ -36,7 +35,7 @@ class GetCollectionView(GetResourceView):
                 # Make sure we have defined an ordering on the collection
                 # to guarantee an order on the result set. This should not
                 # be reflected in the links' URLs.
-                self.context.order = deepcopy(self.context.default_order)
+                self.context.order = self.context.default_order
             # Build batch links.
             batch = self._create_batch()
             self_link = Link(self.context, 'self', self.context.title)
@@ -49,11 +48,19 @@ class GetCollectionView(GetResourceView):
                 prev_link = self._create_nav_link(batch.previous, 'previous',
                                                   not needs_default_order)
                 self.context.add_link(prev_link)
-            if not batch.next is None:
-                next_link = self._create_nav_link(batch.next, 'next',
+            if self.context.exact_count:
+                next_batch = batch.next
+            elif self.__has_more_members():
+                next_batch = Batch(batch.start + batch.size, batch.size,
+                                   batch.total_size)
+            else:
+                next_batch = None
+            if not next_batch is None:
+                next_link = self._create_nav_link(next_batch, 'next',
                                                   not needs_default_order)
                 self.context.add_link(next_link)
-            if not batch.index == batch.number - 1:
+            if self.context.exact_count \
+               and not batch.index == batch.number - 1:
                 last_link = self._create_nav_link(batch.last, 'last',
                                                   not needs_default_order)
                 self.context.add_link(last_link)
@@ -63,7 +70,11 @@ class GetCollectionView(GetResourceView):
     def _create_batch(self):
         start = self.context.slice.start
         size = self.context.slice.stop - start
-        total_size = len(self.context)
+        if self.context.exact_count:
+            total_size = len(self.context)
+        else:
+            # The total size is not known.
+            total_size = None
         return Batch(start, size, total_size)
 
     def _create_nav_link(self, batch, rel, reset_order):
@@ -74,12 +85,24 @@ class GetCollectionView(GetResourceView):
                                  batch.start + batch.size)
         return Link(coll_clone, rel, self.context.title)
 
+    def __has_more_members(self):
+        # Checks if there are members beyond the current slice by fetching
+        # (at most) one more entity instead of counting all members.
+        probe = self.context.clone()
+        stop = self.context.slice.stop
+        probe.slice = slice(stop, stop + 1)
+        return len(list(probe.get_aggregate().iterator())) > 0
+
     def __filter_collection(self):
         query_string = self.request.params.get('q')
         if not query_string is None:
             filter_spec = \
                 UrlPartsConverter.make_filter_specification(query_string)
             self.context.filter = filter_spec
+            # Cache the query string for the URLs of the collection and its
+            # clones (unless a relationship specification was prepended).
+            if self.context.filter is filter_spec:
+                self.context.query_strings['q'] = query_string
 
     def __order_collection(self):
         order_string = self.request.params.get('sort')
@@ -87,6 +110,7 @@ class GetCollectionView(GetResourceView):
             order_spec = \
                 UrlPartsConverter.make_order_specification(order_string)
             self.context.order = order_spec
+            self.context.query_strings['sort'] = order_string
 
     def __slice_collection(self):
         start_string = self.request.params.get('start')
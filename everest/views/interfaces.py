@@ -10,6 +10,7 @@ from zope.interface import Interface, Attribute # pylint: disable=E0611,F0401
 
 __docformat__ = "reStructuredText en"
 __all__ = ['IResourceView',
+           'IResponseCache',
            ]
 
 
@@ -25,4 +26,27 @@ class IResourceView(Interface):
     def __call__():
         """
         """
+
+
+class IResponseCache(Interface):
+    """
+    Cache for rendered GET responses.
+    """
+
+    def get(key, etag, collection_name):
+        """
+        Returns the cached (content type, body) tuple for the given key or
+        `None` if no current response is cached.
+        """
+
+    def set(key, etag, collection_name, content_type, body):
+        """
+        Caches the given rendered response.
+        """
+
+    def get_statistics():
+        """
+        Returns a map of collection names to hit, miss and eviction counts.
+        """
+
 # pylint: disable=W0232,E0211